@@ -1,4 +1,16 @@
 from .baidu_pc import BaiduPc
 from .baidu_mobile import BaiduMobile
+from .async_client import AsyncBaiduPc, AsyncBaiduMobile
+from .cache import SerpCache, SqliteCache
+from .archive import HtmlArchive, reparse
+from .fingerprint import FingerprintPool
+from .proxy import ProxyPool
+from .ratelimit import RateLimiter
+from .retry import RetryPolicy
+from .breaker import CircuitBreaker
+from .hedge import HedgePolicy
+from .mock_server import MockBaiduServer
+from .metrics import MetricsCollector, default_metrics
+from .hooks import Hooks, Span
 
-__all__ = ['BaiduPc', 'BaiduMobile']
+__all__ = ['BaiduPc', 'BaiduMobile', 'AsyncBaiduPc', 'AsyncBaiduMobile', 'SerpCache', 'SqliteCache', 'HtmlArchive', 'reparse', 'FingerprintPool', 'ProxyPool', 'RateLimiter', 'RetryPolicy', 'CircuitBreaker', 'HedgePolicy', 'MockBaiduServer', 'MetricsCollector', 'default_metrics', 'Hooks', 'Span']
@@ -0,0 +1,252 @@
+import hashlib
+import logging
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# 各压缩算法的默认压缩级别，兼顾压缩率和抓取路径上的CPU开销
+_DEFAULT_LEVELS = {'brotli': 5, 'zstd': 3}
+
+
+def _get_codec(codec, level):
+    """返回 (compress, decompress)"""
+    if codec == 'brotli':
+        import brotli
+        return (lambda data: brotli.compress(data, quality=level)), brotli.decompress
+    if codec == 'zstd':
+        try:
+            from compression import zstd
+            return (lambda data: zstd.compress(data, level=level)), zstd.decompress
+        except ImportError:
+            pass
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("zstd压缩需要安装zstandard: pip install zstandard")
+        return zstandard.ZstdCompressor(level=level).compress, zstandard.ZstdDecompressor().decompress
+    raise ValueError(f"不支持的压缩算法: {codec}，可选值: brotli, zstd")
+
+
+class HtmlArchive:
+    """
+    原始HTML存档：按内容SHA-256寻址，相同页面只存一份压缩数据
+    目录结构为 objects/<前2位>/<摘要>.<压缩算法> 加一个SQLite索引，可在多个进程间共享
+    提取逻辑失效时可用 reparse() 离线重新解析，无需重新抓取
+    background=True 时客户端的存档交给后台线程写入，待写入的页面超过 max_pending 时丢弃新页面
+    """
+
+    def __init__(self, path, codec='brotli', level=None, background=False, max_pending=1000):
+        self.path = os.fspath(path)
+        self.codec = codec
+        self.level = _DEFAULT_LEVELS.get(codec) if level is None else level
+        self._compress, self._decompress = _get_codec(codec, self.level)
+        self._decompressors = {codec: self._decompress}
+        os.makedirs(os.path.join(self.path, 'objects'), exist_ok=True)
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS pages ('
+            'id INTEGER PRIMARY KEY, device TEXT NOT NULL, keyword TEXT NOT NULL, pn INTEGER NOT NULL, '
+            'date_range TEXT NOT NULL, status_code INTEGER, response_time REAL, fetched_at REAL NOT NULL, '
+            'digest TEXT NOT NULL, codec TEXT NOT NULL, size INTEGER NOT NULL)'
+        )
+        self._stats_lock = threading.Lock()
+        self._stats = {'archived': 0, 'failed': 0, 'dropped': 0}
+        self.background = background
+        self._queue = None
+        if background:
+            self._queue = queue.Queue(max_pending)
+            self._writer = threading.Thread(target=self._write_loop, name='html-archive', daemon=True)
+            self._writer.start()
+
+    def _conn(self):
+        """每个线程使用独立的连接"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(os.path.join(self.path, 'index.db'), timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _blob_path(self, digest, codec):
+        return os.path.join(self.path, 'objects', digest[:2], f'{digest}.{codec}')
+
+    def put(self, device, keyword, pn, date_range, response):
+        """
+        存档一次成功响应，response 为 get_baidupc_serp / get_baidum_serp 返回的字典
+        返回页面内容的摘要，内容已存在时只追加索引记录
+        """
+        data = response['content'].encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        blob_path = self._blob_path(digest, self.codec)
+        if not os.path.exists(blob_path):
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            # 先写临时文件再原子替换，避免并发写入时读到半个文件
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(blob_path))
+            with os.fdopen(fd, 'wb') as f:
+                f.write(self._compress(data))
+            os.replace(tmp_path, blob_path)
+        self._conn().execute(
+            'INSERT INTO pages (device, keyword, pn, date_range, status_code, response_time, fetched_at, digest, codec, size) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (device, keyword.strip(), int(pn) if pn else 1, date_range or '', response.get('status_code'),
+             response.get('response_time'), time.time(), digest, self.codec, len(data)),
+        )
+        return digest
+
+    def _count(self, name):
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def _put_logged(self, device, keyword, pn, date_range, response):
+        try:
+            self.put(device, keyword, pn, date_range, response)
+        except Exception:
+            # 磁盘写满、数据库被锁等存档错误只记录日志和计数
+            logger.exception('页面存档失败: %s %s pn=%s', device, keyword, pn)
+            self._count('failed')
+        else:
+            self._count('archived')
+
+    def save(self, device, keyword, pn, date_range, response):
+        """客户端抓取成功后调用：存档失败不会抛出异常，不影响搜索结果"""
+        if self._queue is None:
+            self._put_logged(device, keyword, pn, date_range, response)
+            return
+        page = {key: response.get(key) for key in ('content', 'status_code', 'response_time')}
+        try:
+            self._queue.put_nowait((device, keyword, pn, date_range, page))
+        except queue.Full:
+            self._count('dropped')
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self._put_logged(*item)
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        """等待后台线程写完已提交的页面"""
+        if self._queue is not None:
+            self._queue.join()
+
+    def close(self):
+        """写完已提交的页面并停止后台线程"""
+        if self._queue is not None:
+            self._queue.put(None)
+            self._writer.join()
+            self._queue = None
+
+    def load(self, digest, codec=None):
+        """按摘要读取并解压页面内容"""
+        codec = codec or self.codec
+        decompress = self._decompressors.get(codec)
+        if decompress is None:
+            decompress = self._decompressors[codec] = _get_codec(codec, _DEFAULT_LEVELS[codec])[1]
+        with open(self._blob_path(digest, codec), 'rb') as f:
+            return decompress(f.read()).decode('utf-8')
+
+    def records(self, device=None, since=None):
+        """按存档顺序返回索引记录，可按设备类型和抓取时间过滤"""
+        query = 'SELECT id, device, keyword, pn, date_range, status_code, response_time, fetched_at, digest, codec, size FROM pages'
+        conditions, args = [], []
+        if device is not None:
+            conditions.append('device = ?')
+            args.append(device)
+        if since is not None:
+            conditions.append('fetched_at >= ?')
+            args.append(since)
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        cursor = self._conn().execute(query + ' ORDER BY id', args)
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor]
+
+    def stats(self):
+        """返回页面数、去重后的内容数、原始字节数和压缩后字节数，以及本实例存档成功/失败/丢弃的次数"""
+        pages, blobs, raw_bytes = self._conn().execute(
+            'SELECT COUNT(*), COUNT(DISTINCT digest), COALESCE(SUM(size), 0) FROM pages'
+        ).fetchone()
+        stored_bytes = 0
+        for root, _, files in os.walk(os.path.join(self.path, 'objects')):
+            stored_bytes += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+        with self._stats_lock:
+            counters = dict(self._stats)
+        return dict(counters, pages=pages, blobs=blobs, raw_bytes=raw_bytes, stored_bytes=stored_bytes)
+
+
+# 每个工作进程内按设备类型复用的客户端和存档对象
+_worker_state = {}
+
+
+def _init_worker(archive_path, codec, client_kwargs, exclude):
+    _worker_state.clear()
+    _worker_state.update(archive=HtmlArchive(archive_path, codec), client_kwargs=client_kwargs, exclude=exclude, clients={})
+
+
+def _worker_client(device):
+    clients = _worker_state['clients']
+    client = clients.get(device)
+    if client is None:
+        from .baidu_pc import BaiduPc
+        from .baidu_mobile import BaiduMobile
+        client = clients[device] = (BaiduPc if device == 'pc' else BaiduMobile)(**_worker_state['client_kwargs'])
+        exclude = _worker_state['exclude']
+        if exclude is not None:
+            client.exclude = list(exclude)
+        elif device == 'mobile':
+            # 与 BaiduMobile.search() 的默认值一致，存档中不含扩展推荐词
+            client.exclude = ['ext_recommend']
+    return client
+
+
+def _reparse_one(record, include_performance=False):
+    html_content = _worker_state['archive'].load(record['digest'], record['codec'])
+    client = _worker_client(record['device'])
+    response = {'content': html_content, 'response_time': record['response_time'] or 0, 'status_code': record['status_code']}
+    if record['device'] == 'pc':
+        recommend = client.get_recommend(html_content) if 'recommend' not in client.exclude else []
+        result = client.handle_response(response, record['keyword'], recommend, include_performance)
+    else:
+        result = client.handle_response(response, record['keyword'], None, None, record['pn'], include_performance)
+    return record, result
+
+
+def _reparse_chunk(records, include_performance):
+    return [_reparse_one(record, include_performance) for record in records]
+
+
+def reparse(archive, device=None, since=None, workers=None, exclude=None, include_performance=False, chunk_size=32, **client_kwargs):
+    """
+    用当前的提取逻辑离线重新解析存档页面，逐个产出 (record, result)
+    页面在 workers 个进程中并行解析（默认CPU核数，workers=1 时在当前进程内执行），不发出任何请求
+    client_kwargs 传给每个进程中的 BaiduPc / BaiduMobile，如 parser='lxml'
+    """
+    records = archive.records(device, since)
+    init_args = (archive.path, archive.codec, client_kwargs, exclude)
+    if workers == 1:
+        _init_worker(*init_args)
+        try:
+            for record in records:
+                yield _reparse_one(record, include_performance)
+        finally:
+            for client in _worker_state['clients'].values():
+                client.close()
+            _worker_state.clear()
+        return
+
+    chunks = [records[i:i + chunk_size] for i in range(0, len(records), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=init_args) as executor:
+        for results in executor.map(_reparse_chunk, chunks, [include_performance] * len(chunks)):
+            yield from results
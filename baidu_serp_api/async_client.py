@@ -0,0 +1,658 @@
+import asyncio
+import json
+import math
+import ssl
+import time
+
+import certifi
+
+from .baidu_pc import BaiduPc
+from .baidu_mobile import BaiduMobile
+from .batch import aimap_bounded, afan_out_pages, merge_page_results
+from .breaker import PC_SERP_ENDPOINT, MOBILE_SERP_ENDPOINT, MOBILE_REC_ENDPOINT
+from .cache import make_cache_key, acached_call
+from .hedge import ahedged_call
+from .ratelimit import response_code
+from .timing import PhaseTimer, add_phase, timing_trace_config
+from .util import MarkerScanner
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - 可选依赖
+    aiohttp = None
+
+
+def _require_aiohttp():
+    if aiohttp is None:
+        raise ImportError("异步客户端需要安装aiohttp: pip install baidu-serp-api[async]")
+
+
+def _pick_proxy(proxies, url):
+    """从requests风格的proxies字典中取出与URL协议匹配的代理地址"""
+    if not proxies:
+        return None
+    scheme = url.split("://", 1)[0]
+    return proxies.get(scheme) or proxies.get("all")
+
+
+def map_aiohttp_error(e):
+    """将aiohttp异常映射为与同步客户端一致的错误码"""
+    error_str = str(e).lower()
+    if isinstance(e, aiohttp.ClientPayloadError):
+        return {'code': 502, 'msg': '响应提前结束'}
+    if isinstance(e, aiohttp.ClientProxyConnectionError):
+        if 'connection reset by peer' in error_str or 'broken pipe' in error_str:
+            return {'code': 505, 'msg': '代理连接被重置'}
+        elif 'remote end closed connection' in error_str or 'connection closed' in error_str:
+            return {'code': 506, 'msg': '代理连接被远程关闭'}
+        elif 'connection refused' in error_str or 'connect call failed' in error_str:
+            return {'code': 508, 'msg': '代理连接被拒绝'}
+        elif 'timeout' in error_str:
+            return {'code': 509, 'msg': '代理连接超时'}
+        return {'code': 510, 'msg': f'代理服务器错误: {str(e)}'}
+    if isinstance(e, aiohttp.ClientHttpProxyError):
+        if e.status == 407:
+            return {'code': 507, 'msg': '代理认证失败'}
+        return {'code': 510, 'msg': f'代理服务器错误: {str(e)}'}
+    if isinstance(e, aiohttp.ConnectionTimeoutError):
+        return {'code': 503, 'msg': '连接超时'}
+    if isinstance(e, (aiohttp.SocketTimeoutError, asyncio.TimeoutError)):
+        return {'code': 504, 'msg': '读取超时'}
+    if isinstance(e, aiohttp.ClientConnectorCertificateError):
+        return {'code': 511, 'msg': 'SSL证书验证失败'}
+    if isinstance(e, aiohttp.ClientSSLError):
+        if 'handshake' in error_str:
+            return {'code': 512, 'msg': 'SSL握手失败'}
+        return {'code': 513, 'msg': f'SSL连接错误: {str(e)}'}
+    if isinstance(e, aiohttp.ClientResponseError):
+        status_code = e.status or 0
+        if status_code == 403:
+            return {'code': 520, 'msg': '访问被禁止(403)'}
+        elif status_code == 429:
+            return {'code': 521, 'msg': '请求过于频繁(429)'}
+        elif status_code >= 500:
+            return {'code': 522, 'msg': f'服务器错误({status_code})'}
+        return {'code': 523, 'msg': f'HTTP错误({status_code}): {str(e)}'}
+    if isinstance(e, (aiohttp.ClientConnectionError, OSError)):
+        if 'connection reset by peer' in error_str or 'broken pipe' in error_str:
+            return {'code': 514, 'msg': '连接被重置'}
+        elif 'server disconnected' in error_str or 'connection closed' in error_str:
+            return {'code': 515, 'msg': '远程服务器关闭连接'}
+        elif 'connection refused' in error_str or 'connect call failed' in error_str:
+            return {'code': 516, 'msg': '连接被拒绝'}
+        elif 'name or service not known' in error_str or 'nodename nor servname provided' in error_str \
+                or 'temporary failure in name resolution' in error_str:
+            return {'code': 517, 'msg': 'DNS解析失败'}
+        elif 'network is unreachable' in error_str:
+            return {'code': 518, 'msg': '网络不可达'}
+        return {'code': 519, 'msg': f'连接错误: {str(e)}'}
+    return {'code': 500, 'msg': f'请求异常: {str(e)}'}
+
+
+class _AsyncClientMixin:
+    """异步客户端公共逻辑：aiohttp会话、并发信号量与解析线程"""
+
+    def _init_async(self, max_concurrency, parse_in_executor):
+        _require_aiohttp()
+        self.max_concurrency = max_concurrency
+        self.parse_in_executor = parse_in_executor
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._aio_session = None
+
+    def _setup_session(self):
+        """异步客户端不使用requests.Session，连接由aiohttp管理"""
+        self._session = None
+
+    def _setup_executors(self):
+        """扩展推荐词和对冲请求都是事件循环中的任务，不创建后台线程池"""
+        self._ext_executor = None
+        self._hedge_executor = None
+
+    def _get_aio_session(self):
+        if self._aio_session is None or self._aio_session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_concurrency,
+                limit_per_host=self.pool_maxsize if self.connection_mode == 'custom' else 0,
+                ssl=ssl.create_default_context(cafile=certifi.where()),
+            )
+            self._aio_session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(
+                    sock_connect=self.connect_timeout,
+                    sock_read=self.read_timeout,
+                ),
+                # 记录DNS、连接、等待响应头等阶段的耗时
+                trace_configs=[timing_trace_config()],
+            )
+        return self._aio_session
+
+    async def _fetch(self, url, params, headers, proxies, abort_markers=None, timer=None):
+        """
+        发送请求并返回 (状态码, 响应头, 响应体bytes, charset, 提前终止结果)
+        开启 stream_download 且传入 abort_markers 时，命中标记即断开连接，响应体为None
+        传入 timer（PhaseTimer）时记录各阶段耗时，aiohttp 不提供解压前的字节数，bytes_wire 取自 Content-Length
+        """
+        session = self._get_aio_session()
+        async with session.get(
+            url,
+            params=params,
+            headers=headers,
+            proxy=_pick_proxy(proxies, url),
+            trace_request_ctx={'timer': timer} if timer is not None else None,
+        ) as response:
+            response.raise_for_status()
+            if not (abort_markers and self.stream_download):
+                body = await response.read()
+                if timer is not None:
+                    timer.finish_download(response.content_length, len(body))
+                return response.status, response.headers, body, response.charset, None
+
+            scanner = MarkerScanner(abort_markers)
+            async for chunk in response.content.iter_chunked(self.stream_chunk_size):
+                marker = scanner.feed(chunk)
+                if marker:
+                    response.close()
+                    return response.status, response.headers, None, response.charset, abort_markers[marker.decode('utf-8')]
+            if timer is not None:
+                timer.finish_download(response.content_length, len(scanner.body))
+            return response.status, response.headers, scanner.body, response.charset, None
+
+    async def _run_parse(self, func, *args):
+        if self.parse_in_executor:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, func, *args)
+        return func(*args)
+
+    async def _archive_page(self, device, keyword, pn, date_range, response):
+        """在线程池中压缩并存档页面，避免阻塞事件循环；后台写入的存档只需放入队列"""
+        if self.archive is None:
+            return
+        if self.archive.background:
+            self.archive.save(device, keyword, pn, date_range, response)
+        else:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self.archive.save, device, keyword, pn, date_range, response)
+
+    def search_many(self, keywords, workers=None, ordered=False, date_range=None, pn=None, proxies=None, exclude=None, include_performance=False, bypass_cache=False):
+        """
+        批量搜索的异步版本，返回异步生成器，逐个产出 (keyword, result)
+        workers 默认为 max_concurrency
+        """
+
+        async def _search_one(keyword):
+            return keyword, await self.search(keyword, date_range, pn, proxies, exclude, include_performance, bypass_cache)
+
+        return aimap_bounded(_search_one, keywords, workers=workers or self.max_concurrency, ordered=ordered)
+
+    async def aclose(self):
+        """关闭aiohttp会话释放资源"""
+        if self._aio_session is not None and not self._aio_session.closed:
+            await self._aio_session.close()
+        self._aio_session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+
+class AsyncBaiduPc(_AsyncClientMixin, BaiduPc):
+    """BaiduPc 的 asyncio 版本，返回结构与错误码与同步版本一致"""
+
+    def __init__(self, *args, max_concurrency=100, parse_in_executor=True, **kwargs):
+        # 其余参数与同步客户端一致
+        super().__init__(*args, **kwargs)
+        self._init_async(max_concurrency, parse_in_executor)
+
+    async def get_baidupc_serp(self, keyword, date_range, pn, proxies, random_params, cookies=None, keep_alive=None):
+        """
+        配置了代理池时，未指定proxies则从池中选择代理
+        配置了重试策略时按错误码重试，重试前可切换代理和更换指纹
+        """
+        if self.proxy_pool is not None:
+            proxies = proxies or self.proxy_pool.select()
+        if self.retry_policy is None:
+            return await self._send_baidupc_serp(keyword, date_range, pn, proxies, random_params, cookies, keep_alive)
+        return await self.retry_policy.acall(
+            lambda proxies, fingerprint: self._send_baidupc_serp(keyword, date_range, pn, proxies, fingerprint[0], fingerprint[1], keep_alive),
+            proxies, (random_params, cookies), self._new_fingerprint, self._failover_proxies,
+            self.hooks.retry if self.hooks is not None else None,
+        )
+
+    async def _send_baidupc_serp(self, keyword, date_range, pn, proxies, random_params, cookies=None, keep_alive=None):
+        """
+        发送一次请求：熔断器打开时直接返回524，配置了限流器时按令牌桶速率发送，
+        并把请求结果反馈给代理池、限流器和熔断器，记录指标并调用生命周期回调
+        """
+        if self.proxy_pool is None and self.rate_limiter is None and self.circuit_breaker is None and self.metrics is None and self.hooks is None:
+            return await self._get_baidupc_serp(keyword, date_range, pn, proxies, random_params, cookies, keep_alive)
+        span = self.hooks.start_request(PC_SERP_ENDPOINT, keyword, pn, proxies) if self.hooks is not None else None
+        if self.circuit_breaker is not None:
+            rejected = self.circuit_breaker.allow(PC_SERP_ENDPOINT, proxies)
+            if rejected is not None:
+                if self.metrics is not None:
+                    self.metrics.observe(PC_SERP_ENDPOINT, proxies, 524)
+                response = {'code': 524, 'msg': f'熔断器打开: {rejected}'}
+                if span is not None:
+                    self.hooks.finish_request(span, response)
+                return response
+        started = None
+        try:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.aacquire(proxies)
+            if self.metrics is not None:
+                started = self.metrics.request_started(PC_SERP_ENDPOINT)
+            response = await self._get_baidupc_serp(keyword, date_range, pn, proxies, random_params, cookies, keep_alive)
+        except BaseException as e:
+            # 请求被取消时释放熔断器的半开试探名额
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.report(PC_SERP_ENDPOINT, proxies, None)
+            if started is not None:
+                self.metrics.request_finished(PC_SERP_ENDPOINT, proxies, None, started)
+            if span is not None:
+                self.hooks.fail_request(span, e)
+            raise
+        code = response_code(response)
+        if self.proxy_pool is not None:
+            self.proxy_pool.report_response(proxies, response)
+        if self.rate_limiter is not None:
+            self.rate_limiter.report(proxies, code)
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.report(PC_SERP_ENDPOINT, proxies, code)
+        if self.metrics is not None:
+            self.metrics.request_finished(PC_SERP_ENDPOINT, proxies, code, started)
+        if span is not None:
+            self.hooks.finish_request(span, response)
+        return response
+
+    async def _get_baidupc_serp(self, keyword, date_range, pn, proxies, random_params, cookies=None, keep_alive=None):
+        url, params, headers = self._build_serp_request(keyword, date_range, pn, random_params, cookies)
+        self._apply_connection_header(headers, proxies, keep_alive)
+        timer = PhaseTimer()
+        try:
+            start_time = time.time()
+            status_code, _, body, charset, aborted = await self._fetch(url, params, headers, proxies, self.STREAM_ABORT_MARKERS, timer)
+            response_time = time.time() - start_time
+            if aborted:
+                return aborted
+            decode_start = time.perf_counter()
+            content = self.decode_content(body, charset)
+            timer.add('decode', time.perf_counter() - decode_start)
+            result = {
+                'content': content,
+                'response_time': response_time,
+                'status_code': status_code,
+                'timings': timer
+            }
+        except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+            return map_aiohttp_error(e)
+        await self._archive_page('pc', keyword, pn, date_range, result)
+        return result
+
+    async def search(self, keyword, date_range=None, pn=None, proxies=None, exclude=None, include_performance=False, bypass_cache=False):
+        exclude = self._resolve_exclude(exclude)
+
+        if self.cache is None:
+            result = await self._search(keyword, date_range, pn, proxies, include_performance, exclude)
+        else:
+            cache_key = make_cache_key('pc', keyword, pn, date_range, exclude)
+            result = await acached_call(
+                self.cache, cache_key, lambda: self._search(keyword, date_range, pn, proxies, include_performance, exclude),
+                include_performance, bypass_cache, metrics=self.metrics,
+            )
+        if self.metrics is not None:
+            self.metrics.record_result('pc', result.get('code'))
+        return result
+
+    async def _search(self, keyword, date_range, pn, proxies, include_performance, exclude):
+        async with self._semaphore:
+            fingerprint_start = time.perf_counter()
+            random_params, cookies = self._new_fingerprint()
+            fingerprint_time = time.perf_counter() - fingerprint_start
+            if self.hedge_policy is None:
+                response = await self.get_baidupc_serp(
+                    keyword.strip(), date_range, pn, proxies, random_params, cookies=cookies
+                )
+            else:
+                response = await self._hedged_baidupc_serp(keyword.strip(), date_range, pn, proxies, random_params, cookies)
+
+        if isinstance(response, dict) and 'code' in response:
+            return response
+        add_phase(response, 'fingerprint', fingerprint_time)
+
+        parse_start = time.perf_counter()
+        result = await self._run_parse(self._parse_response, response, keyword.strip(), include_performance, exclude)
+        if self.hooks is not None:
+            self.hooks.parse_complete(PC_SERP_ENDPOINT, keyword.strip(), pn, result, parse_start)
+        return result
+
+    async def _hedged_baidupc_serp(self, keyword, date_range, pn, proxies, random_params, cookies):
+        """对冲请求的异步版本，落后的请求会被直接取消"""
+        if self.proxy_pool is not None:
+            proxies = proxies or self.proxy_pool.select()
+
+        async def _primary():
+            return await self.get_baidupc_serp(keyword, date_range, pn, proxies, random_params, cookies=cookies)
+
+        async def _hedge():
+            hedge_proxies = self._failover_proxies([proxies] if proxies else []) or proxies
+            hedge_params, hedge_cookies = self._new_fingerprint()
+            return await self.get_baidupc_serp(keyword, date_range, pn, hedge_proxies, hedge_params, cookies=hedge_cookies)
+
+        return await ahedged_call(self.hedge_policy, _primary, _hedge)
+
+    async def iter_pages(self, keyword, max_pages=5, date_range=None, proxies=None, exclude=None, include_performance=False, start_page=1):
+        """iter_pages 的异步版本，以异步生成器方式逐页产出 (pn, result)"""
+        exclude = self._resolve_exclude(exclude)
+
+        keyword = keyword.strip()
+        random_params, cookies = self._new_fingerprint()
+
+        for pn in range(start_page, start_page + max_pages):
+            async with self._semaphore:
+                response = await self.get_baidupc_serp(
+                    keyword, date_range, pn, proxies, random_params, cookies=cookies, keep_alive=True
+                )
+            if isinstance(response, dict) and 'code' in response:
+                yield pn, response
+                return
+
+            result = await self._run_parse(self._parse_response, response, keyword, include_performance, exclude)
+            yield pn, result
+
+            if result.get('code') != 200 or self.is_last_page(response['content']):
+                return
+
+    async def search_top_n(self, keyword, n=50, date_range=None, proxies=None, exclude=None, include_performance=False):
+        """search_top_n 的异步版本，超出实际最后一页的请求会被直接取消"""
+        exclude = self._resolve_exclude(exclude)
+
+        keyword = keyword.strip()
+        random_params, cookies = self._new_fingerprint()
+
+        async def _fetch_page(pn):
+            async with self._semaphore:
+                response = await self.get_baidupc_serp(keyword, date_range, pn, proxies, random_params, cookies=cookies)
+            if isinstance(response, dict) and 'code' in response:
+                return response, False
+            result = await self._run_parse(self._parse_response, response, keyword, include_performance, exclude)
+            return result, result.get('code') in (404, 405) or self.is_last_page(response['content'])
+
+        page_results = await afan_out_pages(_fetch_page, range(1, math.ceil(n / 10) + 1))
+        return merge_page_results(page_results, keyword, n)
+
+    def _parse_response(self, response, keyword, include_performance, exclude):
+        recommend_start = time.perf_counter()
+        recommend = self.get_recommend(response['content'])
+        add_phase(response, 'recommend', time.perf_counter() - recommend_start)
+        return self.handle_response(response, keyword, recommend, include_performance, exclude)
+
+
+class AsyncBaiduMobile(_AsyncClientMixin, BaiduMobile):
+    """BaiduMobile 的 asyncio 版本，返回结构与错误码与同步版本一致"""
+
+    def __init__(self, *args, max_concurrency=100, parse_in_executor=True, **kwargs):
+        # 其余参数与同步客户端一致
+        super().__init__(*args, **kwargs)
+        self._init_async(max_concurrency, parse_in_executor)
+
+    async def get_ext_recommend(self, keyword, qid, random_params, proxies, cookies=None, keep_alive=None):
+        # 推荐词接口熔断时直接返回空列表，接口的失败只计入接口本身，不计入代理
+        if self.circuit_breaker is not None and self.circuit_breaker.allow(MOBILE_REC_ENDPOINT) is not None:
+            return []
+        url, params, headers = self._build_ext_recommend_request(keyword, qid, random_params, cookies)
+        self._apply_connection_header(headers, proxies, keep_alive)
+        code = None
+        started = self.metrics.request_started(MOBILE_REC_ENDPOINT) if self.metrics is not None else None
+        span = self.hooks.start_request(MOBILE_REC_ENDPOINT, keyword, None, proxies) if self.hooks is not None else None
+        try:
+            _, _, body, _, _ = await self._fetch(url, params, headers, proxies)
+            code = 200
+            return self.parse_ext_recommend(json.loads(body.decode('utf-8')))
+        except asyncio.TimeoutError:
+            code = 504
+            return []
+        except (aiohttp.ClientError, OSError, ValueError, KeyError):
+            # 推荐词获取失败时返回空列表，不影响主搜索功能
+            code = code or 519
+            return []
+        finally:
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.report(MOBILE_REC_ENDPOINT, None, code)
+            if started is not None:
+                self.metrics.request_finished(MOBILE_REC_ENDPOINT, proxies, code, started)
+            if span is not None:
+                if code is None:
+                    self.hooks.fail_request(span, None)
+                else:
+                    self.hooks.finish_request(span, {'code': code})
+
+    async def get_baidum_serp(self, keyword, date_range, pn, proxies, random_params, need_ext_recommend=False, cookies=None, keep_alive=None):
+        """
+        配置了代理池时，未指定proxies则从池中选择代理
+        配置了重试策略时按错误码重试，重试前可切换代理和更换指纹
+        """
+        if self.proxy_pool is not None:
+            proxies = proxies or self.proxy_pool.select()
+        if self.retry_policy is None:
+            return await self._send_baidum_serp(keyword, date_range, pn, proxies, random_params, need_ext_recommend, cookies, keep_alive)
+        return await self.retry_policy.acall(
+            lambda proxies, fingerprint: self._send_baidum_serp(keyword, date_range, pn, proxies, fingerprint[0], need_ext_recommend, fingerprint[1], keep_alive),
+            proxies, (random_params, cookies), self._new_fingerprint, self._failover_proxies,
+            self.hooks.retry if self.hooks is not None else None,
+        )
+
+    async def _send_baidum_serp(self, keyword, date_range, pn, proxies, random_params, need_ext_recommend=False, cookies=None, keep_alive=None):
+        """
+        发送一次请求：熔断器打开时直接返回524，配置了限流器时按令牌桶速率发送，
+        并把请求结果反馈给代理池、限流器和熔断器，记录指标并调用生命周期回调
+        """
+        if self.proxy_pool is None and self.rate_limiter is None and self.circuit_breaker is None and self.metrics is None and self.hooks is None:
+            return await self._get_baidum_serp(keyword, date_range, pn, proxies, random_params, need_ext_recommend, cookies, keep_alive)
+        span = self.hooks.start_request(MOBILE_SERP_ENDPOINT, keyword, pn, proxies) if self.hooks is not None else None
+        if self.circuit_breaker is not None:
+            rejected = self.circuit_breaker.allow(MOBILE_SERP_ENDPOINT, proxies)
+            if rejected is not None:
+                if self.metrics is not None:
+                    self.metrics.observe(MOBILE_SERP_ENDPOINT, proxies, 524)
+                response = {'code': 524, 'msg': f'熔断器打开: {rejected}'}
+                if span is not None:
+                    self.hooks.finish_request(span, response)
+                return response
+        started = None
+        try:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.aacquire(proxies)
+            if self.metrics is not None:
+                started = self.metrics.request_started(MOBILE_SERP_ENDPOINT)
+            response = await self._get_baidum_serp(keyword, date_range, pn, proxies, random_params, need_ext_recommend, cookies, keep_alive)
+        except BaseException as e:
+            # 请求被取消时释放熔断器的半开试探名额
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.report(MOBILE_SERP_ENDPOINT, proxies, None)
+            if started is not None:
+                self.metrics.request_finished(MOBILE_SERP_ENDPOINT, proxies, None, started)
+            if span is not None:
+                self.hooks.fail_request(span, e)
+            raise
+        code = response_code(response)
+        if self.proxy_pool is not None:
+            self.proxy_pool.report_response(proxies, response)
+        if self.rate_limiter is not None:
+            self.rate_limiter.report(proxies, code)
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.report(MOBILE_SERP_ENDPOINT, proxies, code)
+        if self.metrics is not None:
+            self.metrics.request_finished(MOBILE_SERP_ENDPOINT, proxies, code, started)
+        if span is not None:
+            self.hooks.finish_request(span, response)
+        return response
+
+    async def _get_baidum_serp(self, keyword, date_range, pn, proxies, random_params, need_ext_recommend=False, cookies=None, keep_alive=None):
+        url, params, headers = self._build_serp_request(keyword, date_range, pn, random_params, cookies)
+        self._apply_connection_header(headers, proxies, keep_alive)
+        timer = PhaseTimer()
+        try:
+            start_time = time.time()
+            status_code, response_headers, body, _, aborted = await self._fetch(url, params, headers, proxies, self.STREAM_ABORT_MARKERS, timer)
+            response_time = time.time() - start_time
+        except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+            return map_aiohttp_error(e)
+        if aborted:
+            return aborted
+
+        decode_start = time.perf_counter()
+        content = body.decode('utf-8', errors='replace')
+        timer.add('decode', time.perf_counter() - decode_start)
+        response = {
+            'content': content,
+            'response_time': response_time,
+            'status_code': status_code,
+            'timings': timer
+        }
+        ext_recommend = None
+        if need_ext_recommend:
+            qid = response_headers.get('qid', None)
+            ext_recommend = self.submit_ext_recommend(keyword, qid, random_params, proxies, cookies, keep_alive) if self._should_fetch_ext_recommend(qid, content) else None
+        await self._archive_page('mobile', keyword, pn, date_range, response)
+        if need_ext_recommend:
+            return response, ext_recommend
+        return response
+
+    async def search(self, keyword, date_range=None, pn=None, proxies=None, exclude=None, include_performance=False, bypass_cache=False):
+        exclude = self._resolve_exclude(exclude)
+
+        if self.cache is None:
+            result = await self._search(keyword, date_range, pn, proxies, include_performance, exclude)
+        else:
+            cache_key = make_cache_key('mobile', keyword, pn, date_range, exclude)
+            result = await acached_call(
+                self.cache, cache_key, lambda: self._search(keyword, date_range, pn, proxies, include_performance, exclude),
+                include_performance, bypass_cache, lambda result: self._is_cacheable(result, pn), metrics=self.metrics,
+            )
+        if self.metrics is not None:
+            self.metrics.record_result('mobile', result.get('code'))
+        return result
+
+    async def _search(self, keyword, date_range, pn, proxies, include_performance, exclude):
+        need_ext_recommend = (pn is None or pn == 1) and 'ext_recommend' not in exclude
+
+        async with self._semaphore:
+            fingerprint_start = time.perf_counter()
+            random_params, cookies = self._new_fingerprint()
+            fingerprint_time = time.perf_counter() - fingerprint_start
+            if self.hedge_policy is None:
+                result = await self.get_baidum_serp(keyword.strip(), date_range, pn, proxies, random_params, need_ext_recommend, cookies=cookies)
+            else:
+                result = await self._hedged_baidum_serp(keyword.strip(), date_range, pn, proxies, random_params, need_ext_recommend, cookies)
+
+        if isinstance(result, dict) and 'code' in result:
+            return result
+
+        if isinstance(result, tuple):
+            response, ext_recommend = result
+        else:
+            response, ext_recommend = result, None
+        add_phase(response, 'fingerprint', fingerprint_time)
+
+        parse_start = time.perf_counter()
+        result = await self._parse_with_ext_recommend(response, keyword.strip(), ext_recommend, pn, include_performance, exclude)
+        if self.hooks is not None:
+            self.hooks.parse_complete(MOBILE_SERP_ENDPOINT, keyword.strip(), pn, result, parse_start)
+        return result
+
+    async def _hedged_baidum_serp(self, keyword, date_range, pn, proxies, random_params, need_ext_recommend, cookies):
+        """对冲请求的异步版本，落后的请求会被直接取消"""
+        if self.proxy_pool is not None:
+            proxies = proxies or self.proxy_pool.select()
+
+        async def _primary():
+            return await self.get_baidum_serp(keyword, date_range, pn, proxies, random_params, need_ext_recommend, cookies=cookies)
+
+        async def _hedge():
+            hedge_proxies = self._failover_proxies([proxies] if proxies else []) or proxies
+            hedge_params, hedge_cookies = self._new_fingerprint()
+            return await self.get_baidum_serp(keyword, date_range, pn, hedge_proxies, hedge_params, need_ext_recommend, cookies=hedge_cookies)
+
+        return await ahedged_call(self.hedge_policy, _primary, _hedge)
+
+    async def iter_pages(self, keyword, max_pages=5, date_range=None, proxies=None, exclude=None, include_performance=False, start_page=1):
+        """iter_pages 的异步版本，以异步生成器方式逐页产出 (pn, result)"""
+        exclude = self._resolve_exclude(exclude)
+
+        keyword = keyword.strip()
+        random_params, cookies = self._new_fingerprint()
+
+        for pn in range(start_page, start_page + max_pages):
+            need_ext_recommend = pn == 1 and 'ext_recommend' not in exclude
+            async with self._semaphore:
+                result = await self.get_baidum_serp(
+                    keyword, date_range, pn, proxies, random_params, need_ext_recommend, cookies=cookies, keep_alive=True
+                )
+            if isinstance(result, dict) and 'code' in result:
+                yield pn, result
+                return
+
+            if isinstance(result, tuple):
+                response, ext_recommend = result
+            else:
+                response, ext_recommend = result, None
+
+            page_result = await self._parse_with_ext_recommend(response, keyword, ext_recommend, pn, include_performance, exclude)
+            yield pn, page_result
+
+            if page_result.get('code') != 200 or self.is_last_page(response['content']):
+                return
+
+    async def search_top_n(self, keyword, n=50, date_range=None, proxies=None, exclude=None, include_performance=False):
+        """search_top_n 的异步版本，超出实际最后一页的请求会被直接取消"""
+        exclude = self._resolve_exclude(exclude)
+
+        keyword = keyword.strip()
+        random_params, cookies = self._new_fingerprint()
+
+        async def _fetch_page(pn):
+            need_ext_recommend = pn == 1 and 'ext_recommend' not in exclude
+            async with self._semaphore:
+                result = await self.get_baidum_serp(keyword, date_range, pn, proxies, random_params, need_ext_recommend, cookies=cookies)
+            if isinstance(result, dict) and 'code' in result:
+                return result, False
+            if isinstance(result, tuple):
+                response, ext_recommend = result
+            else:
+                response, ext_recommend = result, None
+            page_result = await self._parse_with_ext_recommend(response, keyword, ext_recommend, pn, include_performance, exclude)
+            return page_result, page_result.get('code') in (404, 405) or self.is_last_page(response['content'])
+
+        page_results = await afan_out_pages(_fetch_page, range(1, math.ceil(n / 10) + 1))
+        return merge_page_results(page_results, keyword, n)
+
+    def submit_ext_recommend(self, keyword, qid, random_params, proxies, cookies=None, keep_alive=None):
+        """创建获取扩展推荐词的后台任务，与HTML解析并行执行"""
+        task = asyncio.ensure_future(self.get_ext_recommend(keyword, qid, random_params, proxies, cookies, keep_alive))
+        task.deadline = asyncio.get_running_loop().time() + self.ext_recommend_timeout
+        return task
+
+    async def _parse_with_ext_recommend(self, response, keyword, ext_recommend, pn, include_performance, exclude):
+        """解析HTML的同时等待扩展推荐词，超过截止时间则 ext_recommend 为 None"""
+        result = await self._run_parse(self._parse_response, response, keyword, None, pn, include_performance, exclude)
+        if isinstance(ext_recommend, asyncio.Future) and result.get('code') != 200:
+            ext_recommend.cancel()
+        elif isinstance(ext_recommend, asyncio.Future):
+            ext_start = time.perf_counter()
+            try:
+                timeout = max(0, ext_recommend.deadline - asyncio.get_running_loop().time())
+                ext_recommend = await asyncio.wait_for(ext_recommend, timeout)
+            except asyncio.TimeoutError:
+                ext_recommend = None
+            # 性能数据已在解析时生成，解析完成后等待 /rec 接口的时间直接补充到 phases
+            phases = result.get('data', {}).get('performance', {}).get('phases')
+            if phases is not None:
+                phases['ext_recommend'] = round(time.perf_counter() - ext_start, 4)
+        if result.get('code') == 200 and 'ext_recommend' in result['data']:
+            result['data']['ext_recommend'] = ext_recommend
+        return result
+
+    def _parse_response(self, response, keyword, ext_recommend, pn, include_performance, exclude):
+        return self.handle_response(response, keyword, None, ext_recommend, pn, include_performance, exclude)
@@ -1,21 +1,66 @@
 import requests
-from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
-from bs4 import BeautifulSoup
 import json
 from datetime import datetime
-from .util import gen_random_params, clean_html_tags, convert_date_format, gen_mobile_cookies
+from .proxy import ProxySessionRegistry
+from .ratelimit import response_code
+from .breaker import MOBILE_SERP_ENDPOINT, MOBILE_REC_ENDPOINT
+from .hedge import hedged_call, hedge_executor
+from .metrics import resolve_metrics
+from .timing import PhaseTimer, TimedHTTPAdapter, add_phase, performance_details, wire_bytes
+from .cache import make_cache_key, cached_call
+from .batch import imap_bounded, fan_out_pages, merge_page_results
+from .parsers import parse_html, PARSERS
+from .util import gen_random_params, clean_html_tags, convert_date_format, gen_mobile_cookies, MarkerScanner
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
 import certifi
+import math
 import time
 
 class BaiduMobile:
     
-    def __init__(self, connect_timeout=5, read_timeout=10, max_retries=0, pool_connections=1, pool_maxsize=1, keep_alive=False, connection_mode='single'):
+    def __init__(self, connect_timeout=5, read_timeout=10, max_retries=0, pool_connections=1, pool_maxsize=1, keep_alive=False, connection_mode='single', ext_recommend_timeout=3, parser='html.parser', targeted_parse=False, stream_download=False, stream_chunk_size=16384, cache=None, archive=None, fingerprint_pool=None, proxy_pools=False, max_proxy_pools=32, proxy_idle_timeout=300, rotating_proxies=(), proxy_pool=None, rate_limiter=None, retry_policy=None, circuit_breaker=None, hedge_policy=None, base_url=None, metrics=None, hooks=None):
         self.exclude = []
         self.connect_timeout = connect_timeout
         self.read_timeout = read_timeout 
         self.max_retries = max_retries
         self.connection_mode = connection_mode
+        if parser not in PARSERS:
+            raise ValueError(f"不支持的解析后端: {parser}，可选值: {', '.join(PARSERS)}")
+        # HTML解析后端：html.parser（默认）、lxml 或 selectolax
+        self.parser = parser
+        # 定向解析：只为结果容器和推荐词元素构建节点树，跳过脚本、样式等其余内容
+        self.targeted_parse = targeted_parse
+        # 扩展推荐词接口的独立截止时间（秒），超时则返回 ext_recommend: None
+        self.ext_recommend_timeout = ext_recommend_timeout
+        # 流式下载：边下载边检查验证码/无结果标记，命中后立即断开连接
+        self.stream_download = stream_download
+        self.stream_chunk_size = stream_chunk_size
+        # 结果缓存：SerpCache 或 SqliteCache 实例，只缓存 code == 200 的 search() 结果，可在多个实例间共享
+        self.cache = cache
+        # 原始HTML存档：HtmlArchive 实例，保存每个成功响应的页面内容，供 reparse() 离线重新解析
+        self.archive = archive
+        # 指纹池：FingerprintPool 实例，搜索时直接取出预生成的Cookie和随机参数
+        if fingerprint_pool is not None and fingerprint_pool.device != 'mobile':
+            raise ValueError(f"指纹池设备类型不匹配: {fingerprint_pool.device}，应为 mobile")
+        self.fingerprint_pool = fingerprint_pool
+        # 代理池：ProxyPool 实例，search() 未指定proxies时按代理健康度加权选择
+        self.proxy_pool = proxy_pool
+        # 限流器：RateLimiter 实例，按自适应令牌桶速率发送请求，可在多个实例间共享
+        self.rate_limiter = rate_limiter
+        # 重试策略：RetryPolicy 实例，按错误码重试，可切换代理和指纹
+        self.retry_policy = retry_policy
+        # 熔断器：CircuitBreaker 实例，代理或接口连续失败后直接返回524，不再等待超时
+        self.circuit_breaker = circuit_breaker
+        # 对冲请求：HedgePolicy 实例，search() 的请求过慢时经其他代理和新指纹再发一个请求
+        self.hedge_policy = hedge_policy
+        # 请求地址：默认 https://m.baidu.com，可指向本地模拟服务器（MockBaiduServer）离线压测，请求头中的Host保持不变
+        self.base_url = (base_url or 'https://m.baidu.com').rstrip('/')
+        # 指标：默认不记录，True 记录到进程内共享的 default_metrics，也可传入自己的 MetricsCollector
+        self.metrics = resolve_metrics(metrics)
+        # 请求生命周期回调：Hooks 实例，不传时没有额外开销
+        self.hooks = hooks
         
         # 根据连接模式设置参数
         if connection_mode == 'single':
@@ -36,34 +81,76 @@ class BaiduMobile:
             
         self._session = None
         self._setup_session()
+        # 按代理连接池：每个固定代理使用独立的长连接Session，rotating_proxies 中的轮换代理仍使用 Connection: close
+        self._proxy_sessions = None
+        if proxy_pools:
+            self._proxy_sessions = ProxySessionRegistry(self._new_session, max_proxy_pools, proxy_idle_timeout, rotating_proxies)
+        self._setup_executors()
+        if self.metrics is not None:
+            self.metrics.register(self)
     
     def _setup_session(self):
         """设置Session和连接池配置"""
-        self._session = requests.Session()
+        self._session = self._new_session()
+
+    def _setup_executors(self):
+        """创建后台线程池：扩展推荐词在后台线程中获取，与HTML解析并行；对冲请求在后台线程中并行发送"""
+        self._ext_executor = ThreadPoolExecutor(max_workers=max(4, self.pool_maxsize), thread_name_prefix='ext_recommend')
+        self._hedge_executor = hedge_executor() if self.hedge_policy is not None else None
+
+    def _new_session(self):
+        """按连接池配置创建Session，按代理连接池也使用相同的配置"""
+        session = requests.Session()
         
         # 配置重试策略
         retry_strategy = Retry(
             total=self.max_retries,
             status_forcelist=[429, 500, 502, 503, 504],
             allowed_methods=["HEAD", "GET", "OPTIONS"],
-            backoff_factor=0.3
+            backoff_factor=0.3,
+            # 重试用尽后返回最后的响应，由 raise_for_status 映射为 521/522，而不是抛出 RetryError
+            raise_on_status=False
         )
         
-        # 配置HTTP适配器
-        adapter = HTTPAdapter(
+        # 配置HTTP适配器，使用可记录DNS、连接、TLS等阶段耗时的连接
+        adapter = TimedHTTPAdapter(
             max_retries=retry_strategy,
             pool_connections=self.pool_connections,
             pool_maxsize=self.pool_maxsize
         )
         
-        self._session.mount("http://", adapter)
-        self._session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    @contextmanager
+    def _session_for(self, proxies):
+        """with 语句中返回发送请求使用的Session：开启 proxy_pools 时固定代理使用各自的连接池，使用期间不会被淘汰关闭"""
+        if self._proxy_sessions is None or not proxies or self._proxy_sessions.is_rotating(proxies):
+            yield self._session
+            return
+        with self._proxy_sessions.session(proxies) as session:
+            yield session
+
+    def mark_rotating(self, proxy_url, rotating=True):
+        """标记轮换代理：每次请求出口IP都会变化，不复用连接"""
+        if self._proxy_sessions is not None:
+            self._proxy_sessions.mark_rotating(proxy_url, rotating)
     
     def close(self):
         """关闭Session释放资源"""
-        if self._session:
+        if getattr(self, '_session', None):
             self._session.close()
             self._session = None
+        if getattr(self, '_proxy_sessions', None):
+            self._proxy_sessions.close()
+            self._proxy_sessions = None
+        if getattr(self, '_ext_executor', None):
+            self._ext_executor.shutdown(wait=False, cancel_futures=True)
+            self._ext_executor = None
+        if getattr(self, '_hedge_executor', None):
+            self._hedge_executor.shutdown(wait=False, cancel_futures=True)
+            self._hedge_executor = None
     
     def __del__(self):
         """析构函数，确保资源正确释放"""
@@ -77,14 +164,29 @@ class BaiduMobile:
         """上下文管理器出口"""
         self.close()
 
+    def parse_baidum_page(self, html_content, keyword, pn, need_recommend=True):
+        """单次解析：只构建一次DOM树，同时得到搜索结果、match_count、推荐词和last_page"""
+        root = parse_html(html_content, self.parser, self.targeted_parse)
+        search_results, match_count = self._extract_results(root, keyword, pn)
+        return {
+            'results': search_results,
+            'match_count': match_count,
+            'recommend': self._extract_recommend(root) if need_recommend else [],
+            'last_page': self.is_last_page(html_content),
+        }
+
     def extract_baidum_data(self, html_content, keyword, pn):
+        root = parse_html(html_content, self.parser, self.targeted_parse)
+        return self._extract_results(root, keyword, pn)
+
+    def _extract_results(self, root, keyword, pn):
+        """从已解析的节点树中提取搜索结果，只依赖 parsers 模块定义的节点接口"""
         match_count = 0
         search_data = []
-        soup = BeautifulSoup(html_content, 'html.parser')
-        search_results = soup.select('div[tpl="www_index"], div[tpl="www_struct"]')
+        search_results = root.select('div[tpl="www_index"], div[tpl="www_struct"]')
         
         for result in search_results:
-            title_element = result.find('p', class_='cu-title')
+            title_element = result.select_one('p.cu-title')
 
             url = result.get('data-log')
             if url:
@@ -101,7 +203,7 @@ class BaiduMobile:
             if summary_element:
                 description = clean_html_tags(summary_element.get_text().strip())
 
-                date_time_element = summary_element.find('span', class_='c-gap-right-small c-color-gray')
+                date_time_element = summary_element.select_one('span[class="c-gap-right-small c-color-gray"]')
                 if date_time_element:
                     description = description.replace(date_time_element.get_text().strip(), '')
                     date_time = date_time_element.get_text().strip()
@@ -120,14 +222,18 @@ class BaiduMobile:
         return search_data, match_count
 
     def get_recommend(self, response):
-        soup = BeautifulSoup(response, 'html.parser')
-        page_rcmd = [elem.get_text() for elem in soup.select('a.c-fwb, span.c-fwb')]
+        root = parse_html(response, self.parser, self.targeted_parse)
+        return self._extract_recommend(root)
+
+    def _extract_recommend(self, root):
+        page_rcmd = [elem.get_text() for elem in root.select('a.c-fwb, span.c-fwb')]
         # 对page_rcmd进行排重
         recommend = list(set(page_rcmd))
         return recommend
 
-    def get_ext_recommend(self, keyword, qid, random_params, proxies):
-        url = 'https://m.baidu.com/rec'
+    def _build_ext_recommend_request(self, keyword, qid, random_params, cookies=None):
+        """构造扩展推荐词接口的URL、查询参数和请求头"""
+        url = f'{self.base_url}/rec'
         params = {
             'word': keyword,
             'platform': 'wise',
@@ -145,7 +251,7 @@ class BaiduMobile:
         }
         
         # 生成移动端Cookie用于推荐接口，传入random_params确保某些值一致
-        mobile_cookies = gen_mobile_cookies(random_params)
+        mobile_cookies = cookies or gen_mobile_cookies(random_params)
         
         headers = {
             'Accept': 'application/json, text/plain, */*',
@@ -160,49 +266,120 @@ class BaiduMobile:
             'sec-ch-ua-mobile': '?1',
             'sec-ch-ua-platform': '"Android"'
         }
+        return url, params, headers
+
+    def parse_ext_recommend(self, json_data):
+        """解析扩展推荐词接口返回的JSON"""
+        # 获取所有键名为'up'和'down'的值
+        up_values = []
+        down_values = []
+        if json_data['errcode'] != 0:
+            return []
+        for item in json_data['rs']['rcmd']['list']:
+            up_values.extend(item['up'])
+            down_values.extend(item['down'])
+
+        # 排重并合并为新的列表
+        return list(set(up_values + down_values))
+
+    def get_ext_recommend(self, keyword, qid, random_params, proxies, cookies=None, keep_alive=None):
+        # 推荐词接口熔断时直接返回空列表，接口的失败只计入接口本身，不计入代理
+        if self.circuit_breaker is not None and self.circuit_breaker.allow(MOBILE_REC_ENDPOINT) is not None:
+            return []
+        url, params, headers = self._build_ext_recommend_request(keyword, qid, random_params, cookies)
+        code = None
+        started = self.metrics.request_started(MOBILE_REC_ENDPOINT) if self.metrics is not None else None
+        span = self.hooks.start_request(MOBILE_REC_ENDPOINT, keyword, None, proxies) if self.hooks is not None else None
         try:
-            # 智能连接管理：根据代理使用情况自动调整
-            should_close_connection = not self.keep_alive
-            if proxies and self.connection_mode != 'custom':
-                # 使用代理时强制关闭连接，避免代理轮换时的连接复用问题
-                should_close_connection = True
-            
-            # 动态设置Connection头
-            if should_close_connection:
-                headers["Connection"] = "close"
-            else:
-                headers.pop("Connection", None)
-                
-            response = self._session.get(
-                url,
-                headers=headers,
-                params=params,
-                proxies=proxies,
-                timeout=(self.connect_timeout, self.read_timeout),
-                verify=certifi.where()
-            )
+            self._apply_connection_header(headers, proxies, keep_alive)
+
+            with self._session_for(proxies) as session:
+                response = session.get(
+                    url,
+                    headers=headers,
+                    params=params,
+                    proxies=proxies,
+                    timeout=(self.connect_timeout, self.read_timeout),
+                    verify=certifi.where()
+                )
             response.raise_for_status()
             response.encoding = 'utf-8'
-            json_data = response.json()
-            # 获取所有键名为'up'和'down'的值
-            up_values = []
-            down_values = []
-            if json_data['errcode'] != 0:
-                return []
-            else: 
-                for item in json_data['rs']['rcmd']['list']:
-                    up_values.extend(item['up'])
-                    down_values.extend(item['down'])
-
-                # 排重并合并为新的列表
-                ext_recommend = list(set(up_values + down_values))
-                return ext_recommend
+            code = 200
+            return self.parse_ext_recommend(response.json())
+        except requests.exceptions.Timeout:
+            code = 504
+            return []
         except requests.exceptions.RequestException:
             # 推荐词获取失败时返回空列表，不影响主搜索功能
+            code = code or 519
             return []
+        finally:
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.report(MOBILE_REC_ENDPOINT, None, code)
+            if started is not None:
+                self.metrics.request_finished(MOBILE_REC_ENDPOINT, proxies, code, started)
+            if span is not None:
+                if code is None:
+                    self.hooks.fail_request(span, None)
+                else:
+                    self.hooks.finish_request(span, {'code': code})
+
+    def submit_ext_recommend(self, keyword, qid, random_params, proxies, cookies=None, keep_alive=None):
+        """在后台线程中获取扩展推荐词，返回Future，由 resolve_ext_recommend 在截止时间内取结果"""
+        future = self._ext_executor.submit(self.get_ext_recommend, keyword, qid, random_params, proxies, cookies, keep_alive)
+        future.deadline = time.time() + self.ext_recommend_timeout
+        return future
+
+    def resolve_ext_recommend(self, ext_recommend):
+        """等待后台的扩展推荐词结果，超过截止时间返回None，不阻塞主搜索"""
+        if not isinstance(ext_recommend, Future):
+            return ext_recommend
+        try:
+            return ext_recommend.result(timeout=max(0, ext_recommend.deadline - time.time()))
+        except FutureTimeoutError:
+            ext_recommend.cancel()
+            return None
+
+    def cancel_ext_recommend(self, ext_recommend):
+        """页面无需扩展推荐词（验证码、无结果）时取消后台请求，已经开始的同步请求无法中断"""
+        if isinstance(ext_recommend, Future):
+            ext_recommend.cancel()
+
+    def _should_fetch_ext_recommend(self, qid, content):
+        """验证码和无结果页面不再请求扩展推荐词接口"""
+        return bool(qid) and not any(marker in content for marker in self.STREAM_ABORT_MARKERS)
 
-    def get_baidum_serp(self, keyword, date_range, pn, proxies, random_params, need_ext_recommend=False):
-        url = 'https://m.baidu.com/s'
+    def _apply_connection_header(self, headers, proxies, keep_alive=None):
+        """智能连接管理：根据代理使用情况动态设置Connection头，keep_alive可强制覆盖"""
+        should_close_connection = not self.keep_alive
+        if keep_alive is not None:
+            should_close_connection = not keep_alive
+        elif proxies and self.connection_mode != 'custom':
+            # 使用代理时强制关闭连接，避免代理轮换时的连接复用问题；开启 proxy_pools 时只对轮换代理关闭
+            should_close_connection = self._proxy_sessions is None or self._proxy_sessions.is_rotating(proxies)
+
+        if should_close_connection:
+            headers["Connection"] = "close"
+        else:
+            headers.pop("Connection", None)
+        return headers
+
+    def _new_fingerprint(self):
+        """返回一组 (random_params, cookies)，配置了指纹池时直接取出预生成的指纹"""
+        if self.fingerprint_pool is not None:
+            return self.fingerprint_pool.pop()
+        random_params = gen_random_params()
+        return random_params, gen_mobile_cookies(random_params)
+
+    def _failover_proxies(self, tried):
+        """重试时从代理池中选择一个未尝试过的代理，没有代理池时继续使用原代理"""
+        if self.proxy_pool is None:
+            return None
+        return self.proxy_pool.select(exclude=tried)
+
+    def _build_serp_request(self, keyword, date_range, pn, random_params, cookies=None):
+        """构造移动端搜索请求的URL、查询参数和请求头"""
+        url = f'{self.base_url}/s'
         params = {
             'word': keyword,
             'ts': '0',
@@ -230,7 +407,7 @@ class BaiduMobile:
             params['pn'] = str((int(pn) - 1) * 10)
             
         # 生成移动端Cookie，传入random_params确保某些值一致
-        mobile_cookies = gen_mobile_cookies(random_params)
+        mobile_cookies = cookies or gen_mobile_cookies(random_params)
         
         headers = {
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
@@ -250,33 +427,123 @@ class BaiduMobile:
             'sec-ch-ua-mobile': '?1',
             'sec-ch-ua-platform': '"Android"'
         }
+        return url, params, headers
+
+    # 流式下载时提前终止的标记及对应的返回结果
+    STREAM_ABORT_MARKERS = {
+        '百度安全验证': {'code': 501, 'msg': '百度M安全验证'},
+        '未找到相关结果': {'code': 404, 'msg': '未找到相关结果'},
+    }
+
+    def _read_streaming(self, response):
+        """逐块读取响应体，命中验证码/无结果标记时关闭连接并返回对应错误，不再下载剩余内容"""
+        scanner = MarkerScanner(self.STREAM_ABORT_MARKERS)
+        for chunk in response.iter_content(chunk_size=self.stream_chunk_size):
+            marker = scanner.feed(chunk)
+            if marker:
+                response.close()
+                return None, self.STREAM_ABORT_MARKERS[marker.decode('utf-8')]
+        return scanner.body, None
+
+    def get_baidum_serp(self, keyword, date_range, pn, proxies, random_params, need_ext_recommend=False, cookies=None, keep_alive=None):
+        """
+        配置了代理池时，未指定proxies则从池中选择代理
+        配置了重试策略时按错误码重试，重试前可切换代理和更换指纹
+        """
+        if self.proxy_pool is not None:
+            proxies = proxies or self.proxy_pool.select()
+        if self.retry_policy is None:
+            return self._send_baidum_serp(keyword, date_range, pn, proxies, random_params, need_ext_recommend, cookies, keep_alive)
+        return self.retry_policy.call(
+            lambda proxies, fingerprint: self._send_baidum_serp(keyword, date_range, pn, proxies, fingerprint[0], need_ext_recommend, fingerprint[1], keep_alive),
+            proxies, (random_params, cookies), self._new_fingerprint, self._failover_proxies,
+            self.hooks.retry if self.hooks is not None else None,
+        )
+
+    def _send_baidum_serp(self, keyword, date_range, pn, proxies, random_params, need_ext_recommend=False, cookies=None, keep_alive=None):
+        """
+        发送一次请求：熔断器打开时直接返回524，配置了限流器时按令牌桶速率发送，
+        并把请求结果反馈给代理池、限流器和熔断器，记录指标并调用生命周期回调
+        """
+        if self.proxy_pool is None and self.rate_limiter is None and self.circuit_breaker is None and self.metrics is None and self.hooks is None:
+            return self._get_baidum_serp(keyword, date_range, pn, proxies, random_params, need_ext_recommend, cookies, keep_alive)
+        span = self.hooks.start_request(MOBILE_SERP_ENDPOINT, keyword, pn, proxies) if self.hooks is not None else None
+        if self.circuit_breaker is not None:
+            rejected = self.circuit_breaker.allow(MOBILE_SERP_ENDPOINT, proxies)
+            if rejected is not None:
+                if self.metrics is not None:
+                    self.metrics.observe(MOBILE_SERP_ENDPOINT, proxies, 524)
+                response = {'code': 524, 'msg': f'熔断器打开: {rejected}'}
+                if span is not None:
+                    self.hooks.finish_request(span, response)
+                return response
+        started = None
+        try:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(proxies)
+            if self.metrics is not None:
+                started = self.metrics.request_started(MOBILE_SERP_ENDPOINT)
+            response = self._get_baidum_serp(keyword, date_range, pn, proxies, random_params, need_ext_recommend, cookies, keep_alive)
+        except BaseException as e:
+            # 请求被取消时释放熔断器的半开试探名额
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.report(MOBILE_SERP_ENDPOINT, proxies, None)
+            if started is not None:
+                self.metrics.request_finished(MOBILE_SERP_ENDPOINT, proxies, None, started)
+            if span is not None:
+                self.hooks.fail_request(span, e)
+            raise
+        code = response_code(response)
+        if self.proxy_pool is not None:
+            self.proxy_pool.report_response(proxies, response)
+        if self.rate_limiter is not None:
+            self.rate_limiter.report(proxies, code)
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.report(MOBILE_SERP_ENDPOINT, proxies, code)
+        if self.metrics is not None:
+            self.metrics.request_finished(MOBILE_SERP_ENDPOINT, proxies, code, started)
+        if span is not None:
+            self.hooks.finish_request(span, response)
+        return response
+
+    def _get_baidum_serp(self, keyword, date_range, pn, proxies, random_params, need_ext_recommend=False, cookies=None, keep_alive=None):
+        url, params, headers = self._build_serp_request(keyword, date_range, pn, random_params, cookies)
         try:
             start_time = time.time()
-            
-            # 智能连接管理：根据代理使用情况自动调整
-            should_close_connection = not self.keep_alive
-            if proxies and self.connection_mode != 'custom':
-                # 使用代理时强制关闭连接，避免代理轮换时的连接复用问题
-                should_close_connection = True
-            
-            # 动态设置Connection头
-            if should_close_connection:
-                headers["Connection"] = "close"
-            else:
-                headers.pop("Connection", None)
-            
-            response = self._session.get(
-                url, 
-                headers=headers, 
-                params=params, 
-                proxies=proxies, 
-                timeout=(self.connect_timeout, self.read_timeout), 
-                verify=certifi.where()
-            )
-            response.raise_for_status()
-            response.encoding = 'utf-8'
-            
-            response_time = time.time() - start_time
+            self._apply_connection_header(headers, proxies, keep_alive)
+
+            with PhaseTimer() as timer, self._session_for(proxies) as session:
+                response = session.get(
+                    url, 
+                    headers=headers, 
+                    params=params, 
+                    proxies=proxies, 
+                    timeout=(self.connect_timeout, self.read_timeout), 
+                    verify=certifi.where(),
+                    stream=self.stream_download
+                )
+
+                response_time = time.time() - start_time
+                # 流式下载时状态码错误或读取中途出错也要关闭响应，把连接归还连接池或断开
+                try:
+                    response.raise_for_status()
+                    response.encoding = 'utf-8'
+
+                    if self.stream_download:
+                        body, aborted = self._read_streaming(response)
+                        response_time = time.time() - start_time
+                        if aborted:
+                            return aborted
+                    else:
+                        body = response.content
+                finally:
+                    if self.stream_download:
+                        response.close()
+            timer.finish_download(wire_bytes(response), len(body))
+
+            decode_start = time.perf_counter()
+            content = body.decode('utf-8', errors='replace') if self.stream_download else response.text
+            timer.add('decode', time.perf_counter() - decode_start)
             
             # # 检查302重定向到验证码页面
             # if response.status_code == 302:
@@ -288,20 +555,22 @@ class BaiduMobile:
             # if 'wappass.baidu.com/static/captcha' in response.text:
             #     return {"code": 501, "msg": "百度M安全验证"}
 
+            result = {
+                'content': content,
+                'response_time': response_time,
+                'status_code': response.status_code,
+                'timings': timer
+            }
+            ext_recommend = None
             if need_ext_recommend:
                 qid = response.headers.get('qid', None)
-                ext_recommend = self.get_ext_recommend(keyword, qid, random_params, proxies) if qid else None
-                return {
-                    'content': response.text,
-                    'response_time': response_time,
-                    'status_code': response.status_code
-                }, ext_recommend
-            else:
-                return {
-                    'content': response.text,
-                    'response_time': response_time,
-                    'status_code': response.status_code
-                }
+                # 扩展推荐词请求与后续HTML解析并行执行
+                ext_recommend = self.submit_ext_recommend(keyword, qid, random_params, proxies, cookies, keep_alive) if self._should_fetch_ext_recommend(qid, content) else None
+            if self.archive is not None:
+                self.archive.save('mobile', keyword, pn, date_range, result)
+            if need_ext_recommend:
+                return result, ext_recommend
+            return result
             
         except requests.exceptions.ChunkedEncodingError:
             return {'code': 502, 'msg': '响应提前结束'}
@@ -346,7 +615,7 @@ class BaiduMobile:
             else:
                 return {'code': 519, 'msg': f'连接错误: {str(e)}'}
         except requests.exceptions.HTTPError as e:
-            status_code = e.response.status_code if e.response else 0
+            status_code = e.response.status_code if e.response is not None else 0
             if status_code == 403:
                 return {'code': 520, 'msg': '访问被禁止(403)'}
             elif status_code == 429:
@@ -359,7 +628,13 @@ class BaiduMobile:
             return {'code': 500, 'msg': f'请求异常: {str(e)}'}
 
 
-    def handle_response(self, response, keyword, recommend, ext_recommend, pn, include_performance=False):
+    def is_last_page(self, html_content):
+        return 'new-nextpage' not in html_content
+
+    def handle_response(self, response, keyword, recommend, ext_recommend, pn, include_performance=False, exclude=None):
+        # exclude 为本次调用排除的字段，未传入时使用 self.exclude
+        if exclude is None:
+            exclude = self.exclude
         if isinstance(response, dict) and 'content' in response:
             html_content = response['content']
             response_time = response.get('response_time', 0)
@@ -367,12 +642,20 @@ class BaiduMobile:
             
             # 检查百度安全验证 - 包括原有逻辑和验证码URL检测
             if ('百度安全验证' in html_content):
+                self.cancel_ext_recommend(ext_recommend)
                 return {'code': 501, 'msg': '百度M安全验证'}
             if '未找到相关结果' in html_content:
+                self.cancel_ext_recommend(ext_recommend)
                 return {'code': 404, 'msg': '未找到相关结果'}
             
             # 提前执行数据提取以便进行准确判断
-            search_results, match_count = self.extract_baidum_data(html_content, keyword, pn)
+            # 单次解析同时得到结果和推荐词，recommend为None时使用页面中提取的推荐词，解析耗时统一计入 parse
+            parse_start = time.perf_counter()
+            page = self.parse_baidum_page(html_content, keyword, pn, need_recommend=recommend is None and 'recommend' not in exclude)
+            add_phase(response, 'parse', time.perf_counter() - parse_start)
+            search_results, match_count = page['results'], page['match_count']
+            if recommend is None:
+                recommend = page['recommend']
             
             # 检查是否有搜索结果（基于实际提取的数据）
             if (
@@ -380,14 +663,21 @@ class BaiduMobile:
                 and 'site:' not in keyword
                 and not keyword.startswith(('http://', 'https://', 'www.', 'm.'))
             ):
+                self.cancel_ext_recommend(ext_recommend)
                 return {'code': 405, 'msg': '无搜索结果'}
             
             
+            # 扩展推荐词与解析并行获取，这里只计入解析完成后仍需等待的时间
+            ext_start = time.perf_counter()
+            resolved_ext_recommend = self.resolve_ext_recommend(ext_recommend)
+            if ext_recommend is not None:
+                add_phase(response, 'ext_recommend', time.perf_counter() - ext_start)
+
             data = {
                 'results': search_results,
                 'recommend': recommend,
-                'ext_recommend': ext_recommend,
-                'last_page': 'new-nextpage' not in html_content,
+                'ext_recommend': resolved_ext_recommend,
+                'last_page': self.is_last_page(html_content),
                 'match_count': match_count
             }
             
@@ -397,54 +687,93 @@ class BaiduMobile:
                     "response_time": round(response_time, 3),
                     "status_code": status_code
                 }
+                if 'attempts' in response:
+                    data["performance"]["attempts"] = response['attempts']
+                data["performance"].update(performance_details(response))
             
-            keys_to_delete = [key for key in self.exclude]
+            keys_to_delete = [key for key in exclude]
             for key in keys_to_delete:
                 del data[key]
             return {'code': 200, 'msg': 'ok', 'data': data}
         elif isinstance(response, str):
             # 兼容旧格式
             if ('百度安全验证' in response):
+                self.cancel_ext_recommend(ext_recommend)
                 return {'code': 501, 'msg': '百度M安全验证'}
             if '未找到相关结果' in response:
+                self.cancel_ext_recommend(ext_recommend)
                 return {'code': 404, 'msg': '未找到相关结果'}
             
-            search_results, match_count = self.extract_baidum_data(response, keyword, pn)
+            # 单次解析同时得到结果和推荐词，recommend为None时使用页面中提取的推荐词
+            page = self.parse_baidum_page(response, keyword, pn, need_recommend=recommend is None and 'recommend' not in exclude)
+            search_results, match_count = page['results'], page['match_count']
+            if recommend is None:
+                recommend = page['recommend']
             
             if (
                 not search_results
                 and 'site:' not in keyword
                 and not keyword.startswith(('http://', 'https://', 'www.', 'm.'))
             ):
+                self.cancel_ext_recommend(ext_recommend)
                 return {'code': 405, 'msg': '无搜索结果'}
             
             data = {
                 'results': search_results,
                 'recommend': recommend,
-                'ext_recommend': ext_recommend,
-                'last_page': 'new-nextpage' not in response,
+                'ext_recommend': self.resolve_ext_recommend(ext_recommend),
+                'last_page': self.is_last_page(response),
                 'match_count': match_count
             }
-            keys_to_delete = [key for key in self.exclude]
+            keys_to_delete = [key for key in exclude]
             for key in keys_to_delete:
                 del data[key]
             return {'code': 200, 'msg': 'ok', 'data': data}
         else:
             return response
 
-    def search(self, keyword, date_range=None, pn=None, proxies=None, exclude=['ext_recommend'], include_performance=False):
-        if exclude is not None:
-            self.exclude = exclude
+    def _resolve_exclude(self, exclude):
+        """
+        返回本次调用排除的字段列表（副本），未指定时默认排除扩展推荐词，排除推荐词时也排除扩展推荐词
+        不写回实例，也不修改调用方传入的列表，并发调用互不影响
+        """
+        exclude = ['ext_recommend'] if exclude is None else list(exclude)
+        if 'recommend' in exclude and 'ext_recommend' not in exclude:
+            exclude.append('ext_recommend')
+        return exclude
 
-        random_params = gen_random_params()
+    def search(self, keyword, date_range=None, pn=None, proxies=None, exclude=None, include_performance=False, bypass_cache=False):
+        exclude = self._resolve_exclude(exclude)
+
+        if self.cache is None:
+            result = self._search(keyword, date_range, pn, proxies, include_performance, exclude)
+        else:
+            cache_key = make_cache_key('mobile', keyword, pn, date_range, exclude)
+            result = cached_call(
+                self.cache, cache_key, lambda: self._search(keyword, date_range, pn, proxies, include_performance, exclude),
+                include_performance, bypass_cache, lambda result: self._is_cacheable(result, pn), metrics=self.metrics,
+            )
+        if self.metrics is not None:
+            self.metrics.record_result('mobile', result.get('code'))
+        return result
+
+    def _is_cacheable(self, result, pn):
+        """第一页扩展推荐词超时的结果不完整，不写入缓存"""
+        data = result.get('data', {})
+        return not ((pn is None or pn == 1) and 'ext_recommend' in data and data['ext_recommend'] is None)
 
-        if 'recommend' in self.exclude and 'ext_recommend' not in self.exclude:
-            self.exclude.append('ext_recommend')
+    def _search(self, keyword, date_range, pn, proxies, include_performance, exclude):
+        fingerprint_start = time.perf_counter()
+        random_params, cookies = self._new_fingerprint()
+        fingerprint_time = time.perf_counter() - fingerprint_start
 
         # 判断是否需要获取扩展推荐词
-        need_ext_recommend = (pn is None or pn == 1) and 'ext_recommend' not in self.exclude
+        need_ext_recommend = (pn is None or pn == 1) and 'ext_recommend' not in exclude
         
-        result = self.get_baidum_serp(keyword.strip(), date_range, pn, proxies, random_params, need_ext_recommend)
+        if self.hedge_policy is None:
+            result = self.get_baidum_serp(keyword.strip(), date_range, pn, proxies, random_params, need_ext_recommend, cookies=cookies)
+        else:
+            result = self._hedged_baidum_serp(keyword.strip(), date_range, pn, proxies, random_params, need_ext_recommend, cookies)
         
         # 添加错误处理
         if isinstance(result, dict) and 'code' in result:
@@ -460,14 +789,95 @@ class BaiduMobile:
         else:
             response = result
             ext_recommend = None
+        add_phase(response, 'fingerprint', fingerprint_time)
         
-        # 处理新的响应格式
-        if isinstance(response, dict) and 'content' in response:
+        # 基础推荐词在 handle_response 中与搜索结果一起单次解析得到
+        parse_start = time.perf_counter()
+        result = self.handle_response(response, keyword.strip(), None, ext_recommend, pn, include_performance, exclude)
+        if self.hooks is not None:
+            self.hooks.parse_complete(MOBILE_SERP_ENDPOINT, keyword.strip(), pn, result, parse_start)
+        return result
+
+    def _hedged_baidum_serp(self, keyword, date_range, pn, proxies, random_params, need_ext_recommend, cookies):
+        """对冲请求：第一个请求未在对冲等待时间内返回时，经其他代理和新指纹再发一个相同的请求"""
+        if self.proxy_pool is not None:
+            proxies = proxies or self.proxy_pool.select()
+
+        def _hedge():
+            hedge_proxies = self._failover_proxies([proxies] if proxies else []) or proxies
+            hedge_params, hedge_cookies = self._new_fingerprint()
+            return self.get_baidum_serp(keyword, date_range, pn, hedge_proxies, hedge_params, need_ext_recommend, cookies=hedge_cookies)
+
+        return hedged_call(
+            self.hedge_policy, self._hedge_executor,
+            lambda: self.get_baidum_serp(keyword, date_range, pn, proxies, random_params, need_ext_recommend, cookies=cookies), _hedge,
+        )
+
+    def search_many(self, keywords, workers=4, ordered=False, date_range=None, pn=None, proxies=None, exclude=None, include_performance=False, bypass_cache=False):
+        """
+        批量搜索，在有界线程池中并发调用 search()，逐个产出 (keyword, result)
+        复用 _setup_session 创建的连接池，建议配合 connection_mode='pooled' 使用
+        """
+
+        def _search_one(keyword):
+            return keyword, self.search(keyword, date_range, pn, proxies, exclude, include_performance, bypass_cache)
+
+        return imap_bounded(_search_one, keywords, workers=workers, ordered=ordered)
+
+    def iter_pages(self, keyword, max_pages=5, date_range=None, proxies=None, exclude=None, include_performance=False, start_page=1):
+        """
+        逐页搜索的生成器，每获取一页就产出 (pn, result)，到达最后一页或出错时停止
+        所有页面共用同一组Cookie和随机参数，并保持连接复用
+        """
+        exclude = self._resolve_exclude(exclude)
+
+        keyword = keyword.strip()
+        random_params, cookies = self._new_fingerprint()
+
+        for pn in range(start_page, start_page + max_pages):
+            # 扩展推荐词只在第一页获取
+            need_ext_recommend = pn == 1 and 'ext_recommend' not in exclude
+            result = self.get_baidum_serp(
+                keyword, date_range, pn, proxies, random_params, need_ext_recommend, cookies=cookies, keep_alive=True
+            )
+            if isinstance(result, dict) and 'code' in result:
+                yield pn, result
+                return
+
+            if isinstance(result, tuple):
+                response, ext_recommend = result
+            else:
+                response, ext_recommend = result, None
+
             html_content = response['content']
-        else:
-            html_content = response
-        
-        # 获取基础推荐词
-        recommend = self.get_recommend(html_content)
+            page_result = self.handle_response(response, keyword, None, ext_recommend, pn, include_performance, exclude)
+            yield pn, page_result
+
+            if page_result.get('code') != 200 or self.is_last_page(html_content):
+                return
+
+    def search_top_n(self, keyword, n=50, date_range=None, proxies=None, exclude=None, include_performance=False):
+        """
+        并发抓取前 ceil(n/10) 页并合并为一个结果列表
+        按URL去重后重新计算连续排名，超出实际最后一页的页面会被取消
+        """
+        exclude = self._resolve_exclude(exclude)
+
+        keyword = keyword.strip()
+        random_params, cookies = self._new_fingerprint()
+
+        def _fetch_page(pn):
+            need_ext_recommend = pn == 1 and 'ext_recommend' not in exclude
+            result = self.get_baidum_serp(keyword, date_range, pn, proxies, random_params, need_ext_recommend, cookies=cookies)
+            if isinstance(result, dict) and 'code' in result:
+                return result, False
+            if isinstance(result, tuple):
+                response, ext_recommend = result
+            else:
+                response, ext_recommend = result, None
+            html_content = response['content']
+            page_result = self.handle_response(response, keyword, None if pn == 1 else [], ext_recommend, pn, include_performance, exclude)
+            return page_result, page_result.get('code') in (404, 405) or self.is_last_page(html_content)
 
-        return self.handle_response(response, keyword.strip(), recommend, ext_recommend, pn, include_performance)
\ No newline at end of file
+        page_results = fan_out_pages(_fetch_page, range(1, math.ceil(n / 10) + 1))
+        return merge_page_results(page_results, keyword, n)
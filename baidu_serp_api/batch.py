@@ -0,0 +1,179 @@
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, as_completed, FIRST_COMPLETED
+from itertools import islice
+
+
+def imap_bounded(func, items, workers=4, ordered=False, max_pending=None):
+    """
+    使用有界线程池并发执行 func(item)，以生成器方式逐个产出结果
+    同时提交的任务数不超过 max_pending（默认 workers * 2），
+    输入可以是任意可迭代对象，不会一次性读入内存
+    ordered=True 时按输入顺序产出，否则按完成顺序产出
+    """
+    if workers < 1:
+        raise ValueError("workers必须大于0")
+    max_pending = max_pending or workers * 2
+    items = iter(items)
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        if ordered:
+            pending = deque(executor.submit(func, item) for item in islice(items, max_pending))
+            while pending:
+                result = pending.popleft().result()
+                for item in islice(items, 1):
+                    pending.append(executor.submit(func, item))
+                yield result
+        else:
+            pending = {executor.submit(func, item) for item in islice(items, max_pending)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+                for item in islice(items, len(done)):
+                    pending.add(executor.submit(func, item))
+    finally:
+        # 提前停止迭代时取消尚未开始的任务
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+async def aimap_bounded(func, items, workers=4, ordered=False, max_pending=None):
+    """imap_bounded 的 asyncio 版本，func 为协程函数，以异步生成器方式产出结果"""
+    if workers < 1:
+        raise ValueError("workers必须大于0")
+    max_pending = max_pending or workers * 2
+    items = iter(items)
+    semaphore = asyncio.Semaphore(workers)
+
+    async def _run(item):
+        async with semaphore:
+            return await func(item)
+
+    pending = deque(asyncio.ensure_future(_run(item)) for item in islice(items, max_pending))
+    try:
+        if ordered:
+            while pending:
+                result = await pending.popleft()
+                for item in islice(items, 1):
+                    pending.append(asyncio.ensure_future(_run(item)))
+                yield result
+        else:
+            while pending:
+                done, not_done = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                pending = deque(not_done)
+                for item in islice(items, len(done)):
+                    pending.append(asyncio.ensure_future(_run(item)))
+                for task in done:
+                    yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def fan_out_pages(fetch_page, pages, workers=None):
+    """
+    并发抓取多个页码，fetch_page(pn) 返回 (result, last_page)
+    某页确认为最后一页后，取消更靠后的页并不再等待它们
+    返回 {pn: result}，只包含不超过最后一页的页码
+    """
+    pages = list(pages)
+    executor = ThreadPoolExecutor(max_workers=workers or len(pages))
+    results = {}
+    last_pn = max(pages)
+    try:
+        futures = {executor.submit(fetch_page, pn): pn for pn in pages}
+        for future in as_completed(futures):
+            pn = futures[future]
+            if future.cancelled() or pn > last_pn:
+                continue
+            result, last_page = future.result()
+            results[pn] = result
+            if last_page and pn < last_pn:
+                last_pn = pn
+                for other_future, other_pn in futures.items():
+                    if other_pn > pn:
+                        other_future.cancel()
+            if all(p in results for p in pages if p <= last_pn):
+                break
+    finally:
+        # 不等待最后一页之后仍在进行中的请求
+        executor.shutdown(wait=False, cancel_futures=True)
+    return {pn: result for pn, result in results.items() if pn <= last_pn}
+
+
+async def afan_out_pages(fetch_page, pages):
+    """fan_out_pages 的 asyncio 版本，fetch_page 为协程函数，超出最后一页的任务会被直接取消"""
+    pages = list(pages)
+    tasks = {asyncio.ensure_future(fetch_page(pn)): pn for pn in pages}
+    results = {}
+    last_pn = max(pages)
+    try:
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                pn = tasks[task]
+                if task.cancelled() or pn > last_pn:
+                    continue
+                result, last_page = task.result()
+                results[pn] = result
+                if last_page and pn < last_pn:
+                    last_pn = pn
+            for task in list(pending):
+                if tasks[task] > last_pn:
+                    task.cancel()
+                    pending.discard(task)
+    finally:
+        for task in tasks:
+            task.cancel()
+    return {pn: result for pn, result in results.items() if pn <= last_pn}
+
+
+def merge_page_results(page_results, keyword, n):
+    """
+    按页码合并多页搜索结果：按URL去重、截取前n条并重新计算连续排名
+    第一页失败时直接返回第一页的错误；中间某页失败时只合并该页之前的结果，
+    complete 为 False，failed_page 记录失败页的页码、结果码和信息，避免后面页的结果被错排到前面
+    """
+    first = page_results.get(min(page_results)) if page_results else None
+    if not first or first.get('code') != 200:
+        return first
+
+    merged = []
+    seen_urls = set()
+    response_time = 0
+    failed_page = None
+    last_page = True
+    for pn in sorted(page_results):
+        result = page_results[pn]
+        code = result.get('code')
+        if code in (404, 405):
+            # 无结果或超出最后一页，后面的页不会再有结果
+            break
+        if code != 200:
+            failed_page = {'pn': pn, 'code': code, 'msg': result.get('msg')}
+            last_page = False
+            break
+        data = result['data']
+        last_page = data.get('last_page', True)
+        response_time = max(response_time, data.get('performance', {}).get('response_time', 0))
+        for item in data.get('results', []):
+            if item['url'] in seen_urls:
+                continue
+            seen_urls.add(item['url'])
+            merged.append(dict(item, ranking=len(merged) + 1))
+
+    merged = merged[:n]
+    data = dict(first['data'])
+    if 'results' in data:
+        data['results'] = merged
+    if 'match_count' in data:
+        data['match_count'] = sum(1 for item in merged if keyword in item['title'])
+    if 'last_page' in data:
+        data['last_page'] = last_page
+    data['complete'] = failed_page is None
+    data['failed_page'] = failed_page
+    if 'performance' in data:
+        data['performance'] = dict(data['performance'], response_time=response_time, pages=len(page_results))
+    return {'code': 200, 'msg': 'ok', 'data': data}
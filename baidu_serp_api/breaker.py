@@ -0,0 +1,172 @@
+import threading
+import time
+from collections import deque
+
+from .proxy import proxy_url
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# 各请求接口的熔断键
+PC_SERP_ENDPOINT = 'www.baidu.com/s'
+MOBILE_SERP_ENDPOINT = 'm.baidu.com/s'
+MOBILE_REC_ENDPOINT = 'm.baidu.com/rec'
+
+# 网络层面的失败：响应提前结束、超时、代理错误、SSL握手/连接错误、连接错误；使用代理时计入代理，否则计入接口
+NETWORK_FAILURE_CODES = frozenset((502, 503, 504, 505, 506, 508, 509, 510, 512, 513, 514, 515, 516, 518, 519))
+# 百度服务端错误（5xx），请求已经经代理到达百度，只计入接口
+SERVER_FAILURE_CODES = frozenset((522,))
+# 收到百度响应的结果码（包括验证码、403/429等），代理和接口都视为可用
+RESPONSE_CODES = frozenset((200, 404, 405, 501, 520, 521, 523))
+
+
+def proxy_breaker_key(proxies):
+    """代理的熔断键，未使用代理时返回 None，只按接口熔断"""
+    url = proxy_url(proxies)
+    return 'proxy:' + url if url else None
+
+
+def endpoint_breaker_key(endpoint):
+    return 'endpoint:' + endpoint
+
+
+class _Circuit:
+    __slots__ = ('state', 'failures', 'opened_at', 'trials')
+
+    def __init__(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trials = 0
+
+
+class CircuitBreaker:
+    """
+    按代理和按接口（www.baidu.com/s、m.baidu.com/s、m.baidu.com/rec）熔断
+    连续失败 failure_threshold 次后打开，打开期间的请求直接返回 524，不再等待连接/读取超时；
+    打开 recovery_time 秒后进入半开状态，放行最多 half_open_max_calls 个试探请求，成功则关闭，失败则重新打开
+    状态变化通过 on_transition(key, old_state, new_state) 回调和 transitions() 记录对外暴露
+    """
+
+    def __init__(self, failure_threshold=5, recovery_time=30, half_open_max_calls=1, on_transition=None, history_size=100):
+        self.failure_threshold = failure_threshold
+        self.recovery_time = recovery_time
+        self.half_open_max_calls = half_open_max_calls
+        self.on_transition = on_transition
+        self._circuits = {}
+        self._history = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+        self._rejected = 0
+
+    def _keys(self, endpoint, proxies):
+        keys = [endpoint_breaker_key(endpoint)]
+        proxy_key = proxy_breaker_key(proxies)
+        if proxy_key is not None:
+            keys.append(proxy_key)
+        return keys
+
+    def _circuit(self, key):
+        circuit = self._circuits.get(key)
+        if circuit is None:
+            circuit = self._circuits[key] = _Circuit()
+        return circuit
+
+    def _transition(self, key, circuit, state, now, events):
+        events.append((key, circuit.state, state))
+        self._history.append({'time': time.time(), 'key': key, 'from': circuit.state, 'to': state})
+        circuit.state = state
+        circuit.trials = 0
+        if state == OPEN:
+            circuit.opened_at = now
+        elif state == CLOSED:
+            circuit.failures = 0
+
+    def _notify(self, events):
+        if self.on_transition is not None:
+            for key, old_state, new_state in events:
+                self.on_transition(key, old_state, new_state)
+
+    def allow(self, endpoint, proxies=None):
+        """检查是否允许发送请求，返回 None 表示放行，否则返回处于打开状态的熔断键"""
+        now = time.monotonic()
+        events = []
+        rejected = None
+        with self._lock:
+            circuits = [(key, self._circuit(key)) for key in self._keys(endpoint, proxies)]
+            for key, circuit in circuits:
+                if circuit.state == OPEN and now - circuit.opened_at >= self.recovery_time:
+                    self._transition(key, circuit, HALF_OPEN, now, events)
+                if circuit.state == OPEN or (circuit.state == HALF_OPEN and circuit.trials >= self.half_open_max_calls):
+                    rejected = key
+                    break
+            if rejected is None:
+                for _, circuit in circuits:
+                    if circuit.state == HALF_OPEN:
+                        circuit.trials += 1
+            else:
+                self._rejected += 1
+        self._notify(events)
+        return rejected
+
+    def report(self, endpoint, proxies, code):
+        """按请求结果更新熔断状态，必须与放行的 allow() 一一对应"""
+        proxy_key = proxy_breaker_key(proxies)
+        if code in NETWORK_FAILURE_CODES:
+            outcomes = {proxy_key: False} if proxy_key is not None else {endpoint_breaker_key(endpoint): False}
+        elif code in SERVER_FAILURE_CODES:
+            outcomes = {endpoint_breaker_key(endpoint): False}
+            if proxy_key is not None:
+                outcomes[proxy_key] = True
+        elif code in RESPONSE_CODES:
+            outcomes = dict.fromkeys(self._keys(endpoint, proxies), True)
+        else:
+            outcomes = {}
+        now = time.monotonic()
+        events = []
+        with self._lock:
+            for key in self._keys(endpoint, proxies):
+                circuit = self._circuit(key)
+                outcome = outcomes.get(key)
+                if circuit.state == HALF_OPEN:
+                    if outcome is None:
+                        # 无法判断代理/接口是否恢复的结果，释放试探名额
+                        circuit.trials = max(circuit.trials - 1, 0)
+                    else:
+                        self._transition(key, circuit, CLOSED if outcome else OPEN, now, events)
+                elif outcome is True:
+                    circuit.failures = 0
+                elif outcome is False:
+                    circuit.failures += 1
+                    if circuit.state == CLOSED and circuit.failures >= self.failure_threshold:
+                        self._transition(key, circuit, OPEN, now, events)
+        self._notify(events)
+
+    def state(self, key):
+        """返回熔断键的当前状态，打开时间已超过 recovery_time 的显示为半开"""
+        with self._lock:
+            circuit = self._circuits.get(key)
+            if circuit is None:
+                return CLOSED
+            if circuit.state == OPEN and time.monotonic() - circuit.opened_at >= self.recovery_time:
+                return HALF_OPEN
+            return circuit.state
+
+    def transitions(self):
+        """返回最近的状态变化记录：时间、熔断键、原状态和新状态"""
+        with self._lock:
+            return list(self._history)
+
+    def stats(self):
+        """返回每个熔断键的状态、连续失败次数和距离半开的剩余秒数，以及被拒绝的请求数"""
+        now = time.monotonic()
+        with self._lock:
+            circuits = {
+                key: {
+                    'state': circuit.state,
+                    'failures': circuit.failures,
+                    'retry_in': round(max(circuit.opened_at + self.recovery_time - now, 0), 3) if circuit.state == OPEN else 0,
+                }
+                for key, circuit in self._circuits.items()
+            }
+            return {'rejected': self._rejected, 'circuits': circuits}
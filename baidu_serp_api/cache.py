@@ -0,0 +1,342 @@
+import asyncio
+import copy
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+
+
+def make_cache_key(device, keyword, pn=None, date_range=None, exclude=None):
+    """
+    根据 search() 参数生成规范化的缓存键
+    pn 为空视为第1页，exclude 排序后参与计算，因为它决定返回数据的字段
+    """
+    return json.dumps(
+        [device, keyword.strip(), int(pn) if pn else 1, date_range or '', sorted(exclude or [])],
+        ensure_ascii=False,
+        separators=(',', ':'),
+    )
+
+
+def strip_performance(result):
+    """缓存前去掉性能数据，避免命中时返回过期的耗时"""
+    result = copy.deepcopy(result)
+    result.get('data', {}).pop('performance', None)
+    return result
+
+
+def from_cache(result, include_performance=False):
+    """把缓存命中的结果整理为 search() 的返回格式"""
+    if include_performance and 'data' in result:
+        result['data']['performance'] = {'response_time': 0, 'status_code': 200, 'cache_hit': True}
+    return result
+
+
+def _record_lookup(cache, metrics, hit):
+    """每次 cached_call 只计一次查找：命中包括等待其他线程/进程抓取后读到的结果"""
+    cache.record_lookup(hit)
+    if metrics is not None:
+        metrics.record_cache(hit)
+
+
+def cached_call(cache, key, fetch, include_performance=False, bypass_cache=False, cacheable=None, metrics=None):
+    """
+    带缓存地执行 fetch()：命中直接返回；未命中时先取得该键的抓取租约，
+    同一键已在其他线程/进程中抓取时等待其写入缓存，避免重复请求
+    bypass_cache=True 时跳过读取直接抓取，结果仍写回缓存
+    传入 metrics 时记录命中和未命中次数（bypass_cache 不计入）
+    """
+    owner = False
+    if not bypass_cache:
+        cached = cache.get(key, record=False)
+        if cached is None:
+            owner = cache.acquire(key)
+            if not owner:
+                cached = cache.get(key, record=False)
+        _record_lookup(cache, metrics, cached is not None)
+        if cached is not None:
+            return from_cache(cached, include_performance)
+    try:
+        result = fetch()
+        if cacheable is None or cacheable(result):
+            cache.set(key, result)
+        return result
+    finally:
+        if owner:
+            cache.release(key)
+
+
+async def _acache_op(cache, func, *args, **kwargs):
+    """会阻塞的缓存（SqliteCache）的读写在线程中执行，进程内缓存直接调用"""
+    if cache.blocking:
+        return await asyncio.to_thread(func, *args, **kwargs)
+    return func(*args, **kwargs)
+
+
+async def acached_call(cache, key, fetch, include_performance=False, bypass_cache=False, cacheable=None, metrics=None):
+    """cached_call 的 asyncio 版本，fetch 为无参协程函数，等待租约和SQLite读写在线程中进行以免阻塞事件循环"""
+    owner = False
+    if not bypass_cache:
+        cached = await _acache_op(cache, cache.get, key, record=False)
+        if cached is None:
+            acquiring = asyncio.ensure_future(asyncio.to_thread(cache.acquire, key))
+            try:
+                owner = await asyncio.shield(acquiring)
+            except asyncio.CancelledError:
+                # 被取消时租约可能仍会在线程中取得，取得后立即释放
+                acquiring.add_done_callback(lambda f: not f.cancelled() and f.exception() is None and f.result() and cache.release(key))
+                raise
+            if not owner:
+                cached = await _acache_op(cache, cache.get, key, record=False)
+        _record_lookup(cache, metrics, cached is not None)
+        if cached is not None:
+            return from_cache(cached, include_performance)
+    try:
+        result = await fetch()
+        if cacheable is None or cacheable(result):
+            await _acache_op(cache, cache.set, key, result)
+        return result
+    finally:
+        if owner:
+            cache.release(key)
+
+
+class SerpCache:
+    """
+    进程内SERP结果缓存：按条目TTL过期，超过容量时按LRU淘汰
+    线程安全，可在多个 BaiduPc / BaiduMobile 实例之间共享
+    """
+
+    def __init__(self, maxsize=1024, ttl=600, lease_timeout=30):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # 等待其他线程抓取同一键的最长时间（秒）
+        self.lease_timeout = lease_timeout
+        self._data = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+
+    # 读写都在内存中完成，异步客户端直接调用
+    blocking = False
+
+    def get(self, key, record=True):
+        """返回缓存结果的副本，不存在或已过期返回None；record=False 时不计入命中/未命中次数"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                del self._data[key]
+                self._stats['expirations'] += 1
+                entry = None
+            if record:
+                self._stats['hits' if entry is not None else 'misses'] += 1
+            if entry is None:
+                return None
+            self._data.move_to_end(key)
+            result = entry[1]
+        return copy.deepcopy(result)
+
+    def record_lookup(self, hit):
+        """记录一次命中或未命中，供 cached_call 在一次调用结束后统一计数"""
+        with self._lock:
+            self._stats['hits' if hit else 'misses'] += 1
+
+    def set(self, key, result, ttl=None):
+        """只缓存 code == 200 的结果，错误结果不缓存"""
+        if result.get('code') != 200:
+            return
+        result = strip_performance(result)
+        with self._lock:
+            self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), result)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def acquire(self, key):
+        """取得该键的抓取租约返回True；已有线程在抓取时等待其完成并返回False"""
+        with self._lock:
+            # 等待期间结果可能已由其他线程写入
+            entry = self._data.get(key)
+            if entry is not None and entry[0] >= time.monotonic():
+                return False
+            event = self._inflight.get(key)
+            if event is None:
+                self._inflight[key] = threading.Event()
+                return True
+        event.wait(self.lease_timeout)
+        return False
+
+    def release(self, key):
+        with self._lock:
+            event = self._inflight.pop(key, None)
+        if event is not None:
+            event.set()
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        """返回命中/未命中/淘汰/过期次数、当前条目数和命中率"""
+        with self._lock:
+            stats = dict(self._stats, size=len(self._data), maxsize=self.maxsize)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        return stats
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+
+class SqliteCache:
+    """
+    基于SQLite的跨进程SERP结果缓存，键与 SerpCache 相同
+    使用WAL模式支持多进程并发读写，结果以zlib压缩的JSON存储，按条目TTL过期
+    同一主机上任意数量的进程和实例可以共享同一个数据库文件
+    """
+
+    def __init__(self, path, ttl=600, lease_timeout=30, compress_level=6, busy_timeout=5):
+        self.path = os.fspath(path)
+        self.ttl = ttl
+        # 等待其他进程抓取同一键的最长时间（秒），也是抓取租约的有效期
+        self.lease_timeout = lease_timeout
+        self.compress_level = compress_level
+        self.busy_timeout = busy_timeout
+        self._owner = uuid.uuid4().hex
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'expirations': 0}
+        conn = self._conn()
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS serp_cache (key TEXT PRIMARY KEY, expires_at REAL NOT NULL, payload BLOB NOT NULL)'
+        )
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS serp_lease (key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)'
+        )
+
+    def _conn(self):
+        """每个线程使用独立的连接"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    # 读写数据库可能因锁等待最多 busy_timeout 秒，异步客户端在线程中调用
+    blocking = True
+
+    def get(self, key, record=True):
+        """返回缓存结果，不存在或已过期返回None；record=False 时不计入命中/未命中次数"""
+        row = self._conn().execute('SELECT expires_at, payload FROM serp_cache WHERE key = ?', (key,)).fetchone()
+        if row is not None and row[0] < time.time():
+            self._conn().execute('DELETE FROM serp_cache WHERE key = ? AND expires_at = ?', (key, row[0]))
+            self._count('expirations')
+            row = None
+        if record:
+            self.record_lookup(row is not None)
+        if row is None:
+            return None
+        return json.loads(zlib.decompress(row[1]))
+
+    def record_lookup(self, hit):
+        """记录一次命中或未命中，供 cached_call 在一次调用结束后统一计数"""
+        self._count('hits' if hit else 'misses')
+
+    def set(self, key, result, ttl=None):
+        """只缓存 code == 200 的结果，错误结果不缓存"""
+        if result.get('code') != 200:
+            return
+        payload = zlib.compress(json.dumps(strip_performance(result), ensure_ascii=False).encode('utf-8'), self.compress_level)
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        self._conn().execute(
+            'INSERT OR REPLACE INTO serp_cache (key, expires_at, payload) VALUES (?, ?, ?)', (key, expires_at, payload)
+        )
+
+    def acquire(self, key):
+        """
+        取得该键的抓取租约返回True；租约被其他进程持有时轮询等待，
+        直到结果写入缓存、租约释放或过期后返回False
+        """
+        conn = self._conn()
+        deadline = time.time() + self.lease_timeout
+        while True:
+            now = time.time()
+            conn.execute('DELETE FROM serp_lease WHERE key = ? AND expires_at < ?', (key, now))
+            inserted = conn.execute(
+                'INSERT OR IGNORE INTO serp_lease (key, owner, expires_at) VALUES (?, ?, ?)',
+                (key, self._owner, now + self.lease_timeout),
+            ).rowcount
+            if inserted:
+                # 取得租约前结果可能已由其他进程写入
+                if not self._has_fresh(conn, key):
+                    return True
+                self.release(key)
+                return False
+            if now >= deadline:
+                return False
+            time.sleep(0.05)
+            if self._has_fresh(conn, key):
+                return False
+            if not conn.execute('SELECT 1 FROM serp_lease WHERE key = ?', (key,)).fetchone():
+                return False
+
+    def _has_fresh(self, conn, key):
+        return conn.execute('SELECT 1 FROM serp_cache WHERE key = ? AND expires_at >= ?', (key, time.time())).fetchone() is not None
+
+    def release(self, key):
+        self._conn().execute('DELETE FROM serp_lease WHERE key = ? AND owner = ?', (key, self._owner))
+
+    def delete(self, key):
+        self._conn().execute('DELETE FROM serp_cache WHERE key = ?', (key,))
+
+    def clear(self):
+        self._conn().execute('DELETE FROM serp_cache')
+
+    def compact(self, vacuum=True):
+        """删除过期条目和失效租约，合并WAL日志；vacuum=True 时重建数据库文件回收空间，返回删除的条目数"""
+        conn = self._conn()
+        now = time.time()
+        removed = conn.execute('DELETE FROM serp_cache WHERE expires_at < ?', (now,)).rowcount
+        conn.execute('DELETE FROM serp_lease WHERE expires_at < ?', (now,))
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        if vacuum:
+            conn.execute('VACUUM')
+        return removed
+
+    def stats(self):
+        """返回本实例的命中/未命中/过期次数，以及数据库中的条目数和命中率"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats['size'] = len(self)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        return stats
+
+    def close(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+    def __len__(self):
+        return self._conn().execute('SELECT COUNT(*) FROM serp_cache').fetchone()[0]
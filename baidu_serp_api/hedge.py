@@ -0,0 +1,186 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED, TimeoutError as FutureTimeoutError
+
+from .ratelimit import response_code, discard_response, SUCCESS_CODES
+
+# 对冲线程池的线程上限：线程按需创建并复用，上限足够大，并发调用 search() 时第一个请求不会在队列中等待
+HEDGE_MAX_WORKERS = 256
+
+
+class HedgePolicy:
+    """
+    对冲请求策略：第一个请求超过 delay 秒（未指定时为近期响应时间的 percentile 分位数）仍未返回时，
+    经其他代理和新指纹再发一个相同的请求，取先成功返回的结果
+    对冲请求数不超过总请求数的 max_extra_ratio，近期样本少于 min_samples 且未指定 delay 时不对冲
+    """
+
+    def __init__(self, delay=None, percentile=95, max_extra_ratio=0.1, min_samples=20, window=200):
+        if not 0 < percentile < 100:
+            raise ValueError("percentile必须在0到100之间")
+        self.delay = delay
+        self.percentile = percentile
+        self.max_extra_ratio = max_extra_ratio
+        self.min_samples = min_samples
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._stats = {'requests': 0, 'hedged': 0, 'hedge_wins': 0}
+
+    def observe(self, latency):
+        """记录一次请求的响应时间"""
+        with self._lock:
+            self._latencies.append(latency)
+
+    def hedge_delay(self):
+        """返回发出对冲请求前等待的秒数，样本不足时返回 None"""
+        if self.delay is not None:
+            return self.delay
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            latencies = sorted(self._latencies)
+        return latencies[min(len(latencies) - 1, int(len(latencies) * self.percentile / 100))]
+
+    def _has_budget(self):
+        return self._stats['hedged'] + 1 <= self.max_extra_ratio * self._stats['requests']
+
+    def begin(self):
+        """开始一次请求，返回对冲等待时间；不对冲（样本不足或超出对冲比例上限）时返回 None"""
+        delay = self.hedge_delay()
+        with self._lock:
+            self._stats['requests'] += 1
+            if delay is None or not self._has_budget():
+                return None
+        return delay
+
+    def try_hedge(self):
+        """占用一次对冲名额，超出 max_extra_ratio 时返回 False"""
+        with self._lock:
+            if not self._has_budget():
+                return False
+            self._stats['hedged'] += 1
+            return True
+
+    def record_win(self):
+        """记录一次对冲请求先于第一个请求成功返回"""
+        with self._lock:
+            self._stats['hedge_wins'] += 1
+
+    def stats(self):
+        """返回请求数、对冲请求数、对冲请求先返回的次数、实际对冲比例和当前对冲等待时间"""
+        delay = self.hedge_delay()
+        with self._lock:
+            requests = self._stats['requests']
+            return dict(
+                self._stats,
+                ratio=round(self._stats['hedged'] / requests, 3) if requests else 0.0,
+                delay=round(delay, 3) if delay is not None else None,
+            )
+
+
+def hedge_executor():
+    """客户端发送对冲请求使用的线程池"""
+    return ThreadPoolExecutor(max_workers=HEDGE_MAX_WORKERS, thread_name_prefix='hedge')
+
+
+def _timed(policy, func, started=None):
+    """执行请求并记录成功请求的响应时间，快速失败的请求不计入，避免拉低分位数"""
+    if started is not None:
+        started.set()
+    start = time.monotonic()
+    response = func()
+    if response_code(response) in SUCCESS_CODES:
+        policy.observe(time.monotonic() - start)
+    return response
+
+
+def hedged_call(policy, executor, primary, hedge):
+    """
+    primary() 和 hedge() 各发送一次请求，返回 get_baidupc_serp / get_baidum_serp 格式的结果
+    对冲后返回先成功（200/404/405）的结果，都失败时返回第一个请求的结果
+    已经发出的同步请求无法中断，落后的请求在后台完成后被丢弃，其扩展推荐词后台请求会被取消
+    """
+    delay = policy.begin()
+    if delay is None:
+        return _timed(policy, primary)
+    started = threading.Event()
+    first = executor.submit(_timed, policy, primary, started)
+    # 从第一个请求真正开始发送时计算对冲等待时间，在线程池中排队的时间不计入
+    started.wait()
+    try:
+        return first.result(timeout=delay)
+    except FutureTimeoutError:
+        pass
+    if not policy.try_hedge():
+        return first.result()
+    second = executor.submit(_timed, policy, hedge)
+    winner = None
+    try:
+        pending = {first, second}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if response_code(future.result()) in SUCCESS_CODES:
+                    winner = future
+                    if future is second:
+                        policy.record_win()
+                    return future.result()
+        winner = first
+        return first.result()
+    finally:
+        # 落后的请求无法取消时，在其完成后取消随页面返回的扩展推荐词后台请求
+        for future in (first, second):
+            if future is not winner and not future.cancel():
+                future.add_done_callback(_discard_result)
+
+
+def _discard_result(future):
+    if not future.cancelled() and future.exception() is None:
+        discard_response(future.result())
+
+
+async def _atimed(policy, func):
+    start = time.monotonic()
+    response = await func()
+    if response_code(response) in SUCCESS_CODES:
+        policy.observe(time.monotonic() - start)
+    return response
+
+
+async def ahedged_call(policy, primary, hedge):
+    """hedged_call 的 asyncio 版本，primary 和 hedge 为协程函数，落后的请求及其扩展推荐词请求会被直接取消"""
+    delay = policy.begin()
+    if delay is None:
+        return await _atimed(policy, primary)
+    first = asyncio.ensure_future(_atimed(policy, primary))
+    tasks = [first]
+    winner = None
+    try:
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done or not policy.try_hedge():
+            response = await first
+            winner = first
+            return response
+        second = asyncio.ensure_future(_atimed(policy, hedge))
+        tasks.append(second)
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if response_code(task.result()) in SUCCESS_CODES:
+                    winner = task
+                    if task is second:
+                        policy.record_win()
+                    return task.result()
+        winner = first
+        return first.result()
+    finally:
+        for task in tasks:
+            if task is winner:
+                continue
+            if not task.done():
+                task.cancel()
+            else:
+                _discard_result(task)
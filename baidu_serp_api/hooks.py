@@ -0,0 +1,148 @@
+import contextvars
+import logging
+import time
+
+from .metrics import proxy_label
+from .ratelimit import response_code
+
+logger = logging.getLogger(__name__)
+
+EVENTS = ('before_request', 'after_response', 'on_error', 'on_parse_complete', 'on_retry')
+
+# 当前线程/协程最近一次请求的 span 和下一次请求的尝试序号，供 on_retry 使用
+_last_span = contextvars.ContextVar('baidu_serp_last_span', default=None)
+_next_attempt = contextvars.ContextVar('baidu_serp_next_attempt', default=1)
+
+
+class Span:
+    """
+    一次请求（每次重试各一个）或一次解析的跟踪记录
+    start_time 为开始时的Unix时间戳，duration 为耗时（秒），code 为结果码，error 为请求抛出的异常
+    attributes 中记录状态码、分阶段耗时、字节数等，回调也可以在其中保存自己的数据（如追踪系统的span）
+    """
+
+    __slots__ = ('name', 'endpoint', 'keyword', 'pn', 'proxy', 'attempt', 'start_time', 'duration', 'code', 'error', 'attributes', '_start')
+
+    def __init__(self, name, endpoint, keyword, pn, proxies=None, attempt=1):
+        self.name = name
+        self.endpoint = endpoint
+        self.keyword = keyword
+        self.pn = pn
+        self.proxy = proxy_label(proxies)
+        self.attempt = attempt
+        self.start_time = time.time()
+        self.duration = None
+        self.code = None
+        self.error = None
+        self.attributes = {}
+        self._start = time.perf_counter()
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def finish(self, code=None, error=None):
+        self.duration = time.perf_counter() - self._start
+        self.code = code
+        self.error = error
+
+    def __repr__(self):
+        return f'<Span {self.name} {self.endpoint} {self.keyword!r} attempt={self.attempt} code={self.code} duration={self.duration}>'
+
+
+class Hooks:
+    """
+    请求生命周期回调，通过客户端的 hooks 参数传入，可在多个客户端之间共享
+    before_request(span)          请求发出前（已通过熔断器和限流器）
+    after_response(span)          请求结束，span.code 为结果码，包括错误码
+    on_error(span)                结果码不是200或请求抛出异常（span.error）时，在 after_response 之后调用
+    on_parse_complete(span)       search() 解析完成，span 记录解析耗时和结果数
+    on_retry(span, delay)         重试策略决定重试，span 为失败的那次请求，delay 为重试前的等待时间
+    回调在发请求的线程（异步客户端在事件循环）中同步执行，应尽量轻量；回调抛出的异常只记录日志，不影响请求
+    """
+
+    def __init__(self):
+        self._callbacks = {event: [] for event in EVENTS}
+
+    def _register(self, event, callback):
+        self._callbacks[event].append(callback)
+        return callback
+
+    def before_request(self, callback):
+        return self._register('before_request', callback)
+
+    def after_response(self, callback):
+        return self._register('after_response', callback)
+
+    def on_error(self, callback):
+        return self._register('on_error', callback)
+
+    def on_parse_complete(self, callback):
+        return self._register('on_parse_complete', callback)
+
+    def on_retry(self, callback):
+        return self._register('on_retry', callback)
+
+    def remove(self, callback):
+        """移除已注册的回调"""
+        for callbacks in self._callbacks.values():
+            if callback in callbacks:
+                callbacks.remove(callback)
+
+    def _emit(self, event, *args):
+        for callback in self._callbacks[event]:
+            try:
+                callback(*args)
+            except Exception:
+                logger.exception('%s 回调出错', event)
+
+    def start_request(self, endpoint, keyword, pn, proxies):
+        """客户端发出请求前调用，返回该次请求的 span"""
+        attempt = _next_attempt.get()
+        if attempt != 1:
+            _next_attempt.set(1)
+        span = Span('request', endpoint, keyword, pn, proxies, attempt)
+        self._emit('before_request', span)
+        return span
+
+    def finish_request(self, span, response):
+        """请求返回结果（包括错误码）后调用，成功的页面记录状态码、响应时间和分阶段耗时"""
+        code = response_code(response)
+        span.finish(code)
+        if code == 200:
+            page = response[0] if isinstance(response, tuple) else response
+            if isinstance(page, dict):
+                for key in ('status_code', 'response_time'):
+                    if key in page:
+                        span.attributes[key] = page[key]
+                if 'timings' in page:
+                    span.attributes.update(page['timings'].as_dict())
+        else:
+            span.attributes['msg'] = response.get('msg') if isinstance(response, dict) else None
+        _last_span.set(span)
+        self._emit('after_response', span)
+        if code != 200:
+            self._emit('on_error', span)
+
+    def fail_request(self, span, error):
+        """请求抛出异常（包括被取消）时调用"""
+        span.finish(None, error)
+        _last_span.set(span)
+        self._emit('after_response', span)
+        self._emit('on_error', span)
+
+    def retry(self, attempt, code, delay):
+        """重试策略决定第 attempt 次尝试后重试时调用"""
+        _next_attempt.set(attempt + 1)
+        span = _last_span.get()
+        if span is not None:
+            self._emit('on_retry', span, delay)
+
+    def parse_complete(self, endpoint, keyword, pn, result, started):
+        """search() 解析完成后调用，started 为开始解析时的 time.perf_counter()"""
+        span = Span('parse', endpoint, keyword, pn)
+        span._start = started
+        span.start_time -= time.perf_counter() - started
+        data = result.get('data') or {}
+        span.attributes['results'] = len(data.get('results') or [])
+        span.finish(result.get('code'))
+        self._emit('on_parse_complete', span)
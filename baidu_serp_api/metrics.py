@@ -0,0 +1,279 @@
+import bisect
+import threading
+import time
+import weakref
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from .proxy import proxy_url
+
+# 请求耗时直方图的默认桶上限（秒）
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30)
+DIRECT = 'direct'
+OTHER = 'other'
+
+
+def proxy_label(proxies):
+    """代理的指标标签：去掉用户名密码的代理地址，未使用代理时为 direct"""
+    url = proxy_url(proxies)
+    if not url:
+        return DIRECT
+    parts = urlsplit(url)
+    return f'{parts.scheme}://{parts.hostname}:{parts.port}' if parts.port else f'{parts.scheme}://{parts.hostname}'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def _format(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Histogram:
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self, size):
+        self.counts = [0] * size
+        self.sum = 0.0
+        self.count = 0
+
+
+class MetricsCollector:
+    """
+    指标收集器，BaiduPc / BaiduMobile（包括异步版本）传入 metrics=True 时使用进程内共享的 default_metrics
+    记录每次请求（包括重试）的结果码和耗时直方图（按接口和代理）、search() 的结果码、缓存命中、进行中的请求数，
+    导出时再读取当前存活客户端的连接池和代理池状态（客户端被回收后不再计入，因此都以gauge导出），
+    prometheus_text() 生成Prometheus文本格式，serve() 在本地提供 /metrics
+    代理标签数超过 max_proxies 后，其余代理的耗时合并到 other，避免指标基数无限增长
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, max_proxies=100):
+        self.buckets = tuple(sorted(buckets))
+        self.max_proxies = max_proxies
+        self._lock = threading.Lock()
+        self._clients = weakref.WeakSet()
+        self._server = None
+        self._thread = None
+        self.reset()
+
+    def reset(self):
+        """清空已记录的计数和直方图，不影响已注册的客户端"""
+        with self._lock:
+            self._requests = Counter()
+            self._results = Counter()
+            self._cache = Counter()
+            self._in_flight = Counter()
+            self._histograms = {}
+            self._proxies = set()
+
+    def register(self, client):
+        """注册客户端，导出时读取其连接池和代理池状态，客户端被回收后自动移除"""
+        with self._lock:
+            self._clients.add(client)
+
+    def request_started(self, endpoint):
+        """请求开始，进行中的请求数加一，返回传给 request_finished 的开始时间"""
+        with self._lock:
+            self._in_flight[endpoint] += 1
+        return time.perf_counter()
+
+    def request_finished(self, endpoint, proxies, code, started):
+        """请求结束：进行中的请求数减一，code 为 None（请求被取消）时不计入结果和耗时"""
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._in_flight[endpoint] -= 1
+            if code is not None:
+                self._observe(endpoint, proxies, code, elapsed)
+
+    def observe(self, endpoint, proxies, code, seconds=None):
+        """记录一次请求的结果码，seconds 为 None 时（如熔断器直接拒绝）不计入耗时直方图"""
+        with self._lock:
+            self._observe(endpoint, proxies, code, seconds)
+
+    def _observe(self, endpoint, proxies, code, seconds):
+        self._requests[(endpoint, code)] += 1
+        if seconds is None:
+            return
+        proxy = proxy_label(proxies)
+        if proxy not in self._proxies:
+            if len(self._proxies) < self.max_proxies:
+                self._proxies.add(proxy)
+            else:
+                proxy = OTHER
+        histogram = self._histograms.get((endpoint, proxy))
+        if histogram is None:
+            histogram = self._histograms[(endpoint, proxy)] = _Histogram(len(self.buckets))
+        index = bisect.bisect_left(self.buckets, seconds)
+        if index < len(self.buckets):
+            histogram.counts[index] += 1
+        histogram.sum += seconds
+        histogram.count += 1
+
+    def record_result(self, device, code):
+        """记录一次 search() 的最终结果码"""
+        with self._lock:
+            self._results[(device, code)] += 1
+
+    def record_cache(self, hit):
+        with self._lock:
+            self._cache['hit' if hit else 'miss'] += 1
+
+    def _pool_stats(self):
+        """汇总已注册客户端的连接池、按代理连接池和代理池状态"""
+        with self._lock:
+            clients = list(self._clients)
+        stats = Counter()
+        for client in clients:
+            stats['clients'] += 1
+            # 异步客户端的 aiohttp 会话没有 adapters，不统计连接池
+            adapters = getattr(getattr(client, '_session', None), 'adapters', None)
+            if adapters:
+                for adapter in set(adapters.values()):
+                    managers = [getattr(adapter, 'poolmanager', None)] + list(getattr(adapter, 'proxy_manager', {}).values())
+                    for manager in managers:
+                        if manager is None:
+                            continue
+                        for key in manager.pools.keys():
+                            pool = manager.pools.get(key)
+                            if pool is not None:
+                                stats['connection_pools'] += 1
+                                stats['connections_created'] += pool.num_connections
+                                stats['connection_requests'] += pool.num_requests
+            registry = getattr(client, '_proxy_sessions', None)
+            if registry is not None:
+                for name, value in registry.stats().items():
+                    stats[f'proxy_sessions_{name}'] += value
+            proxy_pool = getattr(client, 'proxy_pool', None)
+            if proxy_pool is not None:
+                for state in proxy_pool.stats().values():
+                    stats['proxies_quarantined' if state['quarantined'] else 'proxies_available'] += 1
+        return stats
+
+    def snapshot(self):
+        """返回当前指标的字典形式：请求/结果计数、各直方图的次数/总耗时、缓存、进行中的请求数和连接池状态"""
+        pools = self._pool_stats()
+        with self._lock:
+            hits, misses = self._cache['hit'], self._cache['miss']
+            return {
+                'requests': {f'{endpoint} {code}': count for (endpoint, code), count in sorted(self._requests.items())},
+                'results': {f'{device} {code}': count for (device, code), count in sorted(self._results.items())},
+                'latency': {
+                    f'{endpoint} {proxy}': {'count': histogram.count, 'sum': round(histogram.sum, 3)}
+                    for (endpoint, proxy), histogram in sorted(self._histograms.items())
+                },
+                'cache': {'hits': hits, 'misses': misses, 'hit_ratio': round(hits / (hits + misses), 3) if hits + misses else 0.0},
+                'in_flight': {endpoint: count for endpoint, count in self._in_flight.items() if count},
+                'pools': dict(pools),
+            }
+
+    def prometheus_text(self):
+        """生成Prometheus文本格式（0.0.4）的指标快照"""
+        pools = self._pool_stats()
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+
+        with self._lock:
+            family('baidu_serp_requests_total', 'counter', '每次请求（包括重试）的结果码')
+            for (endpoint, code), count in sorted(self._requests.items()):
+                lines.append(f'baidu_serp_requests_total{_labels(endpoint=endpoint, code=code)} {count}')
+
+            family('baidu_serp_request_duration_seconds', 'histogram', '请求耗时，按接口和代理')
+            for (endpoint, proxy), histogram in sorted(self._histograms.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'baidu_serp_request_duration_seconds_bucket{_labels(endpoint=endpoint, proxy=proxy, le=_format(float(bound)))} {cumulative}')
+                lines.append(f'baidu_serp_request_duration_seconds_bucket{_labels(endpoint=endpoint, proxy=proxy, le="+Inf")} {histogram.count}')
+                lines.append(f'baidu_serp_request_duration_seconds_sum{_labels(endpoint=endpoint, proxy=proxy)} {_format(histogram.sum)}')
+                lines.append(f'baidu_serp_request_duration_seconds_count{_labels(endpoint=endpoint, proxy=proxy)} {histogram.count}')
+
+            family('baidu_serp_search_results_total', 'counter', 'search() 返回的结果码')
+            for (device, code), count in sorted(self._results.items()):
+                lines.append(f'baidu_serp_search_results_total{_labels(device=device, code=code)} {count}')
+
+            family('baidu_serp_cache_requests_total', 'counter', '结果缓存的命中和未命中次数')
+            for result in ('hit', 'miss'):
+                lines.append(f'baidu_serp_cache_requests_total{_labels(result=result)} {self._cache[result]}')
+            hits, misses = self._cache['hit'], self._cache['miss']
+            family('baidu_serp_cache_hit_ratio', 'gauge', '结果缓存命中率')
+            lines.append(f'baidu_serp_cache_hit_ratio {_format(hits / (hits + misses) if hits + misses else 0.0)}')
+
+            family('baidu_serp_in_flight_requests', 'gauge', '正在进行的请求数')
+            for endpoint, count in sorted(self._in_flight.items()):
+                lines.append(f'baidu_serp_in_flight_requests{_labels(endpoint=endpoint)} {count}')
+
+        for name, help_text in (
+            ('clients', '已注册的客户端数'),
+            ('connection_pools', 'requests连接池数量'),
+            ('connections_created', '当前客户端连接池新建的连接数'),
+            ('connection_requests', '当前客户端经连接池发出的请求数，与新建连接数之差为复用连接的请求'),
+            ('proxy_sessions_pools', '按代理连接池（proxy_pools）当前的Session数'),
+            ('proxy_sessions_created', '当前客户端按代理连接池新建的Session数'),
+            ('proxy_sessions_reused', '当前客户端按代理连接池复用Session的次数'),
+            ('proxy_sessions_evicted', '当前客户端按代理连接池淘汰的Session数'),
+            ('proxies_available', '代理池中可用的代理数'),
+            ('proxies_quarantined', '代理池中被隔离的代理数'),
+        ):
+            # 只汇总当前存活的客户端，客户端被回收后数值会下降，因此都以gauge导出
+            metric = f'baidu_serp_{name}'
+            family(metric, 'gauge', help_text)
+            lines.append(f'{metric} {pools[name]}')
+        return '\n'.join(lines) + '\n'
+
+    def serve(self, port=9108, host='127.0.0.1'):
+        """在后台线程中提供 http://host:port/metrics，返回实际监听的地址（port=0 时自动分配端口）"""
+        if self._server is None:
+            collector = self
+
+            class _Handler(BaseHTTPRequestHandler):
+                def log_message(self, format, *args):
+                    pass
+
+                def do_GET(self):
+                    if self.path.split('?')[0] != '/metrics':
+                        self.send_error(404)
+                        return
+                    body = collector.prometheus_text().encode('utf-8')
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+            self._server = ThreadingHTTPServer((host, port), _Handler)
+            self._server.daemon_threads = True
+            self._thread = threading.Thread(target=self._server.serve_forever, name='baidu-serp-metrics', daemon=True)
+            self._thread.start()
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}/metrics'
+
+    def stop(self):
+        """停止 serve() 启动的HTTP服务"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+            self._thread = None
+
+
+# metrics=True 的客户端共享的指标收集器
+default_metrics = MetricsCollector()
+
+
+def resolve_metrics(metrics):
+    """客户端 metrics 参数：True 使用 default_metrics，None/False 不记录指标，也可传入自己的 MetricsCollector"""
+    if metrics is True:
+        return default_metrics
+    return metrics or None
@@ -0,0 +1,372 @@
+import argparse
+import gzip
+import json
+import math
+import os
+import random
+import socket
+import struct
+import threading
+import time
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+DEFAULT_FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests', 'fixtures')
+PAGE_TYPES = ('normal', 'site', 'captcha', 'noresult', 'last')
+# 可注入的非HTTP错误：reset 直接发送RST断开连接，truncate 发送一半的chunked响应体后关闭连接
+NETWORK_ERRORS = ('reset', 'truncate')
+
+# 各接口必须携带的查询参数和Cookie
+PC_PARAMS = ('wd', 'ie', 'oq', 'rsv_pq', 'rsv_t')
+PC_COOKIES = ('BIDUPSID', 'BAIDUID', 'BAIDUID_BFESS', 'H_PS_PSSID')
+MOBILE_PARAMS = ('word', 'ie', 'rsv_iqid', 'rsv_pq', 'rsv_t', 'rqid')
+MOBILE_COOKIES = ('BAIDUID', 'BAIDUID_BFESS', 'H_WISE_SIDS', 'rsv_i')
+REC_PARAMS = ('word', 'qid', 'baiduid', 't', 'r')
+REC_COOKIES = ('BAIDUID',)
+
+
+def latency_sampler(spec, rng=random):
+    """
+    把延迟配置转换为返回秒数的函数：数字为固定延迟，函数原样返回，字符串支持
+    fixed:秒、uniform:最小,最大、normal:均值,标准差、lognormal:中位数,sigma、exp:均值
+    """
+    if callable(spec):
+        return spec
+    if isinstance(spec, (int, float)):
+        return lambda: spec
+    name, _, args = spec.partition(':')
+    values = [float(value) for value in args.split(',')] if args else []
+    if name == 'fixed' and len(values) == 1:
+        return lambda: values[0]
+    if name == 'uniform' and len(values) == 2:
+        return lambda: rng.uniform(values[0], values[1])
+    if name == 'normal' and len(values) == 2:
+        return lambda: max(rng.gauss(values[0], values[1]), 0)
+    if name == 'lognormal' and len(values) == 2:
+        return lambda: rng.lognormvariate(math.log(values[0]), values[1])
+    if name == 'exp' and len(values) == 1:
+        return lambda: rng.expovariate(1 / values[0])
+    raise ValueError(f"无法解析的延迟配置: {spec}")
+
+
+def parse_cookies(header):
+    """解析Cookie请求头，值中可能包含 = 和 /，不使用 SimpleCookie"""
+    cookies = {}
+    for item in header.split(';'):
+        name, sep, value = item.strip().partition('=')
+        if sep:
+            cookies[name] = value
+    return cookies
+
+
+def validate_request(kind, params, cookies):
+    """按客户端的请求构造规则检查查询参数和Cookie，返回问题列表"""
+    required_params, required_cookies = {
+        'pc': (PC_PARAMS, PC_COOKIES),
+        'mobile': (MOBILE_PARAMS, MOBILE_COOKIES),
+        'rec': (REC_PARAMS, REC_COOKIES),
+    }[kind]
+    problems = [f'缺少参数 {name}' for name in required_params if not params.get(name)]
+    problems += [f'缺少Cookie {name}' for name in required_cookies if not cookies.get(name)]
+    if problems:
+        return problems
+    if 'BAIDUID_BFESS' in required_cookies and cookies['BAIDUID_BFESS'] != cookies['BAIDUID']:
+        problems.append('BAIDUID_BFESS 与 BAIDUID 不一致')
+    if kind == 'pc':
+        if params['ie'] != 'utf-8':
+            problems.append('ie 不是 utf-8')
+        if params['oq'] != params['wd']:
+            problems.append('oq 与 wd 不一致')
+        if 'H_PS_645EC' in cookies and cookies['H_PS_645EC'] != params['rsv_t']:
+            problems.append('Cookie H_PS_645EC 与 rsv_t 不一致')
+        if 'site:' in params['wd'] and not params.get('si'):
+            problems.append('site: 查询缺少参数 si')
+    elif kind == 'mobile':
+        if params['ie'] != 'utf-8':
+            problems.append('ie 不是 utf-8')
+        if params['rsv_pq'] != params['rsv_iqid']:
+            problems.append('rsv_pq 与 rsv_iqid 不一致')
+    elif params['baiduid'] != f"BAIDUID={cookies['BAIDUID']}":
+        problems.append('参数 baiduid 与 Cookie BAIDUID 不一致')
+    if params.get('pn') and not params['pn'].isdigit():
+        problems.append('pn 不是数字')
+    return problems
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'BWS/1.1'
+    sys_version = ''
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        mock = self.server.mock
+        url = urlsplit(self.path)
+        if url.path == '/s':
+            # 与真实请求一样按Host区分PC和移动端，Host不匹配时按查询参数判断
+            host = (self.headers.get('Host') or '').split(':')[0]
+            params = {name: values[0] for name, values in parse_qs(url.query).items()}
+            kind = 'mobile' if host == 'm.baidu.com' or (host != 'www.baidu.com' and 'word' in params) else 'pc'
+        elif url.path == '/rec':
+            params = {name: values[0] for name, values in parse_qs(url.query).items()}
+            kind = 'rec'
+        else:
+            self._send(404, b'Not Found', 'text/plain')
+            return
+        mock._count('requests', kind)
+
+        delay = mock._latency()
+        if delay > 0:
+            time.sleep(delay)
+
+        error = mock._draw_error()
+        if error == 'reset':
+            mock._count('errors', error)
+            self._reset()
+            return
+        if error is not None and error != 'truncate':
+            mock._count('errors', str(error))
+            self._send(error, f'<html><body>{error}</body></html>'.encode('utf-8'))
+            return
+
+        problems = validate_request(kind, params, parse_cookies(self.headers.get('Cookie', ''))) if mock.validate else []
+        if problems:
+            mock._record_invalid(kind, self.path, problems)
+
+        if kind == 'rec':
+            body = mock._rec_body(params, problems)
+            headers = {}
+            content_type = 'application/json'
+        else:
+            page = mock._choose_page(kind, params, problems)
+            mock._count('pages', f'{kind}_{page}')
+            body = mock.pages[kind][page]
+            headers = {'qid': mock._qid()} if kind == 'mobile' else {}
+            content_type = 'text/html'
+
+        if mock.compress and 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body, 1) if kind == 'rec' else mock._gzip_pages[kind][page]
+            headers['Content-Encoding'] = 'gzip'
+        if error == 'truncate':
+            mock._count('errors', error)
+            self._send_truncated(body, content_type, headers)
+        else:
+            self._send(200, body, content_type, headers)
+
+    def _send(self, status, body, content_type='text/html', headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', f'{content_type}; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_truncated(self, body, content_type, headers):
+        """以chunked编码只发送一半响应体，不发送结束块就关闭连接"""
+        self.send_response(200)
+        self.send_header('Content-Type', f'{content_type}; charset=utf-8')
+        self.send_header('Transfer-Encoding', 'chunked')
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        part = body[:max(len(body) // 2, 1)]
+        self.wfile.write(b'%x\r\n%s\r\n' % (len(part), part))
+        self.wfile.flush()
+        self.close_connection = True
+
+    def _reset(self):
+        """SO_LINGER为0时关闭套接字会直接发送RST"""
+        self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+        self.connection.close()
+        self.close_connection = True
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # 高并发压测时避免监听队列溢出
+    request_queue_size = 1024
+
+
+class MockBaiduServer:
+    """
+    本地模拟百度服务器，提供PC和移动端的 /s 以及移动端的 /rec 接口，用于离线压测完整的请求链路
+    页面取自 fixtures_dir 中的 pc_*.html / mobile_*.html（normal、site、captcha、noresult、last），
+    每个请求先按 latency 延迟，再按 errors（如 {429: 0.01, 503: 0.01, 'reset': 0.01, 'truncate': 0.01}）注入错误，
+    按 captcha_rate / noresult_rate 返回安全验证和无结果页面，第 max_pages 页为最后一页，超出后返回无结果页面
+    validate 为 True 时检查查询参数和Cookie，不符合客户端构造规则的请求返回安全验证页面，问题记录在 invalid_requests() 中
+    客户端通过 base_url 指向本服务器，请求头中的Host保持不变：
+
+        with MockBaiduServer(latency='lognormal:0.2,0.5', errors={429: 0.01}) as server:
+            pc = BaiduPc(base_url=server.base_url)
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, fixtures_dir=None, latency=0, errors=None, captcha_rate=0, noresult_rate=0, max_pages=5, validate=True, compress=False, seed=None, history_size=100):
+        self._random = random.Random(seed)
+        self._latency = latency_sampler(latency, self._random)
+        self.errors = dict(errors or {})
+        for error, rate in self.errors.items():
+            if error not in NETWORK_ERRORS and not (isinstance(error, int) and 400 <= error < 600):
+                raise ValueError(f"不支持的注入错误: {error}，可选值: 4xx/5xx状态码, {', '.join(NETWORK_ERRORS)}")
+            if not 0 <= rate <= 1:
+                raise ValueError("错误比例必须在0到1之间")
+        if sum(self.errors.values()) > 1:
+            raise ValueError("错误比例之和不能大于1")
+        self.captcha_rate = captcha_rate
+        self.noresult_rate = noresult_rate
+        self.max_pages = max_pages
+        self.validate = validate
+        self.compress = compress
+        self.pages = self._load_pages(fixtures_dir or DEFAULT_FIXTURES)
+        self._gzip_pages = {
+            kind: {page: gzip.compress(body, 1) for page, body in pages.items()}
+            for kind, pages in self.pages.items()
+        } if compress else None
+        self._lock = threading.Lock()
+        self._stats = {'requests': Counter(), 'pages': Counter(), 'errors': Counter(), 'invalid': Counter()}
+        self._invalid = deque(maxlen=history_size)
+        self._server = _Server((host, port), _Handler)
+        self._server.mock = self
+        self._thread = None
+
+    @staticmethod
+    def _load_pages(fixtures_dir):
+        if not os.path.isdir(fixtures_dir):
+            raise FileNotFoundError(f"页面目录不存在: {fixtures_dir}")
+        pages = {}
+        for kind in ('pc', 'mobile'):
+            pages[kind] = {}
+            for page in PAGE_TYPES:
+                with open(os.path.join(fixtures_dir, f'{kind}_{page}.html'), 'rb') as f:
+                    pages[kind][page] = f.read()
+        return pages
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        """在后台线程中启动服务器，返回 base_url"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, name='mock-baidu', daemon=True)
+            self._thread.start()
+        return self.base_url
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def stop(self):
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def _count(self, group, name):
+        with self._lock:
+            self._stats[group][name] += 1
+
+    def _record_invalid(self, kind, path, problems):
+        with self._lock:
+            self._stats['invalid'][kind] += 1
+            self._invalid.append({'time': time.time(), 'kind': kind, 'path': path, 'problems': problems})
+
+    def _draw_error(self):
+        roll = self._random.random()
+        for error, rate in self.errors.items():
+            if roll < rate:
+                return error
+            roll -= rate
+        return None
+
+    def _choose_page(self, kind, params, problems):
+        if problems or self._random.random() < self.captcha_rate:
+            return 'captcha'
+        keyword = params.get('wd') or params.get('word') or ''
+        page = int(params['pn']) // 10 + 1 if params.get('pn', '').isdigit() else 1
+        if page > self.max_pages or self._random.random() < self.noresult_rate:
+            return 'noresult'
+        if page == self.max_pages:
+            return 'last'
+        return 'site' if 'site:' in keyword else 'normal'
+
+    def _qid(self):
+        return str(self._random.randrange(10 ** 18, 10 ** 19))
+
+    def _rec_body(self, params, problems):
+        if problems:
+            return json.dumps({'errcode': 1, 'errmsg': 'invalid request'}).encode('utf-8')
+        word = params['word']
+        data = {'errcode': 0, 'rs': {'rcmd': {'list': [
+            {'up': [f'{word}攻略', f'{word}下载'], 'down': [f'{word}评测', f'{word}配置要求']},
+            {'up': [f'{word}发售时间'], 'down': [f'{word}攻略']},
+        ]}}}
+        return json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+    def invalid_requests(self):
+        """返回最近未通过参数/Cookie检查的请求：时间、接口类型、请求路径和问题列表"""
+        with self._lock:
+            return list(self._invalid)
+
+    def stats(self):
+        """返回按接口统计的请求数、返回的页面类型、注入的错误和未通过检查的请求数"""
+        with self._lock:
+            return {group: dict(counter) for group, counter in self._stats.items()}
+
+
+def _parse_error(value):
+    error, sep, rate = value.partition('=')
+    if not sep:
+        raise argparse.ArgumentTypeError(f"错误配置格式应为 名称=比例: {value}")
+    return (int(error) if error.isdigit() else error), float(rate)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='本地模拟百度服务器，用于离线压测')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--fixtures', help='页面目录，默认为 tests/fixtures')
+    parser.add_argument('--latency', default='0', help='延迟配置，如 0.1、uniform:0.05,0.3、lognormal:0.2,0.5、exp:0.2')
+    parser.add_argument('--error', type=_parse_error, action='append', default=[], help='注入错误，如 429=0.01、503=0.01、reset=0.01、truncate=0.01，可重复')
+    parser.add_argument('--captcha-rate', type=float, default=0)
+    parser.add_argument('--noresult-rate', type=float, default=0)
+    parser.add_argument('--max-pages', type=int, default=5)
+    parser.add_argument('--no-validate', action='store_true', help='不检查查询参数和Cookie')
+    parser.add_argument('--compress', action='store_true', help='按 Accept-Encoding 返回gzip压缩的页面')
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    latency = args.latency
+    try:
+        latency = float(latency)
+    except ValueError:
+        pass
+    server = MockBaiduServer(
+        args.host, args.port, args.fixtures, latency, dict(args.error), args.captcha_rate, args.noresult_rate,
+        args.max_pages, not args.no_validate, args.compress, args.seed,
+    )
+    print(f'模拟百度服务器已启动: {server.base_url}', flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        print(json.dumps(server.stats(), ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+import re
+
+from bs4 import BeautifulSoup
+
+# 支持的HTML解析后端
+PARSERS = ('html.parser', 'lxml', 'selectolax')
+
+# 定向解析时需要保留的元素：搜索结果容器和推荐词元素
+_TARGET_RE = re.compile(
+    r'<(div)\b[^>]*\btpl=["\']?(?:www_index|www_struct)["\'\s>]'
+    r'|<(a|span)\b[^>]*\bclass=["\'][^"\']*\bc-fwb\b',
+    re.I,
+)
+# 定向解析前先去掉的内容：内联脚本、样式和注释（开始标记, 结束标记）
+_SKIP_BLOCKS = (('<script', '</script>'), ('<style', '</style>'), ('<!--', '-->'))
+_TAG_RES = {}
+
+# get_text() 时忽略这些标签内的文本，与BeautifulSoup的行为保持一致
+_NON_TEXT_TAGS = {'script', 'style', 'template'}
+
+
+class SoupNode:
+    """BeautifulSoup节点适配器（html.parser / lxml 后端）"""
+
+    __slots__ = ('_node',)
+
+    def __init__(self, node):
+        self._node = node
+
+    def select(self, selector):
+        return [SoupNode(node) for node in self._node.select(selector)]
+
+    def select_one(self, selector):
+        node = self._node.select_one(selector)
+        return SoupNode(node) if node is not None else None
+
+    def get(self, name, default=None):
+        value = self._node.get(name, default)
+        # BeautifulSoup 将 class 等多值属性解析为列表
+        if isinstance(value, list):
+            return ' '.join(value)
+        return value
+
+    def get_text(self):
+        return self._node.get_text()
+
+
+class LexborNode:
+    """selectolax (lexbor) 节点适配器"""
+
+    __slots__ = ('_node',)
+
+    def __init__(self, node):
+        self._node = node
+
+    def select(self, selector):
+        return [LexborNode(node) for node in self._node.css(selector)]
+
+    def select_one(self, selector):
+        node = self._node.css_first(selector)
+        return LexborNode(node) if node is not None else None
+
+    def get(self, name, default=None):
+        value = self._node.attributes.get(name, default)
+        return default if value is None else value
+
+    def get_text(self):
+        parts = []
+        for node in self._node.traverse(include_text=True):
+            if node.tag == '-text' and not _inside_non_text(node, self._node):
+                parts.append(node.text_content)
+        return ''.join(parts)
+
+
+def _inside_non_text(node, root):
+    parent = node.parent
+    while parent is not None and parent != root:
+        if parent.tag in _NON_TEXT_TAGS:
+            return True
+        parent = parent.parent
+    return False
+
+
+def _find_element_end(html_content, start, tag):
+    """从start处的开始标签起，按同名标签的嵌套深度找到对应结束标签之后的位置"""
+    tag_re = _TAG_RES.get(tag)
+    if tag_re is None:
+        tag_re = _TAG_RES[tag] = re.compile(rf'<(/?){tag}\b[^>]*>', re.I)
+    depth = 0
+    for match in tag_re.finditer(html_content, start):
+        if match.group(1):
+            depth -= 1
+            if depth == 0:
+                return match.end()
+        elif not match.group(0).endswith('/>'):
+            depth += 1
+    return len(html_content)
+
+
+def _strip_blocks(html_content):
+    """去掉脚本、样式和注释块，使用str.find逐块跳过，避免正则逐字符扫描大段内联JS"""
+    parts = []
+    pos = 0
+    next_starts = {opener: html_content.find(opener) for opener, _ in _SKIP_BLOCKS}
+    while True:
+        candidates = [(next_starts[opener], closer) for opener, closer in _SKIP_BLOCKS if next_starts[opener] != -1]
+        if not candidates:
+            parts.append(html_content[pos:])
+            break
+        start, closer = min(candidates)
+        parts.append(html_content[pos:start])
+        end = html_content.find(closer, start)
+        pos = len(html_content) if end == -1 else end + len(closer)
+        for opener, _ in _SKIP_BLOCKS:
+            if next_starts[opener] != -1 and next_starts[opener] < pos:
+                next_starts[opener] = html_content.find(opener, pos)
+    return ''.join(parts)
+
+
+def slice_targets(html_content):
+    """
+    字节级预切片：去掉脚本、样式和注释后，只保留搜索结果容器和推荐词元素的HTML片段
+    解析器只需为这些片段构建节点树，页面其余部分被跳过
+    """
+    html_content = _strip_blocks(html_content)
+    parts = []
+    pos = 0
+    for match in _TARGET_RE.finditer(html_content):
+        if match.start() < pos:
+            # 位于已保留元素内部，已随外层元素一并保留
+            continue
+        tag = match.group(1) or match.group(2)
+        pos = _find_element_end(html_content, match.start(), tag)
+        parts.append(html_content[match.start():pos])
+    return '\n'.join(parts)
+
+
+def parse_html(html_content, parser='html.parser', targeted=False):
+    """
+    使用指定后端解析HTML，返回与后端无关的根节点
+    节点提供 select / select_one / get / get_text 四个方法，提取逻辑只依赖这些方法
+    targeted=True 时只解析 slice_targets 切出的结果容器和推荐词元素
+    """
+    if targeted:
+        html_content = slice_targets(html_content)
+    if parser == 'selectolax':
+        try:
+            from selectolax.lexbor import LexborHTMLParser
+        except ImportError:
+            raise ImportError("selectolax解析后端需要安装selectolax: pip install baidu-serp-api[fast]")
+        return LexborNode(LexborHTMLParser(html_content).root)
+    if parser in ('html.parser', 'lxml'):
+        return SoupNode(BeautifulSoup(html_content, parser))
+    raise ValueError(f"不支持的解析后端: {parser}，可选值: {', '.join(PARSERS)}")
@@ -0,0 +1,266 @@
+import random
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+def proxy_url(proxies):
+    """requests风格proxies字典中的代理地址，依次取 https、http、all，未使用代理时返回 None"""
+    if not proxies:
+        return None
+    return proxies.get('https') or proxies.get('http') or proxies.get('all') or None
+
+
+def proxy_key(proxies):
+    """requests风格proxies字典的规范化键，相同代理配置共用一个连接池"""
+    return tuple(sorted((scheme, url) for scheme, url in proxies.items() if url))
+
+
+class ProxySessionRegistry:
+    """
+    按代理地址维护独立的Session，对固定代理保持长连接，省去每次请求的TCP/TLS握手
+    空闲超过 idle_timeout 秒的Session会被关闭，池数超过 max_pools 时关闭最久未使用的
+    通过 session() / acquire() 取出、正在发送请求的Session被淘汰时推迟到 release() 后再关闭
+    标记为轮换的代理（每次请求出口IP都会变化）不复用连接，仍使用 Connection: close
+    """
+
+    def __init__(self, session_factory, max_pools=32, idle_timeout=300, rotating=()):
+        self._session_factory = session_factory
+        self.max_pools = max_pools
+        self.idle_timeout = idle_timeout
+        self._rotating = set(rotating)
+        self._sessions = OrderedDict()
+        # 正在使用的Session及其使用数，已淘汰但仍在使用的Session
+        self._in_use = {}
+        self._retired = set()
+        self._lock = threading.Lock()
+        self._stats = {'created': 0, 'reused': 0, 'evicted': 0}
+
+    def mark_rotating(self, proxy_url, rotating=True):
+        """标记或取消标记轮换代理，已有的连接池会被关闭"""
+        with self._lock:
+            if rotating:
+                self._rotating.add(proxy_url)
+            else:
+                self._rotating.discard(proxy_url)
+            stale = [key for key in self._sessions if any(url == proxy_url for _, url in key)]
+            sessions = self._retire([self._sessions.pop(key)[1] for key in stale])
+        for session in sessions:
+            session.close()
+
+    def is_rotating(self, proxies):
+        return any(url in self._rotating for url in proxies.values())
+
+    def _retire(self, sessions):
+        """在锁内调用：返回可以立即关闭的Session，正在使用的等 release() 时再关闭"""
+        idle = []
+        for session in sessions:
+            if session in self._in_use:
+                self._retired.add(session)
+            else:
+                idle.append(session)
+        return idle
+
+    def get(self, proxies):
+        """返回该代理专用的Session，不存在时创建"""
+        return self._get(proxies, False)
+
+    def acquire(self, proxies):
+        """取出该代理专用的Session并标记为使用中，用完后必须调用 release()"""
+        return self._get(proxies, True)
+
+    def release(self, session):
+        """归还 acquire() 取出的Session，使用期间被淘汰的在最后一次归还时关闭"""
+        with self._lock:
+            count = self._in_use.pop(session) - 1
+            if count:
+                self._in_use[session] = count
+                return
+            if session not in self._retired:
+                return
+            self._retired.discard(session)
+        session.close()
+
+    @contextmanager
+    def session(self, proxies):
+        """with 语句中使用该代理专用的Session，期间不会被淘汰关闭"""
+        session = self.acquire(proxies)
+        try:
+            yield session
+        finally:
+            self.release(session)
+
+    def _get(self, proxies, hold):
+        key = proxy_key(proxies)
+        now = time.monotonic()
+        expired = []
+        with self._lock:
+            # OrderedDict按最近使用排序，从头部开始关闭空闲的Session
+            while self._sessions:
+                oldest_key, (last_used, session) = next(iter(self._sessions.items()))
+                if now - last_used <= self.idle_timeout:
+                    break
+                del self._sessions[oldest_key]
+                expired.append(session)
+            entry = self._sessions.pop(key, None)
+            if entry is None:
+                session = self._session_factory()
+                self._stats['created'] += 1
+            else:
+                session = entry[1]
+                self._stats['reused'] += 1
+            while len(self._sessions) >= self.max_pools:
+                expired.append(self._sessions.popitem(last=False)[1][1])
+            self._sessions[key] = (now, session)
+            if hold:
+                self._in_use[session] = self._in_use.get(session, 0) + 1
+            self._stats['evicted'] += len(expired)
+            expired = self._retire(expired)
+        for old_session in expired:
+            old_session.close()
+        return session
+
+    def stats(self):
+        """返回创建/复用/淘汰次数和当前的连接池数量"""
+        with self._lock:
+            return dict(self._stats, pools=len(self._sessions))
+
+    def close(self):
+        with self._lock:
+            sessions = self._retire([session for _, session in self._sessions.values()])
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+
+# 代理本身导致的错误码：代理连接被重置/关闭、认证失败、拒绝连接、超时和其他代理错误
+PROXY_ERROR_CODES = frozenset(range(505, 511))
+# 请求经代理成功到达百度的结果码（包括无结果页面）
+PROXY_SUCCESS_CODES = frozenset((200, 404, 405))
+
+
+def normalize_proxies(proxy):
+    """代理地址字符串转换为requests风格的proxies字典"""
+    if isinstance(proxy, str):
+        return {'http': proxy, 'https': proxy}
+    return dict(proxy)
+
+
+class _ProxyState:
+    __slots__ = ('proxies', 'latency', 'health', 'requests', 'failures', 'consecutive_failures', 'quarantines', 'quarantined_until')
+
+    def __init__(self, proxies):
+        self.proxies = proxies
+        self.latency = None
+        self.health = 1.0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.quarantines = 0
+        self.quarantined_until = 0.0
+
+
+class ProxyPool:
+    """
+    代理池：按近期延迟和代理错误（505-510）为每个代理打分，按分数加权随机选择
+    连续失败 max_failures 次或平均延迟超过 max_latency 秒的代理被隔离，
+    隔离时间从 quarantine_time 秒开始按次数翻倍，最长 max_quarantine_time 秒，到期后重新参与选择
+    """
+
+    def __init__(self, proxies, alpha=0.3, max_failures=3, max_latency=None, quarantine_time=30, max_quarantine_time=600):
+        self._states = {}
+        for proxy in proxies:
+            proxy = normalize_proxies(proxy)
+            self._states[proxy_key(proxy)] = _ProxyState(proxy)
+        if not self._states:
+            raise ValueError("代理池不能为空")
+        # 延迟和健康度的指数移动平均系数，越大越偏向最近的请求
+        self.alpha = alpha
+        self.max_failures = max_failures
+        self.max_latency = max_latency
+        self.quarantine_time = quarantine_time
+        self.max_quarantine_time = max_quarantine_time
+        self._lock = threading.Lock()
+        self._random = random.Random()
+
+    def _weight(self, state):
+        latency = state.latency if state.latency is not None else 1.0
+        return state.health ** 2 / max(latency, 0.05)
+
+    def select(self, exclude=()):
+        """
+        按分数加权随机选择一个未被隔离的代理，全部被隔离时返回最早解除隔离的代理
+        exclude 中的代理（如重试时已失败的代理）只在没有其他可用代理时才会被选中
+        """
+        now = time.monotonic()
+        excluded = {proxy_key(proxies) for proxies in exclude}
+        with self._lock:
+            states = [state for key, state in self._states.items() if key not in excluded] or list(self._states.values())
+            candidates = [state for state in states if state.quarantined_until <= now]
+            if not candidates:
+                return min(states, key=lambda state: state.quarantined_until).proxies
+            weights = [self._weight(state) for state in candidates]
+            return self._random.choices(candidates, weights)[0].proxies
+
+    def report(self, proxies, code, response_time=None):
+        """
+        记录一次请求结果：505-510 计为代理失败，200/404/405 计为成功并更新延迟，
+        其他错误码（如验证码、连接/读取超时）不影响代理分数
+        """
+        state = self._states.get(proxy_key(proxies))
+        if state is None:
+            return
+        with self._lock:
+            state.requests += 1
+            if code in PROXY_ERROR_CODES:
+                state.failures += 1
+                state.consecutive_failures += 1
+                state.health *= 1 - self.alpha
+                if state.consecutive_failures >= self.max_failures:
+                    self._quarantine(state)
+            elif code in PROXY_SUCCESS_CODES:
+                state.consecutive_failures = 0
+                state.health += self.alpha * (1.0 - state.health)
+                if state.health >= 0.9:
+                    # 恢复健康后下次隔离重新从 quarantine_time 开始计算
+                    state.quarantines = 0
+                if response_time is not None:
+                    state.latency = response_time if state.latency is None \
+                        else state.latency + self.alpha * (response_time - state.latency)
+                    if self.max_latency is not None and state.latency > self.max_latency:
+                        self._quarantine(state)
+
+    def report_response(self, proxies, response):
+        """按 get_baidupc_serp / get_baidum_serp 的返回值记录结果"""
+        if isinstance(response, tuple):
+            response = response[0]
+        if 'code' in response:
+            self.report(proxies, response['code'])
+        else:
+            self.report(proxies, 200, response.get('response_time'))
+
+    def _quarantine(self, state):
+        duration = min(self.quarantine_time * 2 ** state.quarantines, self.max_quarantine_time)
+        state.quarantined_until = time.monotonic() + duration
+        state.quarantines += 1
+        state.consecutive_failures = 0
+        # 解除隔离后以中等健康度和清空的延迟重新参与选择
+        state.health = 0.5
+        state.latency = None
+
+    def stats(self):
+        """返回每个代理的延迟、健康度、请求/失败次数和剩余隔离时间"""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                proxy_url(state.proxies): {
+                    'latency': round(state.latency, 3) if state.latency is not None else None,
+                    'health': round(state.health, 3),
+                    'weight': round(self._weight(state), 3),
+                    'requests': state.requests,
+                    'failures': state.failures,
+                    'quarantined': round(max(state.quarantined_until - now, 0), 3),
+                }
+                for state in self._states.values()
+            }
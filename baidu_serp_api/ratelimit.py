@@ -0,0 +1,155 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+
+from .proxy import proxy_key
+
+# 百度开始限流的信号：安全验证（验证码）和 HTTP 429
+THROTTLE_CODES = frozenset((501, 521))
+# 请求正常到达并返回页面的结果码（包括无结果页面）
+SUCCESS_CODES = frozenset((200, 404, 405))
+
+
+def response_code(response):
+    """
+    get_baidupc_serp / get_baidum_serp 返回值对应的结果码
+    验证码页面在 handle_response 中才会被识别，这里提前按页面内容判断为 501
+    """
+    if isinstance(response, tuple):
+        response = response[0]
+    if 'code' in response:
+        return response['code']
+    content = response.get('content', '')
+    if '百度安全验证' in content or not content.strip():
+        return 501
+    return 200
+
+
+def discard_response(response):
+    """放弃 get_baidupc_serp / get_baidum_serp 的结果：取消随页面一起返回的扩展推荐词后台请求（Future/Task）"""
+    if isinstance(response, tuple) and hasattr(response[1], 'cancel'):
+        response[1].cancel()
+
+
+class _Bucket:
+    __slots__ = ('rate', 'max_rate', 'burst', 'tokens', 'updated', 'decreased')
+
+    def __init__(self, rate, burst, now):
+        self.rate = rate
+        self.max_rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+        self.decreased = 0.0
+
+    def reserve(self, now):
+        """预留一个令牌，返回需要等待的秒数；令牌不足时允许透支，后续请求依次排队"""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+
+class RateLimiter:
+    """
+    自适应令牌桶限流器（AIMD）：全局一个令牌桶，可选每个代理一个令牌桶
+    出现验证码（501）或 429（521）时速率乘以 decrease，同一个桶在 cooldown 秒内只降一次；
+    每次成功请求速率增加 increase 次/秒，最高恢复到 max_rate
+    """
+
+    def __init__(self, rate=2.0, burst=None, min_rate=0.1, max_rate=None, key_rate=None, key_burst=1,
+                 increase=0.05, decrease=0.5, cooldown=2.0, max_keys=1024):
+        if rate <= 0:
+            raise ValueError("rate必须大于0")
+        self.min_rate = min_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown = cooldown
+        # 单个代理的速率，None 表示只使用全局令牌桶
+        self.key_rate = key_rate
+        self.key_burst = key_burst
+        self.max_keys = max_keys
+        now = time.monotonic()
+        self._global = _Bucket(rate, burst if burst is not None else max(1.0, rate), now)
+        self._global.max_rate = max_rate if max_rate is not None else rate
+        self._keys = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'acquired': 0, 'waited': 0.0, 'throttled': 0, 'decreases': 0}
+
+    def _key_buckets(self, proxies, now):
+        # 每次 search() 都会生成新指纹，按指纹的令牌桶只会被用到一次，因此只按代理限流
+        if self.key_rate is None or not proxies:
+            return []
+        key = proxy_key(proxies)
+        bucket = self._keys.pop(key, None)
+        if bucket is None:
+            bucket = _Bucket(self.key_rate, self.key_burst, now)
+        # OrderedDict按最近使用排序，超出 max_keys 时淘汰最久未使用的令牌桶
+        self._keys[key] = bucket
+        while len(self._keys) > self.max_keys:
+            self._keys.popitem(last=False)
+        return [bucket]
+
+    def reserve(self, proxies=None):
+        """为一次请求预留令牌，返回发送前需要等待的秒数"""
+        now = time.monotonic()
+        with self._lock:
+            delay = self._global.reserve(now)
+            for bucket in self._key_buckets(proxies, now):
+                delay = max(delay, bucket.reserve(now))
+            self._stats['acquired'] += 1
+            self._stats['waited'] += delay
+        return delay
+
+    def acquire(self, proxies=None):
+        """阻塞直到允许发送请求，返回等待的秒数"""
+        delay = self.reserve(proxies)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    async def aacquire(self, proxies=None):
+        """acquire 的 asyncio 版本"""
+        delay = self.reserve(proxies)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+    def report(self, proxies, code):
+        """按请求结果调整速率：501/521 乘性降低，成功加性恢复，其他错误码不影响速率"""
+        if code not in THROTTLE_CODES and code not in SUCCESS_CODES:
+            return
+        now = time.monotonic()
+        with self._lock:
+            buckets = [self._global] + self._key_buckets(proxies, now)
+            if code in THROTTLE_CODES:
+                self._stats['throttled'] += 1
+                for bucket in buckets:
+                    if now - bucket.decreased >= self.cooldown:
+                        bucket.rate = max(self.min_rate, bucket.rate * self.decrease)
+                        bucket.decreased = now
+                        self._stats['decreases'] += 1
+            else:
+                for bucket in buckets:
+                    bucket.rate = min(bucket.max_rate, bucket.rate + self.increase)
+
+    def report_response(self, proxies, response):
+        """按 get_baidupc_serp / get_baidum_serp 的返回值调整速率"""
+        self.report(proxies, response_code(response))
+
+    @property
+    def rate(self):
+        """当前的全局速率（次/秒）"""
+        with self._lock:
+            return self._global.rate
+
+    def stats(self):
+        """返回当前全局速率、令牌桶数量、请求数、累计等待秒数和限流信号次数"""
+        with self._lock:
+            return dict(
+                self._stats,
+                rate=round(self._global.rate, 3),
+                waited=round(self._stats['waited'], 3),
+                keys=len(self._keys),
+            )
@@ -0,0 +1,116 @@
+import asyncio
+import random
+import time
+
+from .proxy import proxy_url
+from .ratelimit import response_code, discard_response
+
+# 默认重试的错误码：验证码、响应提前结束、超时、代理错误、SSL握手/连接错误、连接错误、403/429/5xx、熔断
+# 不重试代理认证失败（507）、证书验证失败（511）、DNS解析失败（517）和其他HTTP错误（523），这些重试也不会成功
+RETRY_CODES = frozenset((501, 502, 503, 504, 505, 506, 508, 509, 510, 512, 513, 514, 515, 516, 518, 519, 520, 521, 522, 524))
+# 重试前切换代理的错误码：验证码、超时、代理错误、403、429和代理熔断
+FAILOVER_CODES = frozenset((501, 503, 504, 505, 506, 508, 509, 510, 520, 521, 524))
+# 重试前更换指纹（Cookie和随机参数）的错误码
+REFRESH_FINGERPRINT_CODES = frozenset((501,))
+
+
+class RetryPolicy:
+    """
+    按错误码重试：最多 max_attempts 次，两次尝试之间按指数退避加随机抖动等待
+    deadline 为从第一次尝试开始的总时长上限（秒），下次尝试无法在期限内开始时直接返回最后一次结果
+    deadline 只限制何时还能开始下一次尝试，不会缩短进行中的请求，总耗时最多可超出一次请求的超时时间（timeout）
+    failover_codes 中的错误切换到代理池中的其他代理，refresh_fingerprint_codes 中的错误更换指纹
+    """
+
+    def __init__(self, max_attempts=3, retry_codes=RETRY_CODES, backoff=0.5, max_backoff=8, deadline=None,
+                 failover_codes=FAILOVER_CODES, refresh_fingerprint_codes=REFRESH_FINGERPRINT_CODES):
+        if max_attempts < 1:
+            raise ValueError("max_attempts必须大于0")
+        self.max_attempts = max_attempts
+        self.retry_codes = frozenset(retry_codes)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.deadline = deadline
+        self.failover_codes = frozenset(failover_codes)
+        self.refresh_fingerprint_codes = frozenset(refresh_fingerprint_codes)
+        self._random = random.Random()
+
+    def backoff_delay(self, attempt):
+        """第 attempt 次尝试失败后的等待时间：在 [0, min(max_backoff, backoff * 2^(attempt-1))] 内均匀随机"""
+        return self._random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+
+    def _next_delay(self, code, attempt, started):
+        """返回下次尝试前的等待时间，不再重试时返回 None"""
+        if code not in self.retry_codes or attempt >= self.max_attempts:
+            return None
+        delay = self.backoff_delay(attempt)
+        if self.deadline is not None and time.monotonic() - started + delay >= self.deadline:
+            return None
+        return delay
+
+    def _prepare(self, code, proxies, fingerprint, tried, new_fingerprint, failover):
+        """按错误码决定下次尝试使用的代理和指纹"""
+        if code in self.failover_codes and failover is not None:
+            proxies = failover(tried) or proxies
+        if code in self.refresh_fingerprint_codes:
+            fingerprint = new_fingerprint()
+        return proxies, fingerprint
+
+    @staticmethod
+    def _record(attempts, code, proxies, elapsed, delay):
+        attempts.append({
+            'code': code,
+            'response_time': round(elapsed, 3),
+            'proxy': proxy_url(proxies),
+            'delay': round(delay, 3) if delay is not None else None,
+        })
+
+    @staticmethod
+    def _attach(response, attempts):
+        """把每次尝试的记录附加到返回值上，成功页面在 handle_response 中写入 performance"""
+        (response[0] if isinstance(response, tuple) else response)['attempts'] = attempts
+        return response
+
+    def call(self, send, proxies, fingerprint, new_fingerprint, failover=None, on_retry=None):
+        """
+        send(proxies, fingerprint) 发送一次请求，返回 get_baidupc_serp / get_baidum_serp 格式的结果
+        new_fingerprint() 返回新的 (random_params, cookies)，failover(tried) 返回未尝试过的代理，没有时返回 None
+        on_retry(attempt, code, delay) 在决定重试后、等待前调用
+        """
+        attempts, tried = [], []
+        started = time.monotonic()
+        while True:
+            attempt_start = time.monotonic()
+            response = send(proxies, fingerprint)
+            code = response_code(response)
+            delay = self._next_delay(code, len(attempts) + 1, started)
+            self._record(attempts, code, proxies, time.monotonic() - attempt_start, delay)
+            if delay is None:
+                return self._attach(response, attempts)
+            discard_response(response)
+            if on_retry is not None:
+                on_retry(len(attempts), code, delay)
+            if proxies:
+                tried.append(proxies)
+            proxies, fingerprint = self._prepare(code, proxies, fingerprint, tried, new_fingerprint, failover)
+            time.sleep(delay)
+
+    async def acall(self, send, proxies, fingerprint, new_fingerprint, failover=None, on_retry=None):
+        """call 的 asyncio 版本，send 为协程函数"""
+        attempts, tried = [], []
+        started = time.monotonic()
+        while True:
+            attempt_start = time.monotonic()
+            response = await send(proxies, fingerprint)
+            code = response_code(response)
+            delay = self._next_delay(code, len(attempts) + 1, started)
+            self._record(attempts, code, proxies, time.monotonic() - attempt_start, delay)
+            if delay is None:
+                return self._attach(response, attempts)
+            discard_response(response)
+            if on_retry is not None:
+                on_retry(len(attempts), code, delay)
+            if proxies:
+                tried.append(proxies)
+            proxies, fingerprint = self._prepare(code, proxies, fingerprint, tried, new_fingerprint, failover)
+            await asyncio.sleep(delay)
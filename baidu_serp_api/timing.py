@@ -0,0 +1,271 @@
+import socket
+import threading
+import time
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.response import HTTPResponse
+from urllib3.util.connection import allowed_gai_family
+
+try:
+    from urllib3.exceptions import NameResolutionError
+except ImportError:  # urllib3 1.x
+    NameResolutionError = None
+
+# performance['phases'] 中各阶段的顺序：
+# fingerprint 生成指纹，dns 域名解析，connect TCP连接，tunnel 经代理的CONNECT隧道，tls TLS握手，
+# ttfb 发出请求到收到响应头，download 下载响应体，decompress gzip/br解压，decode 字符集解码，
+# parse 解析HTML，recommend 提取推荐词，ext_recommend 解析完成后等待 /rec 接口的时间
+PHASES = ('fingerprint', 'dns', 'connect', 'tunnel', 'tls', 'ttfb', 'download', 'decompress', 'decode', 'parse', 'recommend', 'ext_recommend')
+
+_local = threading.local()
+
+# 分阶段计时依赖 urllib3 的内部接口，缺少时逐级退化而不影响请求：
+# 没有 HTTPConnection._new_conn 时不替换连接池，只记录总耗时；
+# 没有 _dns_host 或 NameResolutionError 时DNS解析计入 connect；没有 HTTPResponse._decode 时解压计入 download
+TIMING_SUPPORTED = hasattr(HTTPConnection, '_new_conn')
+_SPLIT_DNS = NameResolutionError is not None
+_TIMED_DECODE = hasattr(HTTPResponse, '_decode')
+
+
+class PhaseTimer:
+    """
+    一次请求的分阶段耗时、传输字节数和连接是否复用
+    在 with 范围内经 TimedHTTPAdapter 发出的请求会自动记录连接和传输各阶段的耗时
+    """
+
+    __slots__ = ('phases', 'bytes_wire', 'bytes_decoded', 'connection_reused', 'headers_at', '_previous')
+
+    def __init__(self):
+        self.phases = {}
+        self.bytes_wire = None
+        self.bytes_decoded = None
+        # None 表示请求没有收到响应，无法判断
+        self.connection_reused = None
+        self.headers_at = None
+        self._previous = None
+
+    def __enter__(self):
+        self._previous = getattr(_local, 'timer', None)
+        _local.timer = self
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        _local.timer = self._previous
+        self._previous = None
+
+    def add(self, phase, seconds):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def finish_download(self, bytes_wire, bytes_decoded):
+        """响应体读取完成：收到响应头之后的时间扣除解压时间计为 download"""
+        if self.headers_at is not None:
+            self.add('download', max(time.perf_counter() - self.headers_at - self.phases.get('decompress', 0.0), 0.0))
+        self.bytes_wire = bytes_wire
+        self.bytes_decoded = bytes_decoded
+
+    def as_dict(self):
+        return {
+            'phases': {phase: round(self.phases[phase], 4) for phase in PHASES if phase in self.phases},
+            'bytes_wire': self.bytes_wire,
+            'bytes_decoded': self.bytes_decoded,
+            'connection_reused': self.connection_reused,
+        }
+
+
+def wire_bytes(response):
+    """requests响应从连接上读取的响应体字节数（解压前），无法获取时返回 None"""
+    tell = getattr(getattr(response, 'raw', None), 'tell', None)
+    try:
+        return tell() if tell is not None else None
+    except (OSError, ValueError):
+        return None
+
+
+def add_phase(response, phase, seconds):
+    """把请求之外的阶段耗时（指纹、解析等）记入响应的 timings，没有 timings 的响应忽略"""
+    timer = response.get('timings') if isinstance(response, dict) else None
+    if timer is not None:
+        timer.add(phase, seconds)
+
+
+def performance_details(response):
+    """handle_response 中附加到 performance 的分阶段耗时、字节数、连接复用和重试次数"""
+    details = response['timings'].as_dict() if 'timings' in response else {}
+    details['retries'] = len(response['attempts']) - 1 if 'attempts' in response else 0
+    return details
+
+
+class _TimedConnectionMixin:
+    """记录DNS解析、TCP连接、代理隧道、TLS握手和等待响应头的时间，不在 PhaseTimer 范围内时不做任何记录"""
+
+    def connect(self):
+        timer = getattr(_local, 'timer', None)
+        if timer is None:
+            return super().connect()
+        timer.connection_reused = False
+        start = time.perf_counter()
+        before = timer.phases.get('dns', 0.0) + timer.phases.get('connect', 0.0) + timer.phases.get('tunnel', 0.0)
+        try:
+            return super().connect()
+        finally:
+            if isinstance(self, HTTPSConnection):
+                after = timer.phases.get('dns', 0.0) + timer.phases.get('connect', 0.0) + timer.phases.get('tunnel', 0.0)
+                timer.add('tls', max(time.perf_counter() - start - (after - before), 0.0))
+
+    def _new_conn(self):
+        timer = getattr(_local, 'timer', None)
+        if timer is None:
+            return super()._new_conn()
+        host = getattr(self, '_dns_host', None)
+        start = time.perf_counter()
+        if not _SPLIT_DNS or host is None:
+            try:
+                return super()._new_conn()
+            finally:
+                timer.add('connect', time.perf_counter() - start)
+        # 先单独解析域名再逐个地址连接，把DNS和TCP连接的耗时分开
+        try:
+            addresses = list(dict.fromkeys(info[4][0] for info in socket.getaddrinfo(host, self.port, allowed_gai_family(), socket.SOCK_STREAM)))
+        except socket.gaierror as e:
+            raise NameResolutionError(self.host, self, e) from e
+        resolved = time.perf_counter()
+        timer.add('dns', resolved - start)
+        try:
+            for index, address in enumerate(addresses):
+                self._dns_host = address
+                try:
+                    return super()._new_conn()
+                except (NewConnectionError, ConnectTimeoutError):
+                    if index == len(addresses) - 1:
+                        raise
+        finally:
+            self._dns_host = host
+            timer.add('connect', time.perf_counter() - resolved)
+
+    def _tunnel(self):
+        timer = getattr(_local, 'timer', None)
+        if timer is None:
+            return super()._tunnel()
+        start = time.perf_counter()
+        try:
+            return super()._tunnel()
+        finally:
+            timer.add('tunnel', time.perf_counter() - start)
+
+    def getresponse(self):
+        timer = getattr(_local, 'timer', None)
+        if timer is None:
+            return super().getresponse()
+        start = time.perf_counter()
+        response = super().getresponse()
+        timer.headers_at = time.perf_counter()
+        timer.add('ttfb', timer.headers_at - start)
+        if timer.connection_reused is None:
+            timer.connection_reused = True
+        if _TIMED_DECODE and response.headers.get('Content-Encoding'):
+            response._decode = _timed_decode(response._decode, timer)
+        return response
+
+
+def _timed_decode(decode, timer):
+    def _decode(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return decode(*args, **kwargs)
+        finally:
+            timer.add('decompress', time.perf_counter() - start)
+    return _decode
+
+
+class TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+TIMED_POOL_CLASSES = {'http': TimedHTTPConnectionPool, 'https': TimedHTTPSConnectionPool}
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """
+    使用可记录分阶段耗时的连接，直连和经HTTP代理的请求都会记录，SOCKS代理不记录连接阶段
+    urllib3 不支持分阶段计时（TIMING_SUPPORTED 为 False）时与 HTTPAdapter 相同
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        if TIMING_SUPPORTED:
+            self.poolmanager.pool_classes_by_scheme = TIMED_POOL_CLASSES
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        manager = super().proxy_manager_for(proxy, **proxy_kwargs)
+        if TIMING_SUPPORTED and not proxy.lower().startswith('socks'):
+            manager.pool_classes_by_scheme = TIMED_POOL_CLASSES
+        return manager
+
+
+def timing_trace_config():
+    """
+    aiohttp 的 TraceConfig，请求时通过 trace_request_ctx={'timer': PhaseTimer} 传入记录对象
+    aiohttp 的连接建立包含代理隧道和TLS握手，统一计入 connect；解压在读取响应体时进行，计入 download
+    """
+    import aiohttp
+
+    def _timer(context):
+        request_ctx = context.trace_request_ctx
+        return request_ctx.get('timer') if request_ctx else None
+
+    async def on_dns_start(session, context, params):
+        context.dns_start = time.perf_counter()
+
+    async def on_dns_end(session, context, params):
+        timer = _timer(context)
+        if timer is not None:
+            timer.add('dns', time.perf_counter() - context.dns_start)
+
+    async def on_connection_create_start(session, context, params):
+        context.connect_start = time.perf_counter()
+
+    async def on_connection_create_end(session, context, params):
+        timer = _timer(context)
+        if timer is not None:
+            timer.connection_reused = False
+            context.ready_at = time.perf_counter()
+            # DNS解析发生在建立连接的过程中，从 connect 中扣除
+            timer.add('connect', max(context.ready_at - context.connect_start - timer.phases.get('dns', 0.0), 0.0))
+
+    async def on_connection_reuseconn(session, context, params):
+        timer = _timer(context)
+        if timer is not None:
+            timer.connection_reused = True
+            context.ready_at = time.perf_counter()
+
+    async def on_request_end(session, context, params):
+        timer = _timer(context)
+        if timer is not None:
+            timer.headers_at = time.perf_counter()
+            ready_at = getattr(context, 'ready_at', None)
+            if ready_at is not None:
+                timer.add('ttfb', timer.headers_at - ready_at)
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_dns_resolvehost_start.append(on_dns_start)
+    trace_config.on_dns_resolvehost_end.append(on_dns_end)
+    trace_config.on_connection_create_start.append(on_connection_create_start)
+    trace_config.on_connection_create_end.append(on_connection_create_end)
+    trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+    trace_config.on_request_end.append(on_request_end)
+    return trace_config
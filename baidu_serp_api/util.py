@@ -7,6 +7,7 @@ from loguru import logger
 import uuid
 import random, hashlib
 import time
+import codecs
 
 # 生成PC端浏览器风格的Cookie
 def gen_pc_cookies(random_params=None):
@@ -167,7 +168,6 @@ def gen_random_params():
     rsv_t = hashlib.md5(str(time.time()).encode('utf-8')).hexdigest()
     
     # Mobile版Cookie和基础功能使用的参数
-    bduss = ''.join(random.choices(string.ascii_letters + string.digits, k=176))
     baiduid = uuid.uuid4().hex.upper()[:32]
     timestamp = int(time.time() * 1000)
     r = ''.join(random.choices(string.digits, k=4))
@@ -182,7 +182,6 @@ def gen_random_params():
     return {
         'rsv_pq': rsv_pq,
         'rsv_t': rsv_t,
-        'bduss': bduss,
         'baiduid': baiduid,
         'timestamp': timestamp,
         'r': r,
@@ -194,6 +193,74 @@ def gen_random_params():
         'inputT': input_timestamp
     }
 
+# meta中声明的字符集，只在页面开头查找
+_META_CHARSET_RE = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.I)
+_HEADER_CHARSET_RE = re.compile(r'charset=["\']?([\w-]+)', re.I)
+
+def get_header_charset(content_type):
+    """从Content-Type响应头中取出显式声明的字符集，未声明返回None"""
+    match = _HEADER_CHARSET_RE.search(content_type or '')
+    return match.group(1) if match else None
+
+def detect_encoding(body):
+    """对整个响应体做统计字符集探测，开销较大，仅作为兜底"""
+    try:
+        from charset_normalizer import from_bytes
+    except ImportError:
+        return None
+    best = from_bytes(body).best()
+    return best.encoding if best else None
+
+def _is_latin1(encoding):
+    try:
+        return codecs.lookup(encoding).name == 'iso8859-1'
+    except LookupError:
+        return False
+
+def decode_html(body, declared_encoding=None):
+    """
+    快速解码HTML响应：依次信任响应头声明的编码、meta声明的编码，默认UTF-8
+    只有按上述编码严格解码失败时才回退到字符集探测
+    响应头声明的ISO-8859-1多为服务器默认值，且解码从不失败，按未声明处理
+    返回 (文本, 编码来源)，来源为 header / meta / default / fallback
+    """
+    if declared_encoding and not _is_latin1(declared_encoding):
+        encoding, source = declared_encoding, 'header'
+    else:
+        match = _META_CHARSET_RE.search(body, 0, 4096)
+        if match:
+            encoding, source = match.group(1).decode('ascii'), 'meta'
+        else:
+            encoding, source = 'utf-8', 'default'
+    try:
+        return body.decode(encoding), source
+    except (UnicodeDecodeError, LookupError):
+        return body.decode(detect_encoding(body) or 'utf-8', errors='replace'), 'fallback'
+
+class MarkerScanner:
+    """
+    流式读取响应体时在字节流中查找标记（如验证码、无结果页面的提示文字）
+    保留上一块末尾的重叠字节，标记跨块时也能命中
+    """
+
+    def __init__(self, markers):
+        self.markers = [marker.encode('utf-8') if isinstance(marker, str) else marker for marker in markers]
+        self._overlap = max(len(marker) for marker in self.markers) - 1
+        self._buffer = bytearray()
+
+    def feed(self, chunk):
+        """追加一块数据，命中标记时返回该标记的原始字节，否则返回None"""
+        scan_from = max(0, len(self._buffer) - self._overlap)
+        self._buffer += chunk
+        for marker in self.markers:
+            if self._buffer.find(marker, scan_from) != -1:
+                return marker
+        return None
+
+    @property
+    def body(self):
+        return bytes(self._buffer)
+
 # 清理html标签
 def clean_html_tags(html_content):
     clean_text = re.sub('<[^<]+?>|\\n', '', html_content)
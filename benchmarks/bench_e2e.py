@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+端到端压测
+
+启动本地模拟百度服务器（MockBaiduServer），通过 base_url 把客户端指向它，
+以指定并发度执行 search()，覆盖完整的请求链路：连接池、限流/重试/熔断配置、错误码映射和解析。
+输出吞吐量、延迟分位数、各错误码数量以及服务器端统计，结果为JSON。
+
+    python -m benchmarks.bench_e2e --device pc --requests 2000 --concurrency 100 --latency lognormal:0.05,0.5 --error 429=0.02 --error reset=0.01
+    python -m benchmarks.bench_e2e --client async --concurrency 500
+
+用法: python -m benchmarks.bench_e2e [--device pc|mobile] [--client sync|async] [--requests N] [--concurrency N]
+      [--latency SPEC] [--error NAME=RATE] [--captcha-rate R] [--base-url URL]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter
+
+from baidu_serp_api import BaiduPc, BaiduMobile, AsyncBaiduPc, AsyncBaiduMobile, MockBaiduServer
+from baidu_serp_api.mock_server import _parse_error
+
+
+def percentiles(latencies):
+    latencies = sorted(latencies)
+    if not latencies:
+        return {}
+    pick = lambda p: round(latencies[min(len(latencies) - 1, int(len(latencies) * p / 100))] * 1000, 1)
+    return {'p50_ms': pick(50), 'p95_ms': pick(95), 'p99_ms': pick(99), 'max_ms': round(latencies[-1] * 1000, 1)}
+
+
+def run_sync(device, base_url, keywords, concurrency):
+    client_class = BaiduPc if device == 'pc' else BaiduMobile
+    client = client_class(base_url=base_url, connection_mode='custom', pool_connections=1, pool_maxsize=concurrency, keep_alive=True)
+    codes = Counter()
+    latencies = []
+    try:
+        # search_many 只返回结果，单个请求的耗时取自 performance
+        for _, result in client.search_many(keywords, workers=concurrency, include_performance=True):
+            codes[result['code']] += 1
+            if result['code'] == 200:
+                latencies.append(result['data']['performance']['response_time'])
+    finally:
+        client.close()
+    return codes, latencies
+
+
+def run_async(device, base_url, keywords, concurrency):
+    client_class = AsyncBaiduPc if device == 'pc' else AsyncBaiduMobile
+
+    async def _run():
+        codes = Counter()
+        latencies = []
+        async with client_class(base_url=base_url, max_concurrency=concurrency) as client:
+            async for _, result in client.search_many(keywords, include_performance=True):
+                codes[result['code']] += 1
+                if result['code'] == 200:
+                    latencies.append(result['data']['performance']['response_time'])
+        return codes, latencies
+
+    return asyncio.run(_run())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--device', choices=('pc', 'mobile'), default='pc')
+    parser.add_argument('--client', choices=('sync', 'async'), default='sync')
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--latency', default='0', help='服务器延迟配置，如 0.05、uniform:0.02,0.2、lognormal:0.05,0.5')
+    parser.add_argument('--error', type=_parse_error, action='append', default=[], help='注入错误，如 429=0.01、reset=0.01、truncate=0.01')
+    parser.add_argument('--captcha-rate', type=float, default=0)
+    parser.add_argument('--base-url', help='使用已启动的模拟服务器，不再启动内置服务器')
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        latency = args.latency
+        try:
+            latency = float(latency)
+        except ValueError:
+            pass
+        server = MockBaiduServer(latency=latency, errors=dict(args.error), captcha_rate=args.captcha_rate)
+        base_url = server.start()
+
+    keywords = [f'黑神话 {i}' for i in range(args.requests)]
+    run = run_sync if args.client == 'sync' else run_async
+    try:
+        start = time.perf_counter()
+        codes, latencies = run(args.device, base_url, keywords, args.concurrency)
+        elapsed = time.perf_counter() - start
+    finally:
+        if server is not None:
+            server.stop()
+
+    report = {
+        'device': args.device,
+        'client': args.client,
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+        'elapsed_s': round(elapsed, 3),
+        'requests_per_sec': round(args.requests / elapsed, 1),
+        'latency': percentiles(latencies),
+        'codes': {str(code): count for code, count in sorted(codes.items())},
+        'server': server.stats() if server is not None else None,
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
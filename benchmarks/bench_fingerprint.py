@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+指纹生成基准测试
+
+对比每次请求生成Cookie和随机参数的耗时：
+- inline：gen_random_params + gen_pc_cookies / gen_mobile_cookies（未使用指纹池时的路径）
+- bulk：gen_fingerprints 整批生成后逐个 finalize_fingerprint，按单个指纹平均
+- pool_pop：从已填充的 FingerprintPool 中取出一个指纹（请求路径上的实际开销）
+
+用法: python -m benchmarks.bench_fingerprint [--rounds 5000]
+"""
+
+import argparse
+import json
+import time
+
+from baidu_serp_api.fingerprint import FingerprintPool, gen_fingerprints, finalize_fingerprint
+from baidu_serp_api.util import gen_random_params, gen_pc_cookies, gen_mobile_cookies
+
+
+def per_call_us(func, rounds):
+    func()  # 预热
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+def bench_device(device, rounds):
+    gen_cookies = gen_pc_cookies if device == 'pc' else gen_mobile_cookies
+
+    def inline():
+        gen_cookies(gen_random_params())
+
+    start = time.perf_counter()
+    for fingerprint in gen_fingerprints(device, rounds):
+        finalize_fingerprint(fingerprint)
+    bulk_us = (time.perf_counter() - start) / rounds * 1e6
+
+    # 池容量足够容纳全部取出，只测量请求路径上的取出开销
+    pool = FingerprintPool(device, size=rounds + 1, low_water=0)
+    pool_us = per_call_us(pool.pop, rounds)
+    pool.close()
+
+    inline_us = per_call_us(inline, rounds)
+    return {
+        'inline_us': round(inline_us, 2),
+        'bulk_us': round(bulk_us, 2),
+        'pool_pop_us': round(pool_us, 2),
+        'bulk_speedup': round(inline_us / bulk_us, 2),
+        'pool_speedup': round(inline_us / pool_us, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rounds', type=int, default=5000)
+    args = parser.parse_args()
+
+    report = {'rounds': args.rounds}
+    for device in ('pc', 'mobile'):
+        report[device] = bench_device(device, args.rounds)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+移动端解析基准测试
+
+对比两种解析路径的耗时与峰值内存：
+- 两次解析：extract_baidum_data + get_recommend（各自构建一次DOM树）
+- 单次解析：parse_baidum_page（只构建一次DOM树）
+- 单次定向解析：parse_baidum_page + targeted_parse=True（只为结果容器和推荐词构建节点树）
+
+用法: python -m benchmarks.bench_mobile_parse [--rounds 20] [--file page.html]
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+
+from baidu_serp_api import BaiduMobile
+
+
+def build_sample_page(result_count=10, script_kb=300, chrome_blocks=300):
+    """构造一个接近真实大小的移动端SERP页面：大段内联JS、结果容器以及大量导航/模板等非结果节点"""
+    results = []
+    for i in range(1, result_count + 1):
+        data_log = json.dumps({'mu': f'https://example.com/page{i}', 'order': i})
+        results.append(
+            f'<div class="c-result result" tpl="www_index" order="{i}" data-log=\'{data_log}\'>'
+            f'<p class="cu-title">示例标题 {i} 关键词</p>'
+            f'<div class="summary-abc"><span class="c-gap-right-small c-color-gray">3天前</span>'
+            f'这是第{i}条结果的摘要内容，用于模拟真实页面。</div>'
+            f'<div class="c-color-gray _text_xyz">示例来源{i}</div></div>'
+        )
+    recommends = ''.join(f'<a class="c-fwb" href="#">推荐词{i}</a>' for i in range(20))
+    script = '<script>var data = "' + 'x' * (script_kb * 1024) + '";</script>'
+    chrome = ''.join(
+        f'<div class="nav-item-{i}"><a href="/tab/{i}"><i class="icon"></i><span>导航{i}</span></a></div>'
+        for i in range(chrome_blocks)
+    )
+    return (
+        '<!DOCTYPE html><html><head><style>.a{color:red}</style>' + script + '</head><body>'
+        + chrome + ''.join(results) + recommends + '<a class="new-nextpage" href="#">下一页</a></body></html>'
+    )
+
+
+def measure(func, rounds):
+    """返回 (平均耗时秒, 峰值内存字节)"""
+    func()  # 预热
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    elapsed = (time.perf_counter() - start) / rounds
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--file', help='使用保存的移动端SERP页面代替生成的示例页面')
+    args = parser.parse_args()
+
+    if args.file:
+        with open(args.file, encoding='utf-8') as f:
+            html = f.read()
+    else:
+        html = build_sample_page()
+
+    mobile = BaiduMobile()
+    keyword = '关键词'
+
+    def two_pass():
+        mobile.extract_baidum_data(html, keyword, 1)
+        mobile.get_recommend(html)
+
+    def single_pass():
+        mobile.parse_baidum_page(html, keyword, 1)
+
+    targeted = BaiduMobile(targeted_parse=True)
+
+    def single_pass_targeted():
+        targeted.parse_baidum_page(html, keyword, 1)
+
+    report = {'page_bytes': len(html.encode('utf-8')), 'rounds': args.rounds}
+    for name, func in (('two_pass', two_pass), ('single_pass', single_pass), ('single_pass_targeted', single_pass_targeted)):
+        elapsed, peak = measure(func, args.rounds)
+        report[name] = {'parse_ms': round(elapsed * 1000, 2), 'peak_kb': round(peak / 1024, 1)}
+    report['speedup'] = round(report['two_pass']['parse_ms'] / report['single_pass']['parse_ms'], 2)
+    report['targeted_speedup'] = round(report['two_pass']['parse_ms'] / report['single_pass_targeted']['parse_ms'], 2)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    mobile.close()
+    targeted.close()
+
+
+if __name__ == '__main__':
+    main()
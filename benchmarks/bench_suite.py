@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+离线基准测试套件
+
+在 tests/fixtures 中保存的PC和移动端页面（正常页、site:查询、安全验证、无结果、最后一页）上测量：
+- extract_baidupc_data / extract_baidum_data
+- BaiduPc.get_recommend / BaiduMobile.get_recommend
+- BaiduPc.handle_response / BaiduMobile.handle_response
+- gen_pc_cookies / gen_mobile_cookies
+- convert_date_format
+
+每项输出每秒调用次数、平均耗时和峰值内存（tracemalloc），结果为JSON，可保存后与其他版本对比：
+
+    python -m benchmarks.bench_suite --output before.json
+    python -m benchmarks.bench_suite --compare before.json
+
+用法: python -m benchmarks.bench_suite [--min-time 0.5] [--parser html.parser] [--filter pc.] [--output FILE] [--compare FILE]
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+from baidu_serp_api import BaiduPc, BaiduMobile
+from baidu_serp_api.util import gen_random_params, gen_pc_cookies, gen_mobile_cookies, convert_date_format
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests', 'fixtures')
+
+# 页面类型及对应的搜索关键词
+PAGES = {
+    'normal': '黑神话',
+    'site': 'site:example.com',
+    'captcha': '黑神话',
+    'noresult': '黑神话',
+    'last': '黑神话',
+}
+
+# 覆盖 convert_date_format 各个分支的日期文本
+DATE_SAMPLES = ['5分钟前', '10小时前', '今天', '昨天 14:30', '前天', '3天前', '5月6日', '2024年8月25日', '2024-08-25', '未知']
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return f.read()
+
+
+def measure(func, min_time):
+    """重复调用 func 至少 min_time 秒，返回 (调用次数, 总耗时秒, 峰值内存字节)"""
+    func()  # 预热
+    calls = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_time:
+        func()
+        calls += 1
+        elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return calls, elapsed, peak
+
+
+def build_cases(parser):
+    """返回 [(名称, 函数)]，名称格式为 设备.被测函数.页面类型"""
+    pc = BaiduPc(parser=parser)
+    mobile = BaiduMobile(parser=parser)
+    cases = []
+    for page, keyword in PAGES.items():
+        pc_html = load_fixture(f'pc_{page}.html')
+        mobile_html = load_fixture(f'mobile_{page}.html')
+        pc_response = {'content': pc_html, 'response_time': 0.1, 'status_code': 200}
+        mobile_response = {'content': mobile_html, 'response_time': 0.1, 'status_code': 200}
+        # 安全验证和无结果页面在提取之前就会返回，只测量 handle_response
+        if page not in ('captcha', 'noresult'):
+            cases += [
+                (f'pc.extract_baidupc_data.{page}', lambda html=pc_html, kw=keyword: pc.extract_baidupc_data(html, kw)),
+                (f'pc.get_recommend.{page}', lambda html=pc_html: pc.get_recommend(html)),
+                (f'mobile.extract_baidum_data.{page}', lambda html=mobile_html, kw=keyword: mobile.extract_baidum_data(html, kw, 1)),
+                (f'mobile.get_recommend.{page}', lambda html=mobile_html: mobile.get_recommend(html)),
+            ]
+        cases += [
+            (f'pc.handle_response.{page}',
+             lambda response=pc_response, kw=keyword: pc.handle_response(response, kw, pc.get_recommend(response['content']), True)),
+            (f'mobile.handle_response.{page}',
+             lambda response=mobile_response, kw=keyword: mobile.handle_response(response, kw, None, None, 1, True)),
+        ]
+
+    random_params = gen_random_params()
+    cases += [
+        ('util.gen_pc_cookies', lambda: gen_pc_cookies(random_params)),
+        ('util.gen_mobile_cookies', lambda: gen_mobile_cookies(random_params)),
+        ('util.convert_date_format', lambda: [convert_date_format(sample) for sample in DATE_SAMPLES]),
+    ]
+    return cases, (pc, mobile)
+
+
+def run(min_time, parser, name_filter=None):
+    cases, clients = build_cases(parser)
+    results = {}
+    try:
+        for name, func in cases:
+            if name_filter and name_filter not in name:
+                continue
+            calls, elapsed, peak = measure(func, min_time)
+            results[name] = {
+                'ops_per_sec': round(calls / elapsed, 1),
+                'mean_us': round(elapsed / calls * 1e6, 2),
+                'peak_kb': round(peak / 1024, 1),
+            }
+    finally:
+        for client in clients:
+            client.close()
+    return results
+
+
+def compare(results, baseline):
+    """按每秒调用次数与基准结果对比，返回 {名称: 当前/基准}，大于1表示变快"""
+    return {
+        name: round(result['ops_per_sec'] / baseline[name]['ops_per_sec'], 3)
+        for name, result in results.items()
+        if name in baseline and baseline[name]['ops_per_sec']
+    }
+
+
+def package_version():
+    try:
+        from importlib.metadata import version
+        return version('baidu-serp-api')
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--min-time', type=float, default=0.5, help='每项至少运行的秒数')
+    parser.add_argument('--parser', default='html.parser', help='HTML解析后端：html.parser、lxml 或 selectolax')
+    parser.add_argument('--filter', help='只运行名称包含该字符串的测试项')
+    parser.add_argument('--output', help='把结果保存为JSON文件')
+    parser.add_argument('--compare', help='与之前保存的JSON结果对比')
+    args = parser.parse_args()
+
+    report = {
+        'version': package_version(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'parser': args.parser,
+        'min_time': args.min_time,
+        'results': run(args.min_time, args.parser, args.filter),
+    }
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            report['speedup'] = compare(report['results'], json.load(f)['results'])
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from baidu_serp_api import BaiduPc, BaiduMobile, HtmlArchive, reparse
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return f.read()
+
+
+class FakeResponse:
+    status_code = 200
+    headers = {'Content-Type': 'text/html; charset=utf-8'}
+
+    def __init__(self, content):
+        self.content = content.encode('utf-8')
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeSession:
+    def __init__(self, content):
+        self.content = content
+
+    def get(self, url, **kwargs):
+        return FakeResponse(self.content)
+
+    def close(self):
+        pass
+
+
+class TestHtmlArchive(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.archive = HtmlArchive(self.tmpdir.name)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_content_addressed_dedup(self):
+        html = load_fixture('pc_normal.html')
+        response = {'content': html, 'response_time': 0.5, 'status_code': 200}
+        first = self.archive.put('pc', '黑神话', 1, None, response)
+        second = self.archive.put('pc', '黑神话', 1, None, response)
+        self.assertEqual(first, second)
+        self.assertEqual(self.archive.load(first), html)
+        stats = self.archive.stats()
+        self.assertEqual((stats['pages'], stats['blobs']), (2, 1))
+        self.assertLess(stats['stored_bytes'], stats['raw_bytes'] / 4)
+
+    def test_search_archives_response(self):
+        html = load_fixture('pc_normal.html')
+        pc_serp = BaiduPc(archive=self.archive)
+        pc_serp._session = FakeSession(html)
+        result = pc_serp.search('黑神话')
+        record, = self.archive.records()
+        self.assertEqual((record['device'], record['keyword'], record['pn']), ('pc', '黑神话', 1))
+        # 离线重新解析与在线解析结果一致
+        (_, reparsed), = reparse(self.archive, workers=1)
+        self.assertEqual(reparsed, result)
+
+    def test_archive_failure_does_not_fail_search(self):
+        pc_serp = BaiduPc(archive=self.archive)
+        pc_serp._session = FakeSession(load_fixture('pc_normal.html'))
+
+        def broken_put(*args):
+            raise sqlite3.OperationalError('database is locked')
+
+        self.archive.put = broken_put
+        with self.assertLogs('baidu_serp_api.archive', 'ERROR'):
+            self.assertEqual(pc_serp.search('黑神话')['code'], 200)
+        self.assertEqual(self.archive.stats()['failed'], 1)
+
+    def test_background_writer(self):
+        archive = HtmlArchive(self.tmpdir.name, background=True)
+        pc_serp = BaiduPc(archive=archive)
+        pc_serp._session = FakeSession(load_fixture('pc_normal.html'))
+        self.assertEqual(pc_serp.search('黑神话')['code'], 200)
+        archive.flush()
+        self.assertEqual(len(archive.records()), 1)
+        self.assertEqual(archive.stats()['archived'], 1)
+        archive.close()
+
+    def test_reparse_in_processes(self):
+        pc_html, mobile_html = load_fixture('pc_normal.html'), load_fixture('mobile_normal.html')
+        for pn in range(1, 4):
+            self.archive.put('pc', '黑神话', pn, None, {'content': pc_html, 'response_time': 0.1, 'status_code': 200})
+        self.archive.put('mobile', '黑神话', 1, None, {'content': mobile_html, 'response_time': 0.1, 'status_code': 200})
+
+        results = list(reparse(self.archive, workers=2, chunk_size=1, exclude=['recommend']))
+        self.assertEqual([record['pn'] for record, _ in results], [1, 2, 3, 1])
+        expected_pc = BaiduPc()
+        expected_pc.exclude = ['recommend']
+        expected = expected_pc.handle_response({'content': pc_html, 'response_time': 0.1, 'status_code': 200}, '黑神话', [])
+        self.assertEqual(results[0][1], expected)
+        self.assertEqual(results[3][0]['device'], 'mobile')
+        self.assertEqual(results[3][1]['code'], 200)
+        self.assertNotIn('recommend', results[3][1]['data'])
+
+        mobile_only = list(reparse(self.archive, device='mobile', workers=1))
+        self.assertEqual(len(mobile_only), 1)
+        self.assertNotIn('ext_recommend', mobile_only[0][1]['data'])
+
+
+if __name__ == '__main__':
+    unittest.main()
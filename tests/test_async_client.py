@@ -0,0 +1,57 @@
+import asyncio
+import unittest
+from baidu_serp_api import AsyncBaiduPc, AsyncBaiduMobile, HedgePolicy, SerpCache
+
+PC_HTML = '''
+<div tpl="www_index" mu="https://example.com/a" id="1"><h3>测试标题</h3></div>
+<a>下一页</a>
+'''
+
+
+class TestAsyncBaiduSerpApi(unittest.IsolatedAsyncioTestCase):
+    async def test_async_pc_parse(self):
+        async with AsyncBaiduPc() as pc:
+            async def fake_fetch(url, params, headers, proxies, abort_markers=None, timer=None):
+                return 200, {}, PC_HTML.encode('utf-8'), 'utf-8', None
+            pc._fetch = fake_fetch
+            results = await pc.search('测试', include_performance=True)
+        self.assertEqual(results['code'], 200)
+        self.assertEqual(results['data']['results'][0]['url'], 'https://example.com/a')
+        self.assertFalse(results['data']['last_page'])
+        self.assertIn('performance', results['data'])
+
+    async def test_concurrent_exclude(self):
+        # 同一客户端上并发的搜索各自使用自己的 exclude 过滤结果和生成缓存键
+        async with AsyncBaiduPc(cache=SerpCache()) as pc:
+            async def fake_fetch(url, params, headers, proxies, abort_markers=None, timer=None):
+                await asyncio.sleep(0.05 if params['wd'] == '慢' else 0.01)
+                return 200, {}, PC_HTML.encode('utf-8'), 'utf-8', None
+            pc._fetch = fake_fetch
+            exclude = ['recommend']
+            slow, fast = await asyncio.gather(pc.search('慢', exclude=exclude), pc.search('快', exclude=[]))
+            cached = await pc.search('慢', exclude=[])
+        self.assertEqual(exclude, ['recommend'])
+        self.assertNotIn('recommend', slow['data'])
+        self.assertIn('recommend', fast['data'])
+        self.assertIn('recommend', cached['data'])
+
+    async def test_no_sync_resources(self):
+        # 异步客户端不创建requests.Session和后台线程池
+        async with AsyncBaiduMobile(hedge_policy=HedgePolicy(delay=1)) as m:
+            self.assertIsNone(m._session)
+            self.assertIsNone(m._ext_executor)
+            self.assertIsNone(m._hedge_executor)
+        async with AsyncBaiduPc(hedge_policy=HedgePolicy(delay=1)) as pc:
+            self.assertIsNone(pc._session)
+            self.assertIsNone(pc._hedge_executor)
+
+    async def test_async_proxy_refused(self):
+        async with AsyncBaiduMobile(connect_timeout=2) as m:
+            results = await m.search('测试', proxies={'https': 'http://127.0.0.1:1'})
+        self.assertTrue('code' in results)
+        self.assertTrue('msg' in results)
+        self.assertEqual(results['code'], 508)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,34 @@
+import time
 import unittest
+from concurrent.futures import Future
 from baidu_serp_api import BaiduMobile
 
+MOBILE_HTML = '''
+<div tpl="www_index" order="1" data-log='{"mu": "https://example.com/m"}'><p class="cu-title">测试标题</p></div>
+<span class="c-fwb">推荐词</span>
+'''
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+        self.content = text.encode('utf-8')
+        self.status_code = 200
+        self.headers = {'qid': '123'}
+        self.encoding = None
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeSession:
+    def get(self, url, **kwargs):
+        return FakeResponse(MOBILE_HTML)
+
+    def close(self):
+        pass
+
+
 class TestBaiduSerpApi(unittest.TestCase):
     def test_baidu_mobile(self):
         m_serp = BaiduMobile()
@@ -12,5 +40,84 @@ class TestBaiduSerpApi(unittest.TestCase):
         # self.assertTrue('results' in results['data'])
         # self.assertTrue('last_page' in results['data'])
 
+    def test_ext_recommend_deadline(self):
+        m_serp = BaiduMobile(ext_recommend_timeout=0.2)
+        m_serp._session = FakeSession()
+
+        def slow_ext_recommend(*args):
+            time.sleep(1)
+            return ['慢推荐词']
+
+        m_serp.get_ext_recommend = slow_ext_recommend
+        start = time.time()
+        results = m_serp.search('测试', exclude=[])
+        self.assertLess(time.time() - start, 0.9)
+        self.assertEqual(results['code'], 200)
+        self.assertIsNone(results['data']['ext_recommend'])
+        self.assertEqual(results['data']['recommend'], ['推荐词'])
+
+    def test_ext_recommend_skipped_for_captcha(self):
+        m_serp = BaiduMobile()
+        m_serp._session = FakeSession()
+        calls = []
+        m_serp.get_ext_recommend = lambda *args: calls.append(args) or ['扩展推荐词']
+        captcha = FakeResponse('<title>百度安全验证</title>')
+        m_serp._session.get = lambda url, **kwargs: captcha
+        self.assertEqual(m_serp.search('测试', exclude=[])['code'], 501)
+        self.assertEqual(calls, [])
+        # 已提交但尚未开始的扩展推荐词请求在验证码页面被取消
+        pending = Future()
+        response = {'content': '<title>百度安全验证</title>', 'response_time': 0.1, 'status_code': 200}
+        self.assertEqual(m_serp.handle_response(response, '测试', None, pending, 1)['code'], 501)
+        self.assertTrue(pending.cancelled())
+
+    def test_ext_recommend_parallel(self):
+        m_serp = BaiduMobile()
+        m_serp._session = FakeSession()
+        m_serp.get_ext_recommend = lambda *args: ['扩展推荐词']
+        results = m_serp.search('测试', exclude=[])
+        self.assertEqual(results['data']['ext_recommend'], ['扩展推荐词'])
+
+    def test_single_pass_matches_two_pass(self):
+        m_serp = BaiduMobile()
+        page = m_serp.parse_baidum_page(MOBILE_HTML, '测试', 1)
+        self.assertEqual((page['results'], page['match_count']), m_serp.extract_baidum_data(MOBILE_HTML, '测试', 1))
+        self.assertEqual(page['recommend'], m_serp.get_recommend(MOBILE_HTML))
+        self.assertTrue(page['last_page'])
+
+    def test_search_many_keeps_exclude(self):
+        m_serp = BaiduMobile()
+        m_serp._session = FakeSession()
+        calls = []
+        m_serp.get_ext_recommend = lambda *args: calls.append(args) or ['扩展推荐词']
+        exclude = ['recommend']
+        results = dict(m_serp.search_many(['测试1', '测试2'], workers=2, exclude=exclude))
+        # 调用方传入的列表不被修改，未传入时默认不请求扩展推荐词
+        self.assertEqual(exclude, ['recommend'])
+        self.assertTrue(all('recommend' not in result['data'] for result in results.values()))
+        dict(m_serp.search_many(['测试3']))
+        self.assertEqual(calls, [])
+
+    def test_iter_pages_keeps_exclude(self):
+        m_serp = BaiduMobile()
+        m_serp._session = FakeSession()
+        exclude = ['recommend']
+        pages = list(m_serp.iter_pages('测试', max_pages=1, exclude=exclude))
+        self.assertEqual(exclude, ['recommend'])
+        self.assertEqual(pages[0][1]['code'], 200)
+        self.assertNotIn('ext_recommend', pages[0][1]['data'])
+
+    def test_search_top_n_keeps_exclude(self):
+        m_serp = BaiduMobile()
+        m_serp._session = FakeSession()
+        calls = []
+        m_serp.get_ext_recommend = lambda *args: calls.append(args) or ['扩展推荐词']
+        exclude = ['recommend']
+        self.assertEqual(m_serp.search_top_n('测试', n=10, exclude=exclude)['code'], 200)
+        self.assertEqual(exclude, ['recommend'])
+        self.assertEqual(m_serp.search_top_n('测试', n=10)['code'], 200)
+        self.assertEqual(calls, [])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,6 +1,13 @@
+import io
+import threading
+import time
 import unittest
+import requests
 from baidu_serp_api import BaiduPc
 
+PAGE_HTML = '<div tpl="www_index" mu="https://example.com/{pn}" id="1"><h3>标题{pn}</h3></div>{next}'
+
+
 class TestBaiduSerpApi(unittest.TestCase):
     def test_baidu_pc(self):
         pc_serp = BaiduPc()
@@ -12,5 +19,93 @@ class TestBaiduSerpApi(unittest.TestCase):
         # self.assertTrue('results' in results['data'])
         # self.assertTrue('last_page' in results['data'])
 
+    def test_iter_pages_stops_at_last_page(self):
+        pc_serp = BaiduPc()
+        calls = []
+
+        def fake_serp(keyword, date_range, pn, proxies, random_params, cookies=None, keep_alive=None):
+            calls.append((pn, cookies, keep_alive))
+            html = PAGE_HTML.format(pn=pn, next='下一页' if pn < 3 else '')
+            return {'content': html, 'response_time': 0.1, 'status_code': 200}
+
+        pc_serp.get_baidupc_serp = fake_serp
+        pages = list(pc_serp.iter_pages('标题', max_pages=10))
+        self.assertEqual([pn for pn, _ in pages], [1, 2, 3])
+        self.assertTrue(pages[-1][1]['data']['last_page'])
+        # 所有页面使用同一组Cookie并保持连接
+        self.assertEqual(len({cookies for _, cookies, _ in calls}), 1)
+        self.assertTrue(all(keep_alive for _, _, keep_alive in calls))
+
+    def test_search_many_and_search_exclude(self):
+        # 批量搜索与同一客户端上的单次搜索并发，各自按自己的 exclude 过滤结果
+        pc_serp = BaiduPc()
+
+        def fake_serp(keyword, date_range, pn, proxies, random_params, cookies=None, keep_alive=None):
+            time.sleep(0.05)
+            return {'content': PAGE_HTML.format(pn=1, next=''), 'response_time': 0.05, 'status_code': 200}
+
+        pc_serp.get_baidupc_serp = fake_serp
+        single = []
+        thread = threading.Thread(target=lambda: single.append(pc_serp.search('标题', exclude=[])))
+        thread.start()
+        results = dict(pc_serp.search_many(['标题1', '标题2'], workers=2, exclude=['recommend']))
+        thread.join()
+        self.assertTrue(all('recommend' not in result['data'] for result in results.values()))
+        self.assertIn('recommend', single[0]['data'])
+
+    def test_stream_download_aborts_on_captcha(self):
+        chunks = [b'<html><head><title>', '百度安全验证'.encode('utf-8'), b'</title>'] + [b'x' * 1024] * 100
+
+        class FakeStreamResponse:
+            status_code = 200
+            headers = {'Content-Type': 'text/html; charset=utf-8'}
+            closed = False
+            consumed = 0
+
+            def raise_for_status(self):
+                pass
+
+            def iter_content(self, chunk_size):
+                for chunk in chunks:
+                    FakeStreamResponse.consumed += 1
+                    yield chunk
+
+            def close(self):
+                FakeStreamResponse.closed = True
+
+        class FakeSession:
+            def get(self, url, **kwargs):
+                self.stream = kwargs.get('stream')
+                return FakeStreamResponse()
+
+            def close(self):
+                pass
+
+        pc_serp = BaiduPc(stream_download=True)
+        pc_serp._session = FakeSession()
+        results = pc_serp.search('测试')
+        self.assertEqual(results, {'code': 501, 'msg': '百度PC安全验证'})
+        self.assertTrue(pc_serp._session.stream)
+        self.assertTrue(FakeStreamResponse.closed)
+        self.assertLess(FakeStreamResponse.consumed, len(chunks))
+
+    def test_stream_download_closes_on_http_error(self):
+        response = requests.Response()
+        response.status_code = 503
+        response.raw = io.BytesIO(b'x' * 1024)
+
+        class FakeSession:
+            def get(self, url, **kwargs):
+                return response
+
+            def close(self):
+                pass
+
+        pc_serp = BaiduPc(stream_download=True)
+        pc_serp._session = FakeSession()
+        self.assertEqual(pc_serp.search('测试')['code'], 522)
+        self.assertTrue(response.raw.closed)
+
+
 if __name__ == '__main__':
     unittest.main()
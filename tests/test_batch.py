@@ -0,0 +1,78 @@
+import asyncio
+import time
+import unittest
+from baidu_serp_api.batch import imap_bounded, aimap_bounded, fan_out_pages, merge_page_results
+
+
+class TestImapBounded(unittest.TestCase):
+    def test_ordered(self):
+        def slow_square(x):
+            time.sleep(0.01 * (5 - x))
+            return x * x
+        self.assertEqual(list(imap_bounded(slow_square, range(5), workers=3, ordered=True)), [0, 1, 4, 9, 16])
+
+    def test_unordered_backpressure(self):
+        consumed = []
+
+        def gen():
+            for i in range(100):
+                consumed.append(i)
+                yield i
+
+        results = imap_bounded(lambda x: x, gen(), workers=2)
+        first = next(results)
+        # 仅预取 workers * 2 个任务，而不是整个输入
+        self.assertLessEqual(len(consumed), 6)
+        self.assertEqual(sorted([first] + list(results)), list(range(100)))
+
+
+class TestAimapBounded(unittest.IsolatedAsyncioTestCase):
+    async def test_ordered(self):
+        async def double(x):
+            await asyncio.sleep(0.001 * (10 - x))
+            return x * 2
+        results = [r async for r in aimap_bounded(double, range(10), workers=4, ordered=True)]
+        self.assertEqual(results, [x * 2 for x in range(10)])
+
+
+def _page(urls, last_page=False):
+    results = [{'title': f'标题{u}', 'url': u, 'ranking': i + 1} for i, u in enumerate(urls)]
+    return {'code': 200, 'msg': 'ok', 'data': {'results': results, 'recommend': [], 'last_page': last_page, 'match_count': len(results)}}
+
+
+class TestTopN(unittest.TestCase):
+    def test_fan_out_stops_at_last_page(self):
+        def fetch_page(pn):
+            if pn > 2:
+                time.sleep(1)
+            return _page([f'u{pn}'], last_page=pn == 2), pn == 2
+
+        start = time.time()
+        results = fan_out_pages(fetch_page, range(1, 6))
+        self.assertEqual(sorted(results), [1, 2])
+        # 不等待最后一页之后的慢请求
+        self.assertLess(time.time() - start, 0.9)
+
+    def test_merge_dedupes_and_reranks(self):
+        merged = merge_page_results({1: _page(['a', 'b']), 2: _page(['b', 'c'], last_page=True)}, '标题', 10)
+        results = merged['data']['results']
+        self.assertEqual([r['url'] for r in results], ['a', 'b', 'c'])
+        self.assertEqual([r['ranking'] for r in results], [1, 2, 3])
+        self.assertEqual(merged['data']['match_count'], 3)
+        self.assertTrue(merged['data']['last_page'])
+
+    def test_merge_returns_first_page_error(self):
+        error = {'code': 501, 'msg': '百度PC安全验证'}
+        self.assertEqual(merge_page_results({1: error, 2: _page(['a'])}, '标题', 10), error)
+
+    def test_merge_stops_at_failed_middle_page(self):
+        error = {'code': 504, 'msg': '读取超时'}
+        merged = merge_page_results({1: _page(['a']), 2: error, 3: _page(['c'], last_page=True)}, '标题', 10)
+        self.assertEqual([r['url'] for r in merged['data']['results']], ['a'])
+        self.assertFalse(merged['data']['complete'])
+        self.assertEqual(merged['data']['failed_page'], {'pn': 2, 'code': 504, 'msg': '读取超时'})
+        self.assertFalse(merged['data']['last_page'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import time
+import unittest
+from baidu_serp_api import BaiduPc, BaiduMobile, CircuitBreaker, ProxyPool, RetryPolicy
+from baidu_serp_api.breaker import PC_SERP_ENDPOINT, MOBILE_REC_ENDPOINT, CLOSED, OPEN, HALF_OPEN
+
+PROXY_A = {'http': 'http://10.0.0.1:8080', 'https': 'http://10.0.0.1:8080'}
+PROXY_B = {'http': 'http://10.0.0.2:8080', 'https': 'http://10.0.0.2:8080'}
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_open_half_open_closed(self):
+        events = []
+        breaker = CircuitBreaker(failure_threshold=2, recovery_time=0.05, on_transition=lambda *event: events.append(event))
+        for _ in range(2):
+            self.assertIsNone(breaker.allow(PC_SERP_ENDPOINT, PROXY_A))
+            breaker.report(PC_SERP_ENDPOINT, PROXY_A, 509)
+        # 代理熔断不影响其他代理和接口
+        self.assertEqual(breaker.allow(PC_SERP_ENDPOINT, PROXY_A), 'proxy:http://10.0.0.1:8080')
+        self.assertIsNone(breaker.allow(PC_SERP_ENDPOINT, PROXY_B))
+        breaker.report(PC_SERP_ENDPOINT, PROXY_B, 200)
+        self.assertEqual(breaker.state('endpoint:' + PC_SERP_ENDPOINT), CLOSED)
+
+        time.sleep(0.06)
+        self.assertEqual(breaker.state('proxy:http://10.0.0.1:8080'), HALF_OPEN)
+        self.assertIsNone(breaker.allow(PC_SERP_ENDPOINT, PROXY_A))
+        # 半开状态只放行一个试探请求
+        self.assertIsNotNone(breaker.allow(PC_SERP_ENDPOINT, PROXY_A))
+        breaker.report(PC_SERP_ENDPOINT, PROXY_A, 200)
+        self.assertEqual(breaker.state('proxy:http://10.0.0.1:8080'), CLOSED)
+        self.assertEqual([event[1:] for event in events], [(CLOSED, OPEN), (OPEN, HALF_OPEN), (HALF_OPEN, CLOSED)])
+        self.assertEqual(len(breaker.transitions()), 3)
+        self.assertEqual(breaker.stats()['rejected'], 2)
+
+    def test_half_open_failure_reopens(self):
+        breaker = CircuitBreaker(failure_threshold=1, recovery_time=0.02)
+        breaker.allow(PC_SERP_ENDPOINT)
+        breaker.report(PC_SERP_ENDPOINT, None, 504)
+        self.assertEqual(breaker.state('endpoint:' + PC_SERP_ENDPOINT), OPEN)
+        time.sleep(0.03)
+        self.assertIsNone(breaker.allow(PC_SERP_ENDPOINT))
+        breaker.report(PC_SERP_ENDPOINT, None, 503)
+        self.assertEqual(breaker.stats()['circuits']['endpoint:' + PC_SERP_ENDPOINT]['state'], OPEN)
+
+    def test_attribution(self):
+        breaker = CircuitBreaker(failure_threshold=1)
+        # 5xx计入接口，代理视为可用
+        breaker.report(PC_SERP_ENDPOINT, PROXY_A, 522)
+        self.assertEqual(breaker.state('endpoint:' + PC_SERP_ENDPOINT), OPEN)
+        self.assertEqual(breaker.state('proxy:http://10.0.0.1:8080'), CLOSED)
+        # 验证码说明代理和接口都可用
+        breaker.report(MOBILE_REC_ENDPOINT, PROXY_B, 501)
+        self.assertEqual(breaker.state('proxy:http://10.0.0.2:8080'), CLOSED)
+
+    def test_proxies_without_https_key(self):
+        breaker = CircuitBreaker(failure_threshold=1)
+        # 只有 all 键的代理按该地址熔断，值为空的视为直连
+        breaker.report(PC_SERP_ENDPOINT, {'all': 'http://10.0.0.3:8080'}, 504)
+        self.assertEqual(breaker.state('proxy:http://10.0.0.3:8080'), OPEN)
+        breaker.report(PC_SERP_ENDPOINT, {'https': None}, 504)
+        self.assertEqual(breaker.state('endpoint:' + PC_SERP_ENDPOINT), OPEN)
+        self.assertIsNotNone(breaker.allow(PC_SERP_ENDPOINT, {'https': None}))
+
+    def test_client_fails_fast_and_fails_over(self):
+        breaker = CircuitBreaker(failure_threshold=1, recovery_time=60)
+        pc_serp = BaiduPc(circuit_breaker=breaker)
+        calls = []
+
+        def fake_fetch(keyword, date_range, pn, proxies, random_params, cookies=None, keep_alive=None):
+            calls.append(proxies)
+            return {'code': 509, 'msg': '代理连接超时'}
+
+        pc_serp._get_baidupc_serp = fake_fetch
+        self.assertEqual(pc_serp.search('测试', proxies=PROXY_A)['code'], 509)
+        self.assertEqual(pc_serp.search('测试', proxies=PROXY_A)['code'], 524)
+        self.assertEqual(len(calls), 1)
+
+        # 配合重试策略和代理池时，熔断的代理直接切换到其他代理
+        pc_serp.proxy_pool = ProxyPool([PROXY_A, PROXY_B])
+        pc_serp.retry_policy = RetryPolicy(backoff=0)
+        calls.clear()
+        pc_serp._get_baidupc_serp = lambda *args, **kwargs: calls.append(args[3]) or {'code': 404, 'msg': '未找到相关结果'}
+        self.assertEqual(pc_serp.search('测试', proxies=PROXY_A)['code'], 404)
+        self.assertEqual(calls, [PROXY_B])
+
+    def test_mobile_rec_breaker(self):
+        breaker = CircuitBreaker(failure_threshold=1, recovery_time=60)
+        m_serp = BaiduMobile(connect_timeout=1, read_timeout=1, circuit_breaker=breaker)
+        breaker.report(MOBILE_REC_ENDPOINT, None, 504)
+        m_serp._session_for = lambda proxies: self.fail('熔断时不应发出请求')
+        random_params = {'baiduid': 'A' * 32, 'timestamp': 0, 'r': '1234'}
+        self.assertEqual(m_serp.get_ext_recommend('测试', 'qid', random_params, None), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
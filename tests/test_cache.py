@@ -0,0 +1,143 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+from baidu_serp_api import BaiduPc, SerpCache, SqliteCache
+from baidu_serp_api.cache import make_cache_key, cached_call, acached_call
+
+PAGE_HTML = '<div tpl="www_index" mu="https://example.com/{pn}" id="1"><h3>标题{pn}</h3></div>'
+
+
+def _ok(value):
+    return {'code': 200, 'msg': 'ok', 'data': {'results': [value]}}
+
+
+class TestSerpCache(unittest.TestCase):
+    def test_key_normalization(self):
+        self.assertEqual(make_cache_key('pc', ' 关键词 ', None, None, ['b', 'a']), make_cache_key('pc', '关键词', 1, '', ['a', 'b']))
+        self.assertNotEqual(make_cache_key('pc', '关键词'), make_cache_key('mobile', '关键词'))
+
+    def test_lru_eviction(self):
+        cache = SerpCache(maxsize=2)
+        cache.set('a', _ok(1))
+        cache.set('b', _ok(2))
+        cache.get('a')
+        cache.set('c', _ok(3))
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), _ok(1))
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_ttl_and_errors(self):
+        cache = SerpCache(ttl=0.01)
+        cache.set('a', _ok(1))
+        cache.set('e', {'code': 501, 'msg': '百度PC安全验证'})
+        time.sleep(0.02)
+        self.assertIsNone(cache.get('a'))
+        self.assertIsNone(cache.get('e'))
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['expirations'], stats['size']), (0, 2, 1, 0))
+
+    def test_search_hit_and_bypass(self):
+        calls = []
+
+        def fake_serp(keyword, date_range, pn, proxies, random_params, cookies=None, keep_alive=None):
+            calls.append(pn)
+            return {'content': PAGE_HTML.format(pn=len(calls)), 'response_time': 0.1, 'status_code': 200}
+
+        pc_serp = BaiduPc(cache=SerpCache())
+        pc_serp.get_baidupc_serp = fake_serp
+        first = pc_serp.search('标题', include_performance=True)
+        second = pc_serp.search(' 标题 ', include_performance=True)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(second['data']['results'], first['data']['results'])
+        self.assertTrue(second['data']['performance']['cache_hit'])
+        # 修改返回结果不影响缓存内容
+        second['data']['results'].clear()
+        self.assertEqual(pc_serp.search('标题')['data']['results'], first['data']['results'])
+
+        refreshed = pc_serp.search('标题', bypass_cache=True)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(refreshed['data']['results'][0]['title'], '标题2')
+        self.assertEqual(pc_serp.search('标题')['data']['results'][0]['title'], '标题2')
+
+
+    def test_lookup_counted_once(self):
+        cache = SerpCache()
+        cached_call(cache, 'k', lambda: _ok(1))
+        cached_call(cache, 'k', lambda: _ok(2))
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+class TestSqliteCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'serp.db')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_shared_between_instances(self):
+        writer, reader = SqliteCache(self.path), SqliteCache(self.path)
+        result = {'code': 200, 'msg': 'ok', 'data': {'results': [{'title': '标题'}], 'performance': {'response_time': 1}}}
+        writer.set('k', result)
+        writer.set('e', {'code': 404, 'msg': '未找到相关结果'})
+        self.assertEqual(reader.get('k'), {'code': 200, 'msg': 'ok', 'data': {'results': [{'title': '标题'}]}})
+        self.assertIsNone(reader.get('e'))
+        self.assertEqual(reader._conn().execute('PRAGMA journal_mode').fetchone()[0], 'wal')
+        writer.close()
+        reader.close()
+
+    def test_ttl_and_compact(self):
+        cache = SqliteCache(self.path, ttl=0.01)
+        cache.set('a', _ok(1))
+        cache.set('b', _ok(2), ttl=60)
+        time.sleep(0.02)
+        self.assertEqual(cache.compact(), 1)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get('b'), _ok(2))
+        self.assertEqual(len(cache), 1)
+        cache.close()
+
+    def test_single_flight_across_instances(self):
+        calls = []
+
+        def fake_serp(keyword, date_range, pn, proxies, random_params, cookies=None, keep_alive=None):
+            calls.append(pn)
+            time.sleep(0.2)
+            return {'content': PAGE_HTML.format(pn=1), 'response_time': 0.2, 'status_code': 200}
+
+        clients = [BaiduPc(cache=SqliteCache(self.path)) for _ in range(3)]
+        results = []
+        for client in clients:
+            client.get_baidupc_serp = fake_serp
+        threads = [threading.Thread(target=lambda c=c: results.append(c.search('标题'))) for c in clients]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # 三个实例只发出一次请求，其余等待并读取缓存
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len({str(r) for r in results}), 1)
+        for client in clients:
+            client.cache.close()
+
+    def test_async_cached_call(self):
+        cache = SqliteCache(self.path)
+
+        async def fetch():
+            return _ok(1)
+
+        async def run():
+            first = await acached_call(cache, 'k', fetch)
+            second = await acached_call(cache, 'k', fetch)
+            return first, second
+        self.assertEqual(asyncio.run(run()), (_ok(1), _ok(1)))
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+        cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import time
+import unittest
+from baidu_serp_api import BaiduPc, BaiduMobile, FingerprintPool
+from baidu_serp_api.fingerprint import gen_fingerprints, finalize_fingerprint
+from baidu_serp_api.util import gen_random_params, gen_pc_cookies, gen_mobile_cookies
+
+
+def cookie_names(cookies):
+    return [part.split('=', 1)[0] for part in cookies.split('; ')]
+
+
+class TestFingerprint(unittest.TestCase):
+    def test_same_structure_as_generators(self):
+        for device, gen_cookies in (('pc', gen_pc_cookies), ('mobile', gen_mobile_cookies)):
+            with self.subTest(device=device):
+                random_params = gen_random_params()
+                params, cookies = finalize_fingerprint(gen_fingerprints(device, 1)[0])
+                self.assertEqual(sorted(params), sorted(random_params))
+                self.assertEqual(cookie_names(cookies), cookie_names(gen_cookies(random_params)))
+                self.assertNotIn('{ts}', cookies)
+                self.assertLessEqual(abs(params['timestamp'] - time.time() * 1000), 1000)
+                self.assertTrue(1000 <= params['inputT'] - params['rsv_sug4'] <= 3000)
+                self.assertEqual(len(params['baiduid']), 32)
+                self.assertEqual(params['rsv_iqid'], params['rqid'])
+
+    def test_fingerprints_are_unique(self):
+        fingerprints = gen_fingerprints('mobile', 200)
+        self.assertEqual(len({cookies for _, cookies in fingerprints}), 200)
+
+    def test_pool_refills_in_background(self):
+        pool = FingerprintPool('pc', size=8, low_water=4)
+        for _ in range(5):
+            pool.pop()
+        deadline = time.time() + 2
+        while len(pool) < 8 and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(pool), 8)
+        stats = pool.stats()
+        self.assertEqual((stats['pooled'], stats['inline']), (5, 0))
+        self.assertGreaterEqual(stats['batches'], 2)
+        pool.close()
+
+    def test_client_uses_pool(self):
+        pool = FingerprintPool('pc', size=4)
+        pc_serp = BaiduPc(fingerprint_pool=pool)
+        seen = []
+
+        def fake_serp(keyword, date_range, pn, proxies, random_params, cookies=None, keep_alive=None):
+            seen.append(cookies)
+            return {'code': 501, 'msg': '百度PC安全验证'}
+
+        pc_serp.get_baidupc_serp = fake_serp
+        pc_serp.search('测试')
+        self.assertEqual(pool.stats()['pooled'], 1)
+        self.assertIn('BAIDUID=', seen[0])
+        with self.assertRaises(ValueError):
+            BaiduMobile(fingerprint_pool=pool)
+        pool.close()
+
+    def test_invalid_pool_size(self):
+        for size, low_water in ((0, None), (4, 4), (4, -1)):
+            with self.assertRaises(ValueError):
+                FingerprintPool('pc', size=size, low_water=low_water)
+        pool = FingerprintPool('pc', size=1)
+        time.sleep(0.05)
+        self.assertEqual(pool.stats()['batches'], 1)
+        pool.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
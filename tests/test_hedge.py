@@ -0,0 +1,150 @@
+import asyncio
+import time
+import unittest
+from concurrent.futures import Future, ThreadPoolExecutor
+from baidu_serp_api import BaiduPc, AsyncBaiduPc, HedgePolicy, ProxyPool
+from baidu_serp_api.hedge import hedged_call, ahedged_call
+
+PROXY_A = {'http': 'http://10.0.0.1:8080', 'https': 'http://10.0.0.1:8080'}
+PROXY_B = {'http': 'http://10.0.0.2:8080', 'https': 'http://10.0.0.2:8080'}
+
+PC_HTML = '''
+<div tpl="www_index" mu="https://example.com/a" id="1"><h3>测试标题</h3></div>
+<a>下一页</a>
+'''
+
+
+def slow_for(slow_proxies, delay, calls):
+    def fake_fetch(keyword, date_range, pn, proxies, random_params, cookies=None, keep_alive=None):
+        calls.append(proxies)
+        if proxies == slow_proxies:
+            time.sleep(delay)
+        return {'content': PC_HTML, 'response_time': 0.01, 'status_code': 200}
+    return fake_fetch
+
+
+class TestHedgePolicy(unittest.TestCase):
+    def test_percentile_delay(self):
+        policy = HedgePolicy(percentile=90, min_samples=10)
+        for i in range(9):
+            policy.observe(i / 10)
+        self.assertIsNone(policy.hedge_delay())
+        policy.observe(0.9)
+        self.assertAlmostEqual(policy.hedge_delay(), 0.9)
+        self.assertEqual(HedgePolicy(delay=0.2).hedge_delay(), 0.2)
+
+    def test_hedge_through_other_proxy(self):
+        policy = HedgePolicy(delay=0.05, max_extra_ratio=1)
+        pc_serp = BaiduPc(proxy_pool=ProxyPool([PROXY_A, PROXY_B]), hedge_policy=policy)
+        calls = []
+        pc_serp._get_baidupc_serp = slow_for(PROXY_A, 0.5, calls)
+        start = time.monotonic()
+        result = pc_serp.search('测试', proxies=PROXY_A)
+        self.assertEqual(result['code'], 200)
+        self.assertLess(time.monotonic() - start, 0.4)
+        self.assertEqual(calls, [PROXY_A, PROXY_B])
+        stats = policy.stats()
+        self.assertEqual((stats['requests'], stats['hedged'], stats['hedge_wins']), (1, 1, 1))
+        pc_serp.close()
+
+    def test_extra_ratio_cap(self):
+        policy = HedgePolicy(delay=0.01, max_extra_ratio=0.5)
+        pc_serp = BaiduPc(hedge_policy=policy)
+        calls = []
+        pc_serp._get_baidupc_serp = slow_for(None, 0.03, calls)
+        for _ in range(4):
+            self.assertEqual(pc_serp.search('测试')['code'], 200)
+        # 4个请求最多对冲2次
+        self.assertEqual(policy.stats()['hedged'], 2)
+        self.assertEqual(len(calls), 6)
+        pc_serp.close()
+
+    def test_fast_primary_not_hedged(self):
+        policy = HedgePolicy(delay=0.5, max_extra_ratio=1)
+        pc_serp = BaiduPc(hedge_policy=policy)
+        calls = []
+        pc_serp._get_baidupc_serp = slow_for(PROXY_A, 0, calls)
+        self.assertEqual(pc_serp.search('测试')['code'], 200)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(policy.stats()['hedged'], 0)
+        pc_serp.close()
+
+    def test_concurrent_callers_not_queued(self):
+        # 并发调用时第一个请求不应在线程池中排队，排队时间也不应触发对冲
+        policy = HedgePolicy(delay=0.5, max_extra_ratio=0.5)
+        pc_serp = BaiduPc(hedge_policy=policy)
+        calls = []
+        pc_serp._get_baidupc_serp = slow_for(None, 0.3, calls)
+        start = time.monotonic()
+        results = list(pc_serp.search_many([f'测试{i}' for i in range(16)], workers=16))
+        self.assertLess(time.monotonic() - start, 0.8)
+        self.assertTrue(all(result['code'] == 200 for _, result in results))
+        self.assertEqual(policy.stats()['hedged'], 0)
+        self.assertEqual(len(calls), 16)
+        pc_serp.close()
+
+    def test_loser_ext_recommend_cancelled(self):
+        # 落后的移动端请求完成后，其扩展推荐词后台请求应被取消
+        policy = HedgePolicy(delay=0.05, max_extra_ratio=1)
+        ext_futures = []
+
+        def fetch(sleep, content):
+            time.sleep(sleep)
+            ext_futures.append(Future())
+            return {'content': content, 'status_code': 200}, ext_futures[-1]
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            response, ext = hedged_call(policy, executor, lambda: fetch(0.3, PC_HTML), lambda: fetch(0, PC_HTML))
+        # 对冲请求先返回，第一个请求在线程池关闭前完成
+        self.assertEqual(len(ext_futures), 2)
+        self.assertIs(ext, ext_futures[0])
+        self.assertFalse(ext.cancelled())
+        self.assertTrue(ext_futures[1].cancelled())
+
+        # 第一个请求先失败、对冲请求成功时，失败结果的扩展推荐词请求同样被取消
+        ext_futures.clear()
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            response, ext = hedged_call(policy, executor, lambda: fetch(0.1, '百度安全验证'), lambda: fetch(0.15, PC_HTML))
+        self.assertIs(ext, ext_futures[1])
+        self.assertTrue(ext_futures[0].cancelled())
+        self.assertFalse(ext_futures[1].cancelled())
+
+
+class TestAsyncHedge(unittest.IsolatedAsyncioTestCase):
+    async def test_loser_cancelled(self):
+        policy = HedgePolicy(delay=0.05, max_extra_ratio=1)
+        cancelled = []
+        async with AsyncBaiduPc(proxy_pool=ProxyPool([PROXY_A, PROXY_B]), hedge_policy=policy) as pc:
+            async def fake_fetch(keyword, date_range, pn, proxies, random_params, cookies=None, keep_alive=None):
+                if proxies == PROXY_A:
+                    try:
+                        await asyncio.sleep(1)
+                    except asyncio.CancelledError:
+                        cancelled.append(proxies)
+                        raise
+                return {'content': PC_HTML, 'response_time': 0.01, 'status_code': 200}
+            pc._get_baidupc_serp = fake_fetch
+            result = await pc.search('测试', proxies=PROXY_A)
+        self.assertEqual(result['code'], 200)
+        self.assertEqual(cancelled, [PROXY_A])
+        self.assertEqual(policy.stats()['hedge_wins'], 1)
+
+    async def test_loser_ext_task_cancelled(self):
+        policy = HedgePolicy(delay=0.05, max_extra_ratio=1)
+        ext_tasks = []
+
+        async def fetch(sleep, content):
+            await asyncio.sleep(sleep)
+            ext_tasks.append(asyncio.ensure_future(asyncio.sleep(1)))
+            return {'content': content, 'status_code': 200}, ext_tasks[-1]
+
+        response, ext = await ahedged_call(policy, lambda: fetch(0.1, '百度安全验证'), lambda: fetch(0.15, PC_HTML))
+        self.assertIs(ext, ext_tasks[1])
+        await asyncio.sleep(0)
+        self.assertTrue(ext_tasks[0].cancelled())
+        self.assertFalse(ext_tasks[1].cancelled())
+        ext.cancel()
+
+
+if __name__ == '__main__':
+    unittest.main()
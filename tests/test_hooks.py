@@ -0,0 +1,89 @@
+import asyncio
+import unittest
+from baidu_serp_api import BaiduPc, BaiduMobile, AsyncBaiduMobile, MockBaiduServer, Hooks, RetryPolicy
+
+
+def recording_hooks():
+    hooks = Hooks()
+    events = []
+    hooks.before_request(lambda span: events.append(('before_request', span.endpoint, span.attempt)))
+    hooks.after_response(lambda span: events.append(('after_response', span.endpoint, span.code)))
+    hooks.on_error(lambda span: events.append(('on_error', span.endpoint, span.code)))
+    hooks.on_retry(lambda span, delay: events.append(('on_retry', span.endpoint, span.attempt)))
+    hooks.on_parse_complete(lambda span: events.append(('on_parse_complete', span.endpoint, span.code)))
+    return hooks, events
+
+
+class TestHooks(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = MockBaiduServer(seed=1)
+        cls.server.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.server.errors = {}
+
+    def test_pc_lifecycle(self):
+        hooks, events = recording_hooks()
+        spans = []
+        hooks.after_response(spans.append)
+        with BaiduPc(base_url=self.server.base_url, hooks=hooks) as pc_serp:
+            pc_serp.search('黑神话', pn=2)
+        self.assertEqual(events, [
+            ('before_request', 'www.baidu.com/s', 1),
+            ('after_response', 'www.baidu.com/s', 200),
+            ('on_parse_complete', 'www.baidu.com/s', 200),
+        ])
+        span = spans[0]
+        self.assertEqual((span.keyword, span.pn, span.proxy), ('黑神话', 2, 'direct'))
+        self.assertEqual(span.attributes['status_code'], 200)
+        self.assertIn('ttfb', span.attributes['phases'])
+        self.assertGreater(span.duration, 0)
+
+    def test_retry_and_error(self):
+        hooks, events = recording_hooks()
+        self.server.errors = {503: 1}
+        pc_serp = BaiduPc(base_url=self.server.base_url, hooks=hooks, retry_policy=RetryPolicy(max_attempts=2, backoff=0))
+        self.assertEqual(pc_serp.search('黑神话')['code'], 522)
+        pc_serp.close()
+        self.assertEqual(events, [
+            ('before_request', 'www.baidu.com/s', 1),
+            ('after_response', 'www.baidu.com/s', 522),
+            ('on_error', 'www.baidu.com/s', 522),
+            ('on_retry', 'www.baidu.com/s', 1),
+            ('before_request', 'www.baidu.com/s', 2),
+            ('after_response', 'www.baidu.com/s', 522),
+            ('on_error', 'www.baidu.com/s', 522),
+        ])
+
+    def test_mobile_rec_and_callback_errors(self):
+        hooks, events = recording_hooks()
+
+        @hooks.before_request
+        def broken(span):
+            raise RuntimeError('hook failure')
+
+        m_serp = BaiduMobile(base_url=self.server.base_url, hooks=hooks)
+        with self.assertLogs('baidu_serp_api.hooks', 'ERROR'):
+            self.assertEqual(m_serp.search('黑神话', exclude=[])['code'], 200)
+        m_serp.close()
+        self.assertIn(('after_response', 'm.baidu.com/rec', 200), events)
+        self.assertEqual(events[-1], ('on_parse_complete', 'm.baidu.com/s', 200))
+        hooks.remove(broken)
+
+    def test_async_client(self):
+        hooks, events = recording_hooks()
+
+        async def search():
+            async with AsyncBaiduMobile(base_url=self.server.base_url, hooks=hooks) as m_serp:
+                return await m_serp.search('黑神话', pn=2)
+        self.assertEqual(asyncio.run(search())['code'], 200)
+        self.assertEqual([event[0] for event in events], ['before_request', 'after_response', 'on_parse_complete'])
+
+
+if __name__ == '__main__':
+    unittest.main()
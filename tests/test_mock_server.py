@@ -0,0 +1,84 @@
+import asyncio
+import unittest
+import requests
+from baidu_serp_api import BaiduPc, BaiduMobile, AsyncBaiduPc, MockBaiduServer
+from baidu_serp_api.mock_server import latency_sampler, validate_request, parse_cookies
+from baidu_serp_api.util import gen_random_params, gen_pc_cookies
+
+
+class TestMockServer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = MockBaiduServer(seed=1)
+        cls.server.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.server.errors = {}
+        self.server.captcha_rate = 0
+
+    def test_pc_and_mobile_pages(self):
+        with BaiduPc(base_url=self.server.base_url) as pc_serp:
+            result = pc_serp.search('黑神话')
+            self.assertEqual(result['code'], 200)
+            self.assertTrue(result['data']['results'])
+            self.assertEqual(pc_serp.search('黑神话', pn=6)['code'], 404)
+        m_serp = BaiduMobile(base_url=self.server.base_url)
+        result = m_serp.search('黑神话', exclude=[])
+        self.assertEqual(result['code'], 200)
+        self.assertIn('黑神话攻略', result['data']['ext_recommend'])
+        self.assertTrue(m_serp.search('黑神话', pn=5)['data']['last_page'])
+        m_serp.close()
+        # 客户端构造的请求都应通过参数和Cookie检查
+        self.assertFalse(set(self.server.stats()['invalid']) & {'mobile', 'rec'})
+
+    def test_error_mapping(self):
+        pc_serp = BaiduPc(base_url=self.server.base_url)
+        for error, code in ((429, 521), (503, 522), (403, 520), ('reset', 514), ('truncate', 502)):
+            self.server.errors = {error: 1}
+            self.assertEqual(pc_serp.search('黑神话')['code'], code, error)
+        self.server.errors = {}
+        self.server.captcha_rate = 1
+        self.assertEqual(pc_serp.search('黑神话')['code'], 501)
+        pc_serp.close()
+
+    def test_invalid_request_gets_captcha(self):
+        response = requests.get(self.server.base_url + '/s', params={'wd': '测试'}, headers={'Host': 'www.baidu.com'})
+        self.assertIn('百度安全验证', response.text)
+        self.assertIn('缺少参数 rsv_t', self.server.invalid_requests()[-1]['problems'])
+
+    def test_async_client(self):
+        async def search():
+            async with AsyncBaiduPc(base_url=self.server.base_url) as pc:
+                return await pc.search('site:example.com')
+        self.assertEqual(asyncio.run(search())['code'], 200)
+
+
+class TestMockServerHelpers(unittest.TestCase):
+    def test_latency_sampler(self):
+        self.assertEqual(latency_sampler(0.1)(), 0.1)
+        sample = latency_sampler('uniform:0.1,0.2')()
+        self.assertTrue(0.1 <= sample <= 0.2)
+        self.assertGreater(latency_sampler('lognormal:0.2,0.5')(), 0)
+        with self.assertRaises(ValueError):
+            latency_sampler('pareto:1')
+
+    def test_validate_pc_request(self):
+        random_params = gen_random_params()
+        cookies = parse_cookies(gen_pc_cookies(random_params))
+        params = {'wd': '测试', 'ie': 'utf-8', 'oq': '测试', 'rsv_pq': random_params['rsv_pq'], 'rsv_t': random_params['rsv_t']}
+        self.assertEqual(validate_request('pc', params, cookies), [])
+        self.assertEqual(validate_request('pc', dict(params, oq='其他'), cookies), ['oq 与 wd 不一致'])
+
+    def test_invalid_error_config(self):
+        with self.assertRaises(ValueError):
+            MockBaiduServer(errors={'timeout': 0.1})
+        with self.assertRaises(ValueError):
+            MockBaiduServer(errors={429: 0.6, 503: 0.6})
+
+
+if __name__ == '__main__':
+    unittest.main()
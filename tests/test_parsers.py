@@ -0,0 +1,116 @@
+import importlib.util
+import os
+import unittest
+from baidu_serp_api import BaiduPc, BaiduMobile
+from baidu_serp_api.parsers import PARSERS, parse_html, slice_targets
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return f.read()
+
+
+def backend_available(parser):
+    module = {'lxml': 'lxml', 'selectolax': 'selectolax'}.get(parser)
+    return module is None or importlib.util.find_spec(module) is not None
+
+
+class TestParserBackends(unittest.TestCase):
+    """所有解析后端在保存的页面上必须产生完全相同的结果"""
+
+    def test_pc_backends_identical(self):
+        html = load_fixture('pc_normal.html')
+        expected = BaiduPc().extract_baidupc_data(html, '黑神话')
+        self.assertEqual(len(expected[0]), 10)
+        for parser in PARSERS:
+            if not backend_available(parser):
+                continue
+            with self.subTest(parser=parser):
+                self.assertEqual(BaiduPc(parser=parser).extract_baidupc_data(html, '黑神话'), expected)
+
+    def test_mobile_backends_identical(self):
+        html = load_fixture('mobile_normal.html')
+        expected = BaiduMobile().parse_baidum_page(html, '黑神话', 2)
+        self.assertEqual(len(expected['results']), 10)
+        self.assertEqual(expected['results'][0]['ranking'], 11)
+        for parser in PARSERS:
+            if not backend_available(parser):
+                continue
+            with self.subTest(parser=parser):
+                page = BaiduMobile(parser=parser).parse_baidum_page(html, '黑神话', 2)
+                # 推荐词经过集合排重，顺序不固定
+                self.assertEqual(sorted(page.pop('recommend')), sorted(expected['recommend']))
+                self.assertEqual(page, {k: v for k, v in expected.items() if k != 'recommend'})
+
+    def test_targeted_parse_identical(self):
+        pc_html = load_fixture('pc_normal.html')
+        mobile_html = load_fixture('mobile_normal.html')
+        expected_pc = BaiduPc().extract_baidupc_data(pc_html, '黑神话')
+        expected_mobile = BaiduMobile().parse_baidum_page(mobile_html, '黑神话', 1)
+        expected_mobile['recommend'] = sorted(expected_mobile['recommend'])
+        for parser in PARSERS:
+            if not backend_available(parser):
+                continue
+            with self.subTest(parser=parser):
+                pc = BaiduPc(parser=parser, targeted_parse=True)
+                self.assertEqual(pc.extract_baidupc_data(pc_html, '黑神话'), expected_pc)
+                page = BaiduMobile(parser=parser, targeted_parse=True).parse_baidum_page(mobile_html, '黑神话', 1)
+                page['recommend'] = sorted(page['recommend'])
+                self.assertEqual(page, expected_mobile)
+
+    def test_slice_targets(self):
+        html = (
+            '<html><head><script>var s = \'<div tpl="www_index">\';</script></head><body>'
+            '<div class="nav"><a>导航</a></div>'
+            '<div tpl="www_index" id="1"><div><div>内层</div></div><!-- <div> --></div>'
+            '<div tpl="other">忽略</div><span class="c-fwb x">推荐</span></body></html>'
+        )
+        self.assertEqual(
+            slice_targets(html),
+            '<div tpl="www_index" id="1"><div><div>内层</div></div></div>\n<span class="c-fwb x">推荐</span>'
+        )
+
+    def test_unknown_parser(self):
+        with self.assertRaises(ValueError):
+            parse_html('<p></p>', 'html5lib')
+        with self.assertRaises(ValueError):
+            BaiduPc(parser='html5lib')
+
+
+class TestFixturePages(unittest.TestCase):
+    """保存的各类页面（site:查询、安全验证、无结果、最后一页）的处理结果"""
+
+    CASES = {
+        'site': ('site:example.com', 200, 4, True),
+        'captcha': ('黑神话', 501, 0, None),
+        'noresult': ('黑神话', 404, 0, None),
+        'last': ('黑神话', 200, 6, True),
+    }
+
+    def test_pc_pages(self):
+        pc = BaiduPc()
+        for page, (keyword, code, count, last_page) in self.CASES.items():
+            with self.subTest(page=page):
+                html = load_fixture(f'pc_{page}.html')
+                result = pc.handle_response({'content': html, 'response_time': 0.1, 'status_code': 200}, keyword, [])
+                self.assertEqual(result['code'], code)
+                if code == 200:
+                    self.assertEqual(len(result['data']['results']), count)
+                    self.assertEqual(result['data']['last_page'], last_page)
+
+    def test_mobile_pages(self):
+        mobile = BaiduMobile()
+        for page, (keyword, code, count, last_page) in self.CASES.items():
+            with self.subTest(page=page):
+                html = load_fixture(f'mobile_{page}.html')
+                result = mobile.handle_response({'content': html, 'response_time': 0.1, 'status_code': 200}, keyword, None, None, 1)
+                self.assertEqual(result['code'], code)
+                if code == 200:
+                    self.assertEqual(len(result['data']['results']), count)
+                    self.assertEqual(result['data']['last_page'], last_page)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import time
+import unittest
+from baidu_serp_api import BaiduPc, ProxyPool
+from baidu_serp_api.proxy import ProxySessionRegistry
+
+PROXY_A = {'http': 'http://10.0.0.1:8080', 'https': 'http://10.0.0.1:8080'}
+PROXY_B = {'http': 'http://10.0.0.2:8080', 'https': 'http://10.0.0.2:8080'}
+ROTATING = {'http': 'http://gateway:9000', 'https': 'http://gateway:9000'}
+
+
+class FakeSession:
+    def __init__(self):
+        self.closed = False
+        self.requests = []
+
+    def get(self, url, **kwargs):
+        self.requests.append(kwargs['headers'].get('Connection'))
+        raise RuntimeError('stop')
+
+    def close(self):
+        self.closed = True
+
+
+class TestProxySessionRegistry(unittest.TestCase):
+    def test_reuse_cap_and_idle_eviction(self):
+        registry = ProxySessionRegistry(FakeSession, max_pools=2, idle_timeout=0.05)
+        a = registry.get(PROXY_A)
+        self.assertIs(registry.get(dict(PROXY_A)), a)
+        b = registry.get(PROXY_B)
+        c = registry.get(ROTATING)
+        # 超过池数上限时关闭最久未使用的
+        self.assertTrue(a.closed)
+        self.assertFalse(b.closed or c.closed)
+        time.sleep(0.06)
+        registry.get(PROXY_A)
+        self.assertTrue(b.closed and c.closed)
+        stats = registry.stats()
+        self.assertEqual((stats['created'], stats['reused'], stats['evicted'], stats['pools']), (4, 1, 3, 1))
+
+    def test_busy_session_closed_after_release(self):
+        registry = ProxySessionRegistry(FakeSession, max_pools=1)
+        with registry.session(PROXY_A) as a:
+            b = registry.get(PROXY_B)
+            # 正在使用的Session被淘汰时不立即关闭
+            self.assertFalse(a.closed)
+        self.assertTrue(a.closed)
+        self.assertFalse(b.closed)
+        with registry.session(PROXY_B) as b2:
+            self.assertIs(b2, b)
+        self.assertFalse(b.closed)
+        self.assertEqual(registry.stats()['evicted'], 1)
+
+    def test_rotating(self):
+        registry = ProxySessionRegistry(FakeSession)
+        session = registry.get(ROTATING)
+        registry.mark_rotating('http://gateway:9000')
+        self.assertTrue(session.closed)
+        self.assertTrue(registry.is_rotating(ROTATING))
+        self.assertFalse(registry.is_rotating(PROXY_A))
+
+
+class TestClientProxyPools(unittest.TestCase):
+    def test_keep_alive_per_proxy(self):
+        pc_serp = BaiduPc(proxy_pools=True, rotating_proxies=['http://gateway:9000'])
+        pc_serp._proxy_sessions._session_factory = FakeSession
+        pc_serp._session = FakeSession()
+        for proxies in (PROXY_A, PROXY_A, ROTATING):
+            with self.assertRaises(RuntimeError):
+                pc_serp.get_baidupc_serp('测试', None, None, proxies, {'rsv_pq': '0x1', 'rsv_t': 'a' * 32}, cookies='a=b')
+        proxy_session = pc_serp._proxy_sessions.get(PROXY_A)
+        # 固定代理复用同一个Session并保持连接，轮换代理使用默认Session并关闭连接
+        self.assertEqual(proxy_session.requests, [None, None])
+        self.assertEqual(pc_serp._session.requests, ['close'])
+
+    def test_default_still_closes(self):
+        pc_serp = BaiduPc()
+        self.assertEqual(pc_serp._apply_connection_header({}, PROXY_A), {'Connection': 'close'})
+
+
+class TestProxyPool(unittest.TestCase):
+    def test_weighted_towards_fast_proxies(self):
+        pool = ProxyPool(['http://10.0.0.1:8080', 'http://10.0.0.2:8080'])
+        for _ in range(5):
+            pool.report(PROXY_A, 200, 0.1)
+            pool.report(PROXY_B, 200, 2.0)
+        picks = [pool.select()['http'] for _ in range(1000)]
+        self.assertGreater(picks.count(PROXY_A['http']), 900)
+
+    def test_quarantine_and_backoff(self):
+        pool = ProxyPool(['http://10.0.0.1:8080', 'http://10.0.0.2:8080'], max_failures=2, quarantine_time=0.05)
+        pool.report(PROXY_B, 505)
+        pool.report(PROXY_B, 508)
+        # 非代理错误不影响分数
+        pool.report(PROXY_A, 501)
+        self.assertTrue(all(pool.select() == PROXY_A for _ in range(50)))
+        stats = pool.stats()
+        self.assertGreater(stats[PROXY_B['http']]['quarantined'], 0)
+        self.assertEqual(stats[PROXY_A['http']]['health'], 1.0)
+        time.sleep(0.06)
+        self.assertIn(PROXY_B, [pool.select() for _ in range(200)])
+
+    def test_all_quarantined_returns_earliest(self):
+        pool = ProxyPool(['http://10.0.0.1:8080'], max_failures=1)
+        pool.report(PROXY_A, 509)
+        self.assertEqual(pool.select(), PROXY_A)
+
+    def test_client_draws_from_pool(self):
+        pool = ProxyPool(['http://10.0.0.1:8080'])
+        pc_serp = BaiduPc(proxy_pool=pool)
+        used = []
+
+        def fake_fetch(keyword, date_range, pn, proxies, random_params, cookies=None, keep_alive=None):
+            used.append(proxies)
+            return {'code': 510, 'msg': '代理服务器错误'}
+
+        pc_serp._get_baidupc_serp = fake_fetch
+        self.assertEqual(pc_serp.search('测试')['code'], 510)
+        self.assertEqual(used, [PROXY_A])
+        self.assertEqual(pool.stats()[PROXY_A['http']]['failures'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
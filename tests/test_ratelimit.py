@@ -0,0 +1,84 @@
+import asyncio
+import time
+import unittest
+from baidu_serp_api import BaiduPc, BaiduMobile, RateLimiter
+from baidu_serp_api.ratelimit import response_code
+
+PROXY_A = {'http': 'http://10.0.0.1:8080', 'https': 'http://10.0.0.1:8080'}
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_token_bucket_spacing(self):
+        limiter = RateLimiter(rate=10, burst=2)
+        delays = [limiter.reserve() for _ in range(4)]
+        # 突发容量内不等待，之后按 1/rate 依次排队
+        self.assertEqual(delays[:2], [0.0, 0.0])
+        self.assertAlmostEqual(delays[2], 0.1, places=2)
+        self.assertAlmostEqual(delays[3], 0.2, places=2)
+
+    def test_aimd(self):
+        limiter = RateLimiter(rate=4, min_rate=1, increase=0.5, cooldown=60)
+        limiter.report(None, 501)
+        self.assertEqual(limiter.rate, 2)
+        # cooldown 内的连续验证码只降一次速率
+        limiter.report(None, 521)
+        self.assertEqual(limiter.rate, 2)
+        limiter.report(None, 503)
+        self.assertEqual(limiter.rate, 2)
+        for _ in range(10):
+            limiter.report(None, 200)
+        self.assertEqual(limiter.rate, 4)
+        stats = limiter.stats()
+        self.assertEqual((stats['throttled'], stats['decreases']), (2, 1))
+
+    def test_per_key_buckets(self):
+        limiter = RateLimiter(rate=100, burst=100, key_rate=5, cooldown=0)
+        self.assertEqual(limiter.reserve(PROXY_A), 0.0)
+        # 同一代理的第二个请求按代理速率等待，其他代理不受影响
+        self.assertAlmostEqual(limiter.reserve(PROXY_A), 0.2, places=2)
+        self.assertEqual(limiter.reserve(None), 0.0)
+        limiter.report(PROXY_A, 501)
+        self.assertAlmostEqual(limiter.reserve(PROXY_A), 0.4 + 0.4, places=1)
+
+    def test_response_code(self):
+        self.assertEqual(response_code({'code': 521, 'msg': '请求过于频繁(429)'}), 521)
+        self.assertEqual(response_code({'content': '<title>百度安全验证</title>'}), 501)
+        self.assertEqual(response_code(({'content': '<html>ok</html>'}, [])), 200)
+
+    def test_client_throttled(self):
+        limiter = RateLimiter(rate=20, burst=1, cooldown=0)
+        pc_serp = BaiduPc(rate_limiter=limiter)
+        calls = []
+
+        def fake_fetch(keyword, date_range, pn, proxies, random_params, cookies=None, keep_alive=None):
+            calls.append(time.monotonic())
+            return {'content': '<title>百度安全验证</title>', 'response_time': 0.01, 'status_code': 200}
+
+        pc_serp._get_baidupc_serp = fake_fetch
+        results = [pc_serp.search('测试')['code'] for _ in range(3)]
+        self.assertEqual(results, [501, 501, 501])
+        self.assertLess(limiter.rate, 20)
+        self.assertGreaterEqual(calls[-1] - calls[0], 0.05)
+
+    def test_async_acquire(self):
+        limiter = RateLimiter(rate=50, burst=1)
+
+        async def run():
+            start = time.monotonic()
+            await asyncio.gather(*(limiter.aacquire() for _ in range(3)))
+            return time.monotonic() - start
+
+        self.assertGreaterEqual(asyncio.run(run()), 0.035)
+
+    def test_mobile_client(self):
+        limiter = RateLimiter(rate=100, key_rate=100)
+        m_serp = BaiduMobile(rate_limiter=limiter)
+        m_serp._get_baidum_serp = lambda *args, **kwargs: {'code': 521, 'msg': '请求过于频繁(429)'}
+        self.assertEqual(m_serp.search('测试', proxies=PROXY_A)['code'], 521)
+        self.assertEqual(limiter.stats()['throttled'], 1)
+        # 只按代理建立令牌桶，每次搜索的新指纹不占用令牌桶
+        self.assertEqual(limiter.stats()['keys'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import time
+import unittest
+from concurrent.futures import Future
+from baidu_serp_api import BaiduPc, BaiduMobile, ProxyPool, RetryPolicy
+
+PROXY_A = {'http': 'http://10.0.0.1:8080', 'https': 'http://10.0.0.1:8080'}
+PROXY_B = {'http': 'http://10.0.0.2:8080', 'https': 'http://10.0.0.2:8080'}
+
+PC_HTML = '''
+<div tpl="www_index" mu="https://example.com/a" id="1"><h3>测试标题</h3></div>
+<a>下一页</a>
+'''
+
+
+def fake_sequence(responses, calls):
+    def fake_fetch(keyword, date_range, pn, proxies, random_params, cookies=None, keep_alive=None):
+        calls.append((proxies, random_params['baiduid']))
+        return responses[len(calls) - 1]
+    return fake_fetch
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def test_failover_and_fresh_fingerprint(self):
+        pool = ProxyPool([PROXY_A, PROXY_B])
+        pc_serp = BaiduPc(proxy_pool=pool, retry_policy=RetryPolicy(max_attempts=3, backoff=0.01))
+        calls = []
+        pc_serp._get_baidupc_serp = fake_sequence([
+            {'code': 505, 'msg': '代理连接被重置'},
+            {'content': '<title>百度安全验证</title>', 'response_time': 0.01, 'status_code': 200},
+            {'content': PC_HTML, 'response_time': 0.02, 'status_code': 200},
+        ], calls)
+        result = pc_serp.search('测试', include_performance=True)
+        self.assertEqual(result['code'], 200)
+        # 代理错误后切换到另一个代理，验证码后更换指纹
+        self.assertNotEqual(calls[0][0], calls[1][0])
+        self.assertEqual(calls[0][1], calls[1][1])
+        self.assertNotEqual(calls[1][1], calls[2][1])
+        attempts = result['data']['performance']['attempts']
+        self.assertEqual([attempt['code'] for attempt in attempts], [505, 501, 200])
+        self.assertIsNone(attempts[-1]['delay'])
+
+    def test_non_retryable_and_max_attempts(self):
+        pc_serp = BaiduPc(retry_policy=RetryPolicy(max_attempts=2, backoff=0.01))
+        calls = []
+        pc_serp._get_baidupc_serp = fake_sequence([{'code': 511, 'msg': 'SSL证书验证失败'}], calls)
+        self.assertEqual(pc_serp.search('测试')['code'], 511)
+        self.assertEqual(len(calls), 1)
+
+        calls = []
+        pc_serp._get_baidupc_serp = fake_sequence([{'code': 504, 'msg': '读取超时'}] * 3, calls)
+        result = pc_serp.search('测试')
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(len(result['attempts']), 2)
+        # 没有代理池时继续使用原代理
+        self.assertEqual(calls[0][0], calls[1][0])
+
+    def test_deadline(self):
+        pc_serp = BaiduPc(retry_policy=RetryPolicy(max_attempts=10, backoff=0.2, max_backoff=0.2, deadline=0.3))
+        calls = []
+        pc_serp._get_baidupc_serp = fake_sequence([{'code': 503, 'msg': '连接超时'}] * 10, calls)
+        pc_serp.retry_policy.backoff_delay = lambda attempt: 0.2
+        start = time.monotonic()
+        self.assertEqual(pc_serp.search('测试')['code'], 503)
+        self.assertLess(time.monotonic() - start, 0.3)
+        self.assertEqual(len(calls), 2)
+
+    def test_backoff_jitter_bounds(self):
+        policy = RetryPolicy(backoff=0.5, max_backoff=2)
+        for attempt, cap in ((1, 0.5), (2, 1.0), (5, 2.0)):
+            for _ in range(50):
+                self.assertTrue(0 <= policy.backoff_delay(attempt) <= cap)
+
+    def test_mobile_retry(self):
+        m_serp = BaiduMobile(retry_policy=RetryPolicy(backoff=0.01))
+        responses = iter([{'code': 521, 'msg': '请求过于频繁(429)'}, {'code': 404, 'msg': '未找到相关结果'}])
+        m_serp._get_baidum_serp = lambda *args, **kwargs: next(responses)
+        result = m_serp.search('测试')
+        self.assertEqual(result['code'], 404)
+        self.assertEqual([attempt['code'] for attempt in result['attempts']], [521, 404])
+
+    def test_retry_cancels_ext_recommend(self):
+        m_serp = BaiduMobile(retry_policy=RetryPolicy(backoff=0.01))
+        pending = Future()
+        responses = iter([({'content': '<title>百度安全验证</title>', 'response_time': 0.01, 'status_code': 200}, pending), {'code': 404, 'msg': '未找到相关结果'}])
+        m_serp._get_baidum_serp = lambda *args, **kwargs: next(responses)
+        self.assertEqual(m_serp.search('测试', exclude=[])['code'], 404)
+        # 重试前取消上一次尝试的扩展推荐词请求
+        self.assertTrue(pending.cancelled())
+
+
+if __name__ == '__main__':
+    unittest.main()
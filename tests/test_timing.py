@@ -0,0 +1,84 @@
+import asyncio
+import unittest
+from unittest import mock
+from baidu_serp_api import BaiduPc, BaiduMobile, AsyncBaiduPc, MockBaiduServer
+from baidu_serp_api import timing
+from baidu_serp_api.timing import PhaseTimer, performance_details
+
+
+class TestPhaseTimer(unittest.TestCase):
+    def test_nested_timers(self):
+        with PhaseTimer() as outer:
+            with PhaseTimer() as inner:
+                inner.add('parse', 0.5)
+            outer.add('parse', 0.25)
+        self.assertEqual(inner.as_dict()['phases'], {'parse': 0.5})
+        self.assertEqual(outer.as_dict()['phases'], {'parse': 0.25})
+
+    def test_retries_from_attempts(self):
+        response = {'content': '', 'attempts': [{'code': 504}, {'code': 200}]}
+        self.assertEqual(performance_details(response), {'retries': 1})
+
+
+class TestPerformanceBreakdown(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = MockBaiduServer(latency=0.01, compress=True)
+        cls.server.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def test_pc_phases(self):
+        with BaiduPc(base_url=self.server.base_url, connection_mode='pooled') as pc_serp:
+            first = pc_serp.search('黑神话', include_performance=True)['data']['performance']
+            second = pc_serp.search('黑神话', include_performance=True)['data']['performance']
+        for phase in ('fingerprint', 'dns', 'connect', 'ttfb', 'download', 'decompress', 'decode', 'parse', 'recommend'):
+            self.assertIn(phase, first['phases'])
+        self.assertGreaterEqual(first['phases']['ttfb'], 0.009)
+        self.assertLess(first['bytes_wire'], first['bytes_decoded'])
+        self.assertFalse(first['connection_reused'])
+        self.assertTrue(second['connection_reused'])
+        self.assertNotIn('connect', second['phases'])
+        self.assertEqual(first['retries'], 0)
+
+    def test_missing_urllib3_internals(self):
+        # urllib3 缺少分阶段计时依赖的内部接口时退化记录，请求本身不受影响
+        with mock.patch.object(timing, '_SPLIT_DNS', False), mock.patch.object(timing, '_TIMED_DECODE', False):
+            with BaiduPc(base_url=self.server.base_url) as pc_serp:
+                result = pc_serp.search('黑神话', include_performance=True)
+        self.assertEqual(result['code'], 200)
+        phases = result['data']['performance']['phases']
+        self.assertIn('connect', phases)
+        self.assertIn('ttfb', phases)
+        self.assertNotIn('dns', phases)
+        self.assertNotIn('decompress', phases)
+        with mock.patch.object(timing, 'TIMING_SUPPORTED', False):
+            with BaiduPc(base_url=self.server.base_url) as pc_serp:
+                result = pc_serp.search('黑神话', include_performance=True)
+        self.assertEqual(result['code'], 200)
+        phases = result['data']['performance']['phases']
+        self.assertIn('parse', phases)
+        self.assertNotIn('connect', phases)
+        self.assertNotIn('ttfb', phases)
+
+    def test_mobile_ext_recommend_phase(self):
+        m_serp = BaiduMobile(base_url=self.server.base_url)
+        performance = m_serp.search('黑神话', exclude=[], include_performance=True)['data']['performance']
+        m_serp.close()
+        self.assertIn('parse', performance['phases'])
+        self.assertIn('ext_recommend', performance['phases'])
+
+    def test_async_phases(self):
+        async def search():
+            async with AsyncBaiduPc(base_url=self.server.base_url) as pc:
+                return await pc.search('黑神话', include_performance=True)
+        performance = asyncio.run(search())['data']['performance']
+        for phase in ('connect', 'ttfb', 'download', 'decode', 'parse'):
+            self.assertIn(phase, performance['phases'])
+        self.assertLess(performance['bytes_wire'], performance['bytes_decoded'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,6 @@
 # Python
 import unittest
-from baidu_serp_api.util import convert_date_format
+from baidu_serp_api.util import convert_date_format, decode_html, get_header_charset, MarkerScanner
 from datetime import datetime, timedelta
 
 class TestConvertDateFormat(unittest.TestCase):
@@ -40,5 +40,48 @@ class TestConvertDateFormat(unittest.TestCase):
         self.assertIsNone(convert_date_format("20211225"))
 
 
+class TestDecodeHtml(unittest.TestCase):
+    def test_decode_html(self):
+        text = '<html><head><meta charset="gbk"></head><body>百度一下</body></html>'
+        # 响应头声明的编码优先
+        self.assertEqual(decode_html(text.encode('utf-8'), 'utf-8'), (text, 'header'))
+        # 其次使用meta声明的编码
+        self.assertEqual(decode_html(text.encode('gbk')), (text, 'meta'))
+        # 未声明时默认UTF-8
+        plain = '<p>百度一下，你就知道</p>'
+        self.assertEqual(decode_html(plain.encode('utf-8')), (plain, 'default'))
+        # 严格解码失败才回退到字符集探测
+        decoded, source = decode_html(('<p>' + '百度一下，你就知道。' * 20 + '</p>').encode('gbk'))
+        self.assertEqual(source, 'fallback')
+        self.assertIn('百度一下', decoded)
+
+    def test_decode_html_ignores_latin1_header(self):
+        text = '<html><head><meta charset="gbk"></head><body>百度一下</body></html>'
+        # 响应头的ISO-8859-1按未声明处理，继续使用meta声明的编码或UTF-8
+        self.assertEqual(decode_html(text.encode('gbk'), 'ISO-8859-1'), (text, 'meta'))
+        plain = '<p>百度一下，你就知道</p>'
+        self.assertEqual(decode_html(plain.encode('utf-8'), 'latin-1'), (plain, 'default'))
+
+    def test_get_header_charset(self):
+        self.assertEqual(get_header_charset('text/html; charset=UTF-8'), 'UTF-8')
+        self.assertIsNone(get_header_charset('text/html'))
+        self.assertIsNone(get_header_charset(None))
+
+
+class TestMarkerScanner(unittest.TestCase):
+    def test_marker_across_chunks(self):
+        scanner = MarkerScanner(['百度安全验证'])
+        data = '<title>百度安全验证</title>'.encode('utf-8')
+        # 按3字节切块，标记必然跨块
+        hits = [scanner.feed(data[i:i + 3]) for i in range(0, len(data), 3)]
+        self.assertIn('百度安全验证'.encode('utf-8'), hits)
+
+    def test_no_marker(self):
+        scanner = MarkerScanner(['未找到相关结果'])
+        self.assertIsNone(scanner.feed(b'<html>'))
+        self.assertIsNone(scanner.feed(b'</html>'))
+        self.assertEqual(scanner.body, b'<html></html>')
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file